@@ -0,0 +1,110 @@
+"""
+Synthetic markdown corpus for the benchmarks. Every generator is seeded so
+the same arguments always produce the same documents.
+"""
+import os
+import random
+
+
+WORDS = (
+    "elf ring shadow mountain river forge song star tower road ancient "
+    "light council sword harbor wizard hobbit valley gate shire"
+).split()
+
+
+def words(rng, count):
+    return " ".join(rng.choice(WORDS) for _ in range(count))
+
+
+def inline_text(rng, count):
+    """Plain words with the odd bold, italic and code span mixed in."""
+    parts = []
+    for i in range(0, count, 8):
+        chunk = words(rng, min(8, count - i))
+        style = rng.randrange(6)
+        if style == 0:
+            chunk = f"**{chunk}**"
+        elif style == 1:
+            chunk = f"_{chunk}_"
+        elif style == 2:
+            chunk = f"`{chunk}`"
+        parts.append(chunk)
+    return " ".join(parts)
+
+
+def long_paragraphs(rng, paragraphs=40, length=400):
+    blocks = ["# Long paragraphs"]
+    for _ in range(paragraphs):
+        blocks.append(inline_text(rng, length))
+    return "\n\n".join(blocks)
+
+
+def link_dense(rng, paragraphs=40, links=200):
+    blocks = ["# Link dense"]
+    for p in range(paragraphs):
+        items = []
+        for i in range(links):
+            if i % 10 == 0:
+                items.append(f"![{words(rng, 2)}](/images/{p}-{i}.png)")
+            else:
+                items.append(f"[{words(rng, 2)}](/pages/{p}/{i})")
+        blocks.append(" ".join(items))
+    return "\n\n".join(blocks)
+
+
+def deep_lists(rng, lists=60, items=80):
+    blocks = ["# Lists"]
+    for n in range(lists):
+        if n % 2:
+            blocks.append("\n".join(f"{i + 1}. {inline_text(rng, 12)}" for i in range(items)))
+        else:
+            blocks.append("\n".join(f"- {inline_text(rng, 12)}" for _ in range(items)))
+    return "\n\n".join(blocks)
+
+
+def large_code(rng, blocks_count=20, lines=400):
+    blocks = ["# Code"]
+    for _ in range(blocks_count):
+        body = "\n".join(f"    value_{i} = compute({words(rng, 3)!r}) < {i} & ok" for i in range(lines))
+        blocks.append(f"```\n{body}\n```")
+    return "\n\n".join(blocks)
+
+
+def mixed_page(rng):
+    """A small page touching every block type, like a typical blog post."""
+    return "\n\n".join([
+        f"# {words(rng, 4)}",
+        f"## {words(rng, 3)}",
+        inline_text(rng, 80),
+        f"> {inline_text(rng, 20)}\n> {inline_text(rng, 20)}",
+        "\n".join(f"- {inline_text(rng, 6)}" for _ in range(5)),
+        "\n".join(f"{i + 1}. [{words(rng, 2)}](/x/{i})" for i in range(5)),
+        f"```\nprint({words(rng, 2)!r})\n```",
+        inline_text(rng, 60),
+    ])
+
+
+def documents(seed=0):
+    """The large single-document cases, keyed by name."""
+    rng = random.Random(seed)
+    return {
+        "long_paragraphs": long_paragraphs(rng),
+        "link_dense": link_dense(rng),
+        "deep_lists": deep_lists(rng),
+        "large_code": large_code(rng),
+        "mixed_page": mixed_page(rng),
+    }
+
+
+def write_small_files(directory, count=500, seed=0):
+    """Write count small pages under directory and return their paths."""
+    rng = random.Random(seed)
+    paths = []
+    for i in range(count):
+        page_dir = os.path.join(directory, f"section{i % 10}", f"page{i}")
+        os.makedirs(page_dir, exist_ok=True)
+        path = os.path.join(page_dir, "index.md")
+        with open(path, "w") as f:
+            f.write(mixed_page(rng))
+        paths.append(path)
+    return paths
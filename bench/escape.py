@@ -0,0 +1,76 @@
+"""
+Cost of HTML escaping in to_html on code-heavy pages.
+
+    python3 -m bench.escape
+
+Times to_html and markdown_to_html_node with escaping on and with the
+escape functions swapped for identity. The acceptance bar is the to_html
+overhead on code-heavy pages, which must stay under 10%; code block text
+is escaped once while the tree is built, so that cost is reported
+separately, as is the overhead on the whole render.
+"""
+import argparse
+import random
+import timeit
+
+from src import htmlnode
+from src.markdown_to_html import markdown_to_html_node
+
+from . import corpus
+
+
+def code_heavy_page(rng):
+    """Mostly fenced code full of <, > and &, with a little prose between."""
+    return "\n\n".join([corpus.large_code(rng, blocks_count=10, lines=200), corpus.mixed_page(rng)] * 3)
+
+
+def best_time(func, number):
+    return min(timeit.repeat(func, number=number, repeat=3)) / number
+
+
+def paired_times(func, number, rounds):
+    """
+    Best time of func with escaping on and off. The two are measured in
+    alternating rounds so drift in machine load hits both alike.
+    """
+    escape_text, escape_attribute = htmlnode.escape_text, htmlnode.escape_attribute
+    escaped = unescaped = float("inf")
+    for _ in range(rounds):
+        escaped = min(escaped, best_time(func, number))
+        htmlnode.escape_text = htmlnode.escape_attribute = lambda value: value
+        try:
+            unescaped = min(unescaped, best_time(func, number))
+        finally:
+            htmlnode.escape_text, htmlnode.escape_attribute = escape_text, escape_attribute
+    return escaped, unescaped
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark HTML escaping overhead")
+    parser.add_argument("--number", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    pages = {
+        "code_heavy": code_heavy_page(rng),
+        "mixed_page": corpus.mixed_page(rng) * 20,
+        "link_dense": corpus.link_dense(rng),
+    }
+
+    for name, markdown in pages.items():
+        # The same tree either way: code blocks are escaped while it is
+        # built, so to_html only escapes inline text and attributes
+        tree = markdown_to_html_node(markdown)
+        escaped, unescaped = paired_times(tree.to_html, args.number, args.rounds)
+        parse, raw_parse = paired_times(lambda: markdown_to_html_node(markdown), args.number, args.rounds)
+
+        write_cost = escaped - unescaped
+        build_cost = parse - raw_parse
+        print(f"{name:<12} to_html {unescaped * 1000:8.3f} -> {escaped * 1000:8.3f} ms ({write_cost / unescaped:+.1%}), "
+              f"tree build {build_cost / raw_parse:+.1%}, "
+              f"whole render {(write_cost + build_cost) / (raw_parse + unescaped):+.1%}")
+
+
+if __name__ == "__main__":
+    main()
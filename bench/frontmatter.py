@@ -0,0 +1,85 @@
+"""
+Benchmark for metadata queries: reading every page's header with
+read_header, as pages need it (title only) and as the metadata store
+does (title and summary), against reading whole files and against a
+full render.
+
+    python3 -m bench.frontmatter --count 50000
+
+Pages are written to a temporary directory once; each case is then
+timed over all of them.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from src.frontmatter import read_header, split_front_matter
+from src.sitegen import generate_page
+
+from . import corpus
+
+TEMPLATE = "<!doctype html><title>{{ Title }}</title><time>{{ Date }}</time><article>{{ Content }}</article>"
+
+
+def write_pages(directory, count, seed=0):
+    rng = random.Random(seed)
+    paths = []
+    for i in range(count):
+        path = os.path.join(directory, f"section{i % 100}", f"page{i}.md")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(f"---\ntitle: {corpus.words(rng, 4)}\ndate: 2024-01-{i % 28 + 1:02d}\n"
+                    f"tags: [{corpus.words(rng, 1)}, {corpus.words(rng, 1)}]\n---\n")
+            f.write(corpus.mixed_page(rng))
+        paths.append(path)
+    return paths
+
+
+def header(path, with_summary=False):
+    with open(path) as f:
+        return read_header(f, with_summary)
+
+
+def read_whole(path):
+    with open(path) as f:
+        return split_front_matter(f.read())[0]
+
+
+def timed(func, paths):
+    start = time.perf_counter()
+    for path in paths:
+        func(path)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark front matter metadata queries")
+    parser.add_argument("--count", type=int, default=5000)
+    parser.add_argument("--no-render", action="store_true", help="skip the full render case")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = write_pages(os.path.join(tmp, "content"), args.count)
+        template_path = os.path.join(tmp, "template.html")
+        with open(template_path, "w") as f:
+            f.write(TEMPLATE)
+        output = os.path.join(tmp, "page.html")
+
+        cases = {
+            "read_header": header,
+            "read_header, summary": lambda path: header(path, with_summary=True),
+            "read whole file": read_whole,
+        }
+        if not args.no_render:
+            cases["full render"] = lambda path: generate_page(path, template_path, output, "/")
+
+        print(f"{args.count} pages")
+        for case, func in cases.items():
+            seconds = timed(func, paths)
+            print(f"  {case:<22} {seconds:8.2f} s  {seconds / args.count * 1e6:8.1f} us/page")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Micro-benchmarks for link and image extraction on link-dense and
+link-free text.
+
+    python3 -m bench.links
+
+Each case is compared against the previous approach: re.findall with a
+pattern string and re-splitting the text on the rebuilt markdown after
+every match.
+"""
+import argparse
+import random
+import re
+import timeit
+
+from src.markdown import extract_markdown_links, find_markdown_links
+from src.split_nodes import split_nodes_link, text_to_textnodes
+from src.textnode import TextNode, TextType
+
+from .corpus import words
+
+
+def old_extract_markdown_links(text):
+    return re.findall(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)", text)
+
+
+def old_split_nodes_link(old_nodes):
+    new_nodes = []
+    for node in old_nodes:
+        text_to_process = node.text
+        links = old_extract_markdown_links(text_to_process)
+        while links:
+            link_text, url = links[0]
+            sections = text_to_process.split(f"[{link_text}]({url})", 1)
+            if sections[0]:
+                new_nodes.append(TextNode(sections[0], TextType.TEXT))
+            new_nodes.append(TextNode(link_text, TextType.LINK, url))
+            text_to_process = sections[1]
+            links = old_extract_markdown_links(text_to_process)
+        if text_to_process:
+            new_nodes.append(TextNode(text_to_process, TextType.TEXT))
+    return new_nodes
+
+
+def corpora(seed=0):
+    rng = random.Random(seed)
+    link_dense = " ".join(f"[{words(rng, 2)}](/p/{i}) {words(rng, 3)}" for i in range(500))
+    link_free = words(rng, 2000)
+    return {"link_dense": link_dense, "link_free": link_free}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark link/image extraction")
+    parser.add_argument("--number", type=int, default=20)
+    args = parser.parse_args()
+
+    for name, text in corpora().items():
+        nodes = [TextNode(text, TextType.TEXT)]
+        cases = {
+            "findall (pattern string)": lambda: old_extract_markdown_links(text),
+            "extract_markdown_links": lambda: extract_markdown_links(text),
+            "find_markdown_links (spans)": lambda: find_markdown_links(text),
+            "split by re-scanning": lambda: old_split_nodes_link(nodes),
+            "split_nodes_link (slicing)": lambda: split_nodes_link(nodes),
+            "text_to_textnodes": lambda: text_to_textnodes(text),
+        }
+        print(f"{name} ({len(text)} chars)")
+        for case, func in cases.items():
+            seconds = min(timeit.repeat(func, number=args.number, repeat=3)) / args.number
+            print(f"  {case:<30} {seconds * 1e6:10.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Node construction benchmark: throughput and peak RSS for building the
+TextNode/LeafNode/ParentNode trees a large site produces.
+
+Each variant runs in its own subprocess so peak RSS is not shared:
+
+    python3 -m bench.nodes            # compare current nodes with dict-based ones
+    python3 -m bench.nodes --nodes 2000000
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+
+from src.htmlnode import LeafNode, ParentNode
+from src.textnode import TextNode, TextType
+
+
+class DictTextNode:
+    """The node classes as they were before __slots__, for comparison."""
+
+    def __init__(self, text, text_type, url=None, alt=None):
+        self.text = text
+        self.text_type = text_type
+        self.url = url
+        self.alt = alt
+
+
+class DictHTMLNode:
+    def __init__(self, tag=None, value=None, children=None, props=None):
+        self.tag = tag
+        self.value = value
+        self.children = children
+        self.props = props
+
+
+class DictLeafNode(DictHTMLNode):
+    def __init__(self, tag=None, value=None, props=None):
+        super().__init__(tag, value, None, props)
+
+
+class DictParentNode(DictHTMLNode):
+    def __init__(self, tag, children, props=None):
+        super().__init__(tag, None, children, props)
+
+
+VARIANTS = {
+    "slots": (TextNode, LeafNode, ParentNode),
+    "dict": (DictTextNode, DictLeafNode, DictParentNode),
+}
+
+
+def build_nodes(count, text_cls, leaf_cls, parent_cls):
+    """
+    Build count nodes: per paragraph one TextNode, three leaves and a
+    parent. Returns the paragraphs and the TextNodes, so all of them are
+    still alive when peak RSS is read.
+    """
+    paragraphs = []
+    text_nodes = []
+    for i in range(count // 5):
+        text_nodes.append(text_cls("plain words", TextType.TEXT))
+        children = [
+            leaf_cls(None, "plain words "),
+            leaf_cls("b", "bold"),
+            leaf_cls("a", "link", {"href": "/page"}),
+        ]
+        paragraphs.append(parent_cls(f"h{i % 6 + 1}" if i % 10 == 0 else "p", children))
+    return paragraphs, text_nodes
+
+
+def run_variant(name, count):
+    start = time.perf_counter()
+    paragraphs, text_nodes = build_nodes(count, *VARIANTS[name])
+    elapsed = time.perf_counter() - start
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        "variant": name,
+        "nodes": count,
+        "seconds": round(elapsed, 4),
+        "nodes_per_second": int(count / elapsed),
+        "peak_rss_mb": round(peak_kb / 1024, 1),
+        "paragraphs": len(paragraphs),
+        "text_nodes": len(text_nodes),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--nodes", type=int, default=1_000_000)
+    parser.add_argument("--variant", choices=sorted(VARIANTS))
+    args = parser.parse_args()
+
+    if args.variant:
+        print(json.dumps(run_variant(args.variant, args.nodes)))
+        return
+
+    results = []
+    for name in ("dict", "slots"):
+        out = subprocess.run(
+            [sys.executable, "-m", "bench.nodes", "--variant", name, "--nodes", str(args.nodes)],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        results.append(json.loads(out))
+
+    for result in results:
+        print(f"{result['variant']:>6}: {result['nodes_per_second']:>10,} nodes/s  "
+              f"peak RSS {result['peak_rss_mb']} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Stage-by-stage benchmark for the markdown to HTML pipeline.
+
+    python3 -m bench.pipeline --output bench_results.json
+    python3 -m bench.pipeline --compare bench_results.json --threshold 0.1
+
+Each stage is timed on its own over the synthetic corpus in bench/corpus.py
+and the best of --repeat runs is kept. With --compare, any stage that is
+slower than the saved baseline by more than the threshold is reported as a
+regression and the exit status is 1.
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import sys
+import tempfile
+import time
+
+from src.blocktype import BlockType, block_to_block_type
+from src.markdown import markdown_to_blocks
+from src.markdown_to_html import markdown_to_html_node
+from src.sitegen import generate_page
+from src.split_nodes import text_to_textnodes
+from src.text_node_to_html_node import text_node_to_html_node
+
+from . import corpus
+
+
+TEMPLATE = "<!doctype html><title>{{ Title }}</title><article>{{ Content }}</article>"
+LINE_MARKER = re.compile(r"^(#{1,6} |> ?|[-*+] |\d+\. )")
+
+
+def best_of(repeat, func):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def inline_texts(blocks):
+    """The inline text each block handler would hand to text_to_textnodes."""
+    texts = []
+    for block in blocks:
+        if block_to_block_type(block) == BlockType.code:
+            continue
+        texts.append(" ".join(LINE_MARKER.sub("", line) for line in block.split("\n")))
+    return texts
+
+
+def bench_document(markdown, repeat):
+    blocks = markdown_to_blocks(markdown)
+    texts = inline_texts(blocks)
+    text_nodes = [node for text in texts for node in text_to_textnodes(text)]
+    tree = markdown_to_html_node(markdown)
+
+    return {
+        "markdown_to_blocks": best_of(repeat, lambda: markdown_to_blocks(markdown)),
+        "block_to_block_type": best_of(repeat, lambda: [block_to_block_type(b) for b in blocks]),
+        "text_to_textnodes": best_of(repeat, lambda: [text_to_textnodes(t) for t in texts]),
+        "text_node_to_html_node": best_of(repeat, lambda: [text_node_to_html_node(n) for n in text_nodes]),
+        "to_html": best_of(repeat, tree.to_html),
+        "markdown_to_html_node": best_of(repeat, lambda: markdown_to_html_node(markdown)),
+    }
+
+
+def bench_generate_page(repeat, count):
+    with tempfile.TemporaryDirectory() as tmp:
+        template_path = os.path.join(tmp, "template.html")
+        with open(template_path, "w") as f:
+            f.write(TEMPLATE)
+        sources = corpus.write_small_files(os.path.join(tmp, "content"), count)
+        runs = iter(range(repeat))
+
+        def run():
+            # Unchanged outputs are not rewritten, so every run writes into
+            # a directory of its own to time a first build each time
+            out_dir = os.path.join(tmp, f"out{next(runs)}")
+            for i, source in enumerate(sources):
+                generate_page(source, template_path, os.path.join(out_dir, f"{i}.html"), "/")
+
+        return best_of(repeat, run)
+
+
+def run_benchmarks(repeat, small_files):
+    results = {}
+    for name, markdown in corpus.documents().items():
+        for stage, seconds in bench_document(markdown, repeat).items():
+            results[f"{name}.{stage}"] = seconds
+    results["small_files.generate_page"] = bench_generate_page(repeat, small_files)
+    return results
+
+
+# Stages faster than this are dominated by timer noise and never flagged
+MIN_COMPARE_SECONDS = 0.0005
+
+
+def compare(results, baseline, threshold):
+    """Return (name, baseline, current, change) for every regressed stage."""
+    regressions = []
+    for name, seconds in sorted(results.items()):
+        before = baseline.get(name)
+        if not before or max(before, seconds) < MIN_COMPARE_SECONDS:
+            continue
+        change = (seconds - before) / before
+        if change > threshold:
+            regressions.append((name, before, seconds, change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the markdown to HTML pipeline")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--small-files", type=int, default=300)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="baseline JSON written by an earlier --output")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="fractional slowdown that counts as a regression")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.repeat, args.small_files)
+
+    for name, seconds in sorted(results.items()):
+        print(f"{name:<45} {seconds * 1000:10.2f} ms")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "repeat": args.repeat,
+                "results": results,
+            }, f, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        for name, before, after, change in regressions:
+            print(f"REGRESSION {name}: {before * 1000:.2f} ms -> {after * 1000:.2f} ms (+{change:.0%})")
+        if regressions:
+            sys.exit(1)
+        print("No regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+import datetime
+import email.utils
+import logging
+import os
+from xml.sax.saxutils import escape
+
+from . import settings
+from . import sitegen
+from . import template
+from .htmlnode import LeafNode, ParentNode
+from .manifest import combine_hashes
+from .metadata import MetadataStore, PageMeta
+from .output_writer import write_text
+
+logger = logging.getLogger(__name__)
+
+BLOG_DIR = "blog"
+POSTS_PER_PAGE = 10
+FEED_SIZE = 20
+
+
+class Aggregate:
+    """An output built from the metadata of several pages."""
+
+    __slots__ = ("path", "sources", "render", "key")
+
+    def __init__(self, path, sources, render, key=""):
+        self.path = path
+        # Sources whose metadata the output is built from, in order
+        self.sources = sources
+        # Called with no arguments, returns the output text
+        self.render = render
+        # Anything else the output depends on, such as the listing page count
+        self.key = key
+
+
+class DependencyGraph:
+    """
+    Edges from each aggregate output to the page sources whose metadata
+    it is built from, along with the output's key.
+    """
+
+    def __init__(self, edges=None):
+        self.edges = edges if edges is not None else {}
+
+    def add(self, path, sources, key=""):
+        self.edges[path] = {"inputs": list(sources), "key": key}
+
+    def dependents(self, sources):
+        """The outputs built from any of the given sources."""
+        return {path for path, edge in self.edges.items() if not sources.isdisjoint(edge["inputs"])}
+
+    def stale(self, previous, changed):
+        """
+        Outputs that need building again: those that are new, whose inputs
+        are different pages (or in a different order) or whose key changed
+        since last time, or whose inputs' metadata changed.
+        """
+        stale = previous.dependents(changed) & self.edges.keys()
+        for path, edge in self.edges.items():
+            if previous.edges.get(path) != edge:
+                stale.add(path)
+        return stale
+
+    def removed(self, previous):
+        """Outputs of the previous build that this one no longer has."""
+        return previous.edges.keys() - self.edges.keys()
+
+
+def is_post(meta, content_dir):
+    """Blog posts are the content/blog/<name>/index.md pages."""
+    parts = os.path.relpath(meta.source, content_dir).split(os.sep)
+    return len(parts) == 3 and parts[0] == BLOG_DIR and parts[2] == "index.md"
+
+
+def newest_first(metas):
+    return sorted(metas, key=lambda meta: (meta.date or "", meta.title or ""), reverse=True)
+
+
+def listing_url(number):
+    if number == 1:
+        return f"/{BLOG_DIR}/"
+    return f"/{BLOG_DIR}/page/{number}/"
+
+
+def listing_path(output_dir, number):
+    if number == 1:
+        return os.path.join(output_dir, BLOG_DIR, "index.html")
+    return os.path.join(output_dir, BLOG_DIR, "page", str(number), "index.html")
+
+
+def listing_node(posts, number, page_count):
+    items = []
+    for meta in posts:
+        children = [
+            LeafNode("a", meta.title or meta.url, {"href": meta.url}),
+            LeafNode(None, " "),
+            LeafNode("time", meta.date, {"datetime": meta.date}),
+        ]
+        if meta.summary:
+            children.append(LeafNode("p", meta.summary))
+        items.append(ParentNode("li", children))
+
+    children = [LeafNode("h1", "Blog")]
+    if items:
+        children.append(ParentNode("ul", items))
+
+    links = []
+    if number > 1:
+        links.append(LeafNode("a", "Newer posts", {"href": listing_url(number - 1), "rel": "prev"}))
+    if number < page_count:
+        links.append(LeafNode("a", "Older posts", {"href": listing_url(number + 1), "rel": "next"}))
+    if links:
+        children.append(ParentNode("nav", links))
+    return ParentNode("div", children)
+
+
+def render_listing(template_path, posts, number, page_count, basepath):
+    title = "Blog" if number == 1 else f"Blog (page {number})"
+    page_template = template.load_template(template_path, basepath)
+    # Links are root-relative; the template adds the basepath to them
+    return page_template.render_to_string({
+        "Title": title,
+        "Content": listing_node(posts, number, page_count).write_html,
+        "Date": "",
+        "Description": "",
+        "Nav": sitegen.write_nav,
+    })
+
+
+def absolute_url(site_url, url):
+    # site_url is where the site root is served, basepath included
+    return site_url.rstrip("/") + url
+
+
+def rfc822_date(date):
+    day = datetime.date.fromisoformat(date)
+    return email.utils.format_datetime(datetime.datetime(day.year, day.month, day.day, tzinfo=datetime.timezone.utc))
+
+
+def render_rss(site, posts, site_url):
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<rss version="2.0">',
+        "<channel>",
+        f"<title>{escape(site.title or '')}</title>",
+        f"<link>{escape(absolute_url(site_url, site.url))}</link>",
+        f"<description>{escape(site.summary or '')}</description>",
+    ]
+    for meta in posts:
+        link = escape(absolute_url(site_url, meta.url))
+        lines.append("<item>")
+        lines.append(f"<title>{escape(meta.title or '')}</title>")
+        lines.append(f"<link>{link}</link>")
+        lines.append(f"<guid>{link}</guid>")
+        if meta.date:
+            lines.append(f"<pubDate>{rfc822_date(meta.date)}</pubDate>")
+        if meta.summary:
+            lines.append(f"<description>{escape(meta.summary)}</description>")
+        lines.append("</item>")
+    lines += ["</channel>", "</rss>", ""]
+    return "\n".join(lines)
+
+
+def render_sitemap(metas, listing_urls, site_url):
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">',
+    ]
+    for meta in metas:
+        lastmod = f"<lastmod>{meta.date}</lastmod>" if meta.date else ""
+        lines.append(f"<url><loc>{escape(absolute_url(site_url, meta.url))}</loc>{lastmod}</url>")
+    for url in listing_urls:
+        lines.append(f"<url><loc>{escape(absolute_url(site_url, url))}</loc></url>")
+    lines += ["</urlset>", ""]
+    return "\n".join(lines)
+
+
+def plan_aggregates(metas, content_dir, output_dir, template_path, basepath="/", site_url=None,
+                    listings=True, posts_per_page=POSTS_PER_PAGE):
+    """List the aggregate outputs for the given page metadata, without building them."""
+    aggregates = []
+    posts = newest_first([meta for meta in metas if is_post(meta, content_dir)])
+    page_count = max(1, -(-len(posts) // posts_per_page))
+
+    listing_urls = []
+    if listings:
+        for number in range(1, page_count + 1):
+            chunk = posts[(number - 1) * posts_per_page:number * posts_per_page]
+            render = (lambda chunk=chunk, number=number:
+                      render_listing(template_path, chunk, number, page_count, basepath))
+            aggregates.append(Aggregate(listing_path(output_dir, number), [meta.source for meta in chunk], render,
+                                        f"page {number} of {page_count}"))
+            listing_urls.append(listing_url(number))
+
+    if site_url:
+        site = next((meta for meta in metas if meta.url == "/"), None)
+        if site is None:
+            site = PageMeta(None, "/", "", None)
+        feed = posts[:FEED_SIZE]
+        aggregates.append(Aggregate(
+            os.path.join(output_dir, "rss.xml"),
+            [site.source] + [meta.source for meta in feed],
+            lambda: render_rss(site, feed, site_url),
+        ))
+        # A new listing page only appears with a new post, so the sources
+        # cover the listing URLs as well
+        aggregates.append(Aggregate(
+            os.path.join(output_dir, "sitemap.xml"),
+            [meta.source for meta in metas],
+            lambda: render_sitemap(metas, listing_urls, site_url),
+        ))
+    return aggregates
+
+
+def build_aggregates(pages, content_dir, output_dir, template_path, basepath="/", site_url=None,
+                     listings=True, posts_per_page=POSTS_PER_PAGE, store=None, outputs=None):
+    """
+    Write the blog listing pages, and rss.xml and sitemap.xml when a
+    site_url (where the site root is served, basepath included) is
+    given, rebuilding only those whose inputs changed.
+
+    Page metadata comes from the MetadataStore, which only reads pages
+    whose fingerprint changed. The dependency graph of the previous build
+    then picks out the outputs built from metadata that changed; edits
+    that leave every title, date and summary alone rebuild nothing.
+    Outputs that colliding content pages already produce are left out.
+    Aggregate paths are added to outputs when it is given.
+
+    Returns the number of outputs built.
+    """
+    if store is None:
+        store = MetadataStore.load()
+
+    metas, changed = store.refresh(pages, output_dir)
+    page_destinations = {os.path.normpath(page.destination) for page in pages}
+
+    graph = DependencyGraph()
+    aggregates = {}
+    for aggregate in plan_aggregates(metas, content_dir, output_dir, template_path, basepath, site_url,
+                                     listings, posts_per_page):
+        if os.path.normpath(aggregate.path) in page_destinations:
+            logger.warning("Not generating %s: a content page is written there", aggregate.path)
+            continue
+        graph.add(aggregate.path, aggregate.sources, aggregate.key)
+        aggregates[aggregate.path] = aggregate
+
+    config = combine_hashes(template.template_digest(template_path), basepath, site_url or "", str(posts_per_page),
+                            settings.active.nav_html)
+    previous = DependencyGraph(store.aggregates)
+    if config != store.config:
+        stale = set(aggregates)
+    else:
+        stale = graph.stale(previous, changed)
+    stale.update(path for path in aggregates if not os.path.exists(path))
+
+    for path in sorted(stale):
+        if write_text(path, aggregates[path].render()):
+            logger.debug("Wrote %s", path)
+
+    for path in graph.removed(previous):
+        if os.path.isfile(path):
+            logger.info("Removing stale output: %s", path)
+            os.remove(path)
+
+    if outputs is not None:
+        outputs.update(os.path.normpath(path) for path in aggregates)
+
+    store.aggregates = graph.edges
+    store.config = config
+    store.save()
+    return len(stale)
@@ -0,0 +1,113 @@
+import hashlib
+import logging
+import os
+import pickle
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+BLOCK_CACHE_PATH = "./.ssg-cache/blocks.pickle"
+DEFAULT_MAX_ENTRIES = 50000
+
+# Bump whenever block rendering changes, so fragments persisted by an
+# older version are not reused
+CACHE_VERSION = 4
+
+
+def block_key(block, context=""):
+    """Hash a block's source together with any build-wide inputs it renders with."""
+    digest = hashlib.blake2b(block.encode("utf-8"), digest_size=16)
+    if context:
+        digest.update(b"\0" + context.encode("utf-8"))
+    return digest.digest()
+
+
+class BlockCache:
+    """
+    LRU map from a block's content hash to its rendered HTML fragment.
+
+    Boilerplate blocks repeated across pages and unchanged blocks of an
+    edited page are rendered once; fragments can be persisted between
+    builds with save() and load().
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, path=None):
+        self.max_entries = max_entries
+        self.path = path
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        # Digest of inputs besides the block text that change its HTML,
+        # such as the image sizes filled into img tags
+        self.context = ""
+        # Fragments put since the last drain(), kept only in a render
+        # worker's copy so they can be sent back to the build's cache
+        self.added = None
+
+    def get(self, key):
+        fragment = self.entries.get(key)
+        if fragment is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return fragment
+
+    def put(self, key, fragment):
+        self.entries[key] = fragment
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        if self.added is not None:
+            self.added[key] = fragment
+
+    def track(self):
+        """Start recording new fragments and counts for drain(); used in workers."""
+        self.added = {}
+        self.hits = 0
+        self.misses = 0
+
+    def drain(self):
+        """
+        Return (fragments, hits, misses) since the last drain, or None when
+        not tracking, and start over. A worker returns this with each page.
+        """
+        if self.added is None:
+            return None
+        delta = (list(self.added.items()), self.hits, self.misses)
+        self.track()
+        return delta
+
+    def merge(self, delta):
+        """Add what a worker's drain() returned to this cache."""
+        if delta is None:
+            return
+        fragments, hits, misses = delta
+        for key, fragment in fragments:
+            self.put(key, fragment)
+        self.hits += hits
+        self.misses += misses
+
+    @classmethod
+    def load(cls, path=BLOCK_CACHE_PATH, max_entries=DEFAULT_MAX_ENTRIES):
+        cache = cls(max_entries, path)
+        try:
+            with open(path, "rb") as f:
+                version, entries = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError, TypeError):
+            return cache
+
+        if version == CACHE_VERSION:
+            for key, fragment in entries:
+                cache.put(key, fragment)
+        return cache
+
+    def save(self):
+        if self.path is None:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump((CACHE_VERSION, list(self.entries.items())), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.path)
+        logger.debug("Saved %d cached blocks to %s", len(self.entries), self.path)
@@ -11,28 +11,53 @@ class BlockType(Enum):
     ordered_list = "ordered_list"
 
 
+HEADING_PATTERN = re.compile(r"#{1,6} ")
+UNORDERED_MARKERS = ("- ", "* ", "+ ")
+
+
+def is_fence_opener(line):
+    """
+    Whether line opens a fenced code block: ``` followed by an info string
+    without backticks, as in CommonMark, so ```code``` at the start of a
+    paragraph stays inline code.
+    """
+    return line.startswith("```") and "`" not in line.lstrip("`")
+
+
 def block_to_block_type(markdown):
-    lines = markdown.splitlines()
+    return classify_lines(markdown.splitlines())
+
 
+def classify_lines(lines):
+    """
+    Classify a block from its lines, checking every line-based rule
+    (quote, unordered and ordered list) in the same loop.
+    """
     if not lines:
         return BlockType.paragraph
 
-    elif re.match(r"^#{1,6} ", lines[0]):
+    first = lines[0]
+    if HEADING_PATTERN.match(first):
         return BlockType.heading
 
-    elif lines[0] == "```" and lines[-1] == "```":
+    if is_fence_opener(first) and len(lines) > 1 and lines[-1].strip() == "```":
         return BlockType.code
 
-    elif all(line.startswith(">") for line in lines):
+    quote = unordered = ordered = True
+    for index, line in enumerate(lines):
+        if quote and not line.startswith(">"):
+            quote = False
+        if unordered and not line.startswith(UNORDERED_MARKERS):
+            unordered = False
+        if ordered and not line.startswith(f"{index + 1}. "):
+            ordered = False
+        if not (quote or unordered or ordered):
+            return BlockType.paragraph
+
+    if quote:
         return BlockType.quote
-
-    elif all(line.startswith("- ") or line.startswith("* ") or line.startswith("+ ") for line in lines):
+    if unordered:
         return BlockType.unordered_list
-
-    elif all(line.startswith(f"{index + 1}. ") for index, line in enumerate(lines)):
-        return BlockType.ordered_list
-
-    else:
-        return BlockType.paragraph
+    return BlockType.ordered_list
 
 
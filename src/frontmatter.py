@@ -0,0 +1,152 @@
+import datetime
+import itertools
+
+from . import markdown
+from .blocktype import BlockType
+from .split_nodes import text_to_textnodes
+from .textnode import TextType
+
+FENCE = "---"
+# A YAML document may also be closed with "..."
+CLOSING_FENCES = ("---", "...")
+SUMMARY_LENGTH = 200
+
+# Node types whose text counts as prose when looking for a summary
+PROSE_TYPES = (TextType.TEXT, TextType.BOLD, TextType.ITALIC, TextType.CODE)
+
+
+def parse_value(value):
+    """
+    The YAML-style scalars front matter uses: quoted or bare strings and
+    [a, b] inline lists. Anything richer is kept as the raw string.
+    """
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+        return value[1:-1]
+    if value.startswith("[") and value.endswith("]"):
+        return [parse_value(item) for item in value[1:-1].split(",") if item.strip()]
+    return value
+
+
+def parse_line(meta, line):
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return
+    key, separator, value = line.partition(":")
+    if separator:
+        meta[key.strip().lower()] = parse_value(value)
+
+
+def split_header(lines):
+    """
+    Read front matter from the start of an iterable of lines.
+
+    Returns (meta, body): the front matter as a dict (empty when there is
+    none) and an iterator over the remaining lines. Only the front matter
+    itself is consumed, so the body of an open file is not read.
+    """
+    lines = iter(lines)
+    first = next(lines, None)
+    if first is None:
+        return {}, lines
+    if first.strip() != FENCE:
+        return {}, itertools.chain([first], lines)
+
+    consumed = [first]
+    meta = {}
+    for line in lines:
+        consumed.append(line)
+        if line.strip() in CLOSING_FENCES:
+            return meta, lines
+        parse_line(meta, line)
+
+    # Never closed, so not front matter after all
+    return {}, iter(consumed)
+
+
+def split_front_matter(text):
+    """
+    Split markdown text into (meta, body). The body is a slice of text,
+    so the document is not broken into lines to find the front matter.
+    """
+    if not text.startswith(FENCE):
+        return {}, text
+
+    start = text.find("\n") + 1
+    if start == 0 or text[:start].strip() != FENCE:
+        return {}, text
+
+    meta = {}
+    pos = start
+    while pos < len(text):
+        end = text.find("\n", pos)
+        end = len(text) if end == -1 else end + 1
+        line = text[pos:end]
+        if line.strip() in CLOSING_FENCES:
+            return meta, text[end:]
+        parse_line(meta, line)
+        pos = end
+
+    return {}, text
+
+
+def summarize(block):
+    """
+    Plain text of a paragraph, cut at a word boundary. Returns "" for
+    paragraphs without prose of their own, such as a lone link or image.
+    """
+    try:
+        nodes = text_to_textnodes(" ".join(line.strip() for line in block.lines))
+    except Exception:
+        return ""
+    if not any(node.text_type in PROSE_TYPES and node.text.strip() for node in nodes):
+        return ""
+
+    text = "".join(node.text for node in nodes).strip()
+    if len(text) <= SUMMARY_LENGTH:
+        return text
+    return text[:SUMMARY_LENGTH].rsplit(" ", 1)[0] + "…"
+
+
+def read_header(lines, with_summary=False):
+    """
+    Read what a page says about itself from an iterable of lines and
+    return (meta, title, summary). The title is the front matter title,
+    or else the first h1 by the same rule the page itself uses (None if
+    there is neither). The summary is the front matter description, or
+    else, with with_summary, the first paragraph with prose; it is ""
+    otherwise. Reading stops as soon as both are known, so with full
+    front matter the body of an open file is never read at all.
+    """
+    meta, body = split_header(lines)
+    title = meta.get("title") or None
+    summary = meta.get("description") or ""
+    if not isinstance(summary, str):
+        summary = ", ".join(summary)
+
+    if summary or not with_summary:
+        if title is None:
+            try:
+                title = markdown.find_title(body)
+            except ValueError:
+                pass
+        return meta, title, summary
+
+    watcher = markdown.TitleWatcher(title)
+    for block in markdown.scan_blocks(watcher.watch(body)):
+        if block.block_type == BlockType.paragraph and not summary:
+            summary = summarize(block)
+        if watcher.title is not None and summary:
+            break
+    return meta, watcher.title, summary
+
+
+def front_matter_date(meta):
+    """A YYYY-MM-DD date from the front matter date, or None."""
+    value = meta.get("date")
+    if not isinstance(value, str):
+        return None
+    try:
+        return datetime.date.fromisoformat(value[:10]).isoformat()
+    except ValueError:
+        return None
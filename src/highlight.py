@@ -0,0 +1,289 @@
+import functools
+import hashlib
+import logging
+import os
+import re
+from collections import OrderedDict
+
+from .htmlnode import escape_text
+
+logger = logging.getLogger(__name__)
+
+HIGHLIGHT_CACHE_DIR = "./.ssg-cache/highlight"
+DEFAULT_MAX_ENTRIES = 10000
+DEFAULT_MAX_FILES = 50000
+# Part of every cache key; bump whenever a lexer or the markup changes
+HIGHLIGHT_VERSION = 1
+
+# Token classes follow Pygments' short names, so its themes apply as is
+KEYWORD = "k"
+CONSTANT = "kc"
+BUILTIN = "nb"
+DECORATOR = "nd"
+VARIABLE = "nv"
+TAG = "nt"
+ATTRIBUTE = "na"
+STRING = "s"
+NUMBER = "m"
+COMMENT = "c"
+
+DOUBLE_QUOTED = r'"(?:\\.|[^"\\\n])*"'
+SINGLE_QUOTED = r"'(?:\\.|[^'\\\n])*'"
+C_COMMENT = r"/\*[\s\S]*?\*/"
+NUMBER_LITERAL = r"\b(?:0[xXoObB][\da-fA-F_]+|\d[\d_]*(?:\.\d[\d_]*)?(?:[eE][+-]?\d+)?)"
+
+
+def words(names):
+    return r"\b(?:" + "|".join(names.split()) + r")\b"
+
+
+# Rules are tried in order at each position, so comments and strings come
+# before anything that could match inside them
+LANGUAGES = {
+    "python": (
+        (COMMENT, r"#[^\n]*"),
+        (STRING, r"(?i:[rbuf]{0,2})(?:\"\"\"[\s\S]*?\"\"\"|'''[\s\S]*?'''|" + DOUBLE_QUOTED + "|" + SINGLE_QUOTED + ")"),
+        (DECORATOR, r"(?<![\w)\]])@[\w.]+"),
+        (CONSTANT, words("True False None")),
+        (KEYWORD, words(
+            "and as assert async await break class continue def del elif else except finally for "
+            "from global if import in is lambda nonlocal not or pass raise return try while with yield"
+        )),
+        (BUILTIN, words(
+            "abs all any bool bytes dict enumerate filter float getattr hasattr int isinstance "
+            "len list map max min open print range repr set sorted str sum super tuple type zip self"
+        )),
+        (NUMBER, NUMBER_LITERAL + r"j?"),
+    ),
+    "javascript": (
+        (COMMENT, r"//[^\n]*|" + C_COMMENT),
+        (STRING, DOUBLE_QUOTED + "|" + SINGLE_QUOTED + r"|`(?:\\.|[^`\\])*`"),
+        (CONSTANT, words("true false null undefined NaN Infinity")),
+        (KEYWORD, words(
+            "async await break case catch class const continue default delete do else export extends "
+            "finally for from function if import in instanceof let new of return static super switch "
+            "this throw try typeof var void while yield"
+        )),
+        (BUILTIN, words("Array Boolean console document JSON Math Number Object Promise String window")),
+        (NUMBER, NUMBER_LITERAL + r"n?"),
+    ),
+    "json": (
+        (TAG, DOUBLE_QUOTED + r"(?=\s*:)"),
+        (STRING, DOUBLE_QUOTED),
+        (CONSTANT, words("true false null")),
+        (NUMBER, r"-?" + NUMBER_LITERAL),
+    ),
+    "bash": (
+        (COMMENT, r"(?<![\w$])#[^\n]*"),
+        (STRING, DOUBLE_QUOTED + "|" + r"'[^']*'"),
+        (VARIABLE, r"\$(?:\{[^}\n]*\}|\w+|[@#?$!*-])"),
+        (KEYWORD, words(
+            "if then else elif fi for in do done case esac while until function return "
+            "local export readonly set unset source"
+        )),
+        (BUILTIN, words("cd echo exit printf read test")),
+    ),
+    "css": (
+        (COMMENT, C_COMMENT),
+        (STRING, DOUBLE_QUOTED + "|" + SINGLE_QUOTED),
+        (KEYWORD, r"@[\w-]+|!important"),
+        (ATTRIBUTE, r"[\w-]+(?=\s*:[^:{;]*[;}])"),
+        (NUMBER, r"#[\da-fA-F]{3,8}\b|-?(?:\d+\.?\d*|\.\d+)(?:%|[a-zA-Z]+)?"),
+    ),
+    "html": (
+        (COMMENT, r"<!--[\s\S]*?-->"),
+        (TAG, r"</?[\w:-]+|/?>|<!\w+"),
+        (ATTRIBUTE, r"\b[\w:-]+(?==)"),
+        (STRING, r'"[^"]*"|' + r"'[^']*'"),
+    ),
+}
+
+ALIASES = {
+    "py": "python",
+    "python3": "python",
+    "js": "javascript",
+    "mjs": "javascript",
+    "ts": "javascript",
+    "typescript": "javascript",
+    "sh": "bash",
+    "shell": "bash",
+    "zsh": "bash",
+    "xml": "html",
+    "svg": "html",
+}
+
+
+def language_name(language):
+    language = language.lower()
+    return ALIASES.get(language, language)
+
+
+class Lexer:
+    """A language's rules compiled into one alternation of numbered groups."""
+
+    __slots__ = ("pattern", "classes")
+
+    def __init__(self, rules):
+        self.pattern = re.compile("|".join(f"(?P<t{i}>{regex})" for i, (_, regex) in enumerate(rules)), re.MULTILINE)
+        self.classes = {f"t{i}": token_class for i, (token_class, _) in enumerate(rules)}
+
+    def tokens(self, code):
+        """Yield (token_class, text) pairs covering code; plain text has class None."""
+        pos = 0
+        for match in self.pattern.finditer(code):
+            start, end = match.span()
+            if start == end:
+                continue
+            if start > pos:
+                yield None, code[pos:start]
+            yield self.classes[match.lastgroup], code[start:end]
+            pos = end
+        if pos < len(code):
+            yield None, code[pos:]
+
+
+@functools.lru_cache(maxsize=None)
+def get_lexer(language):
+    """The compiled Lexer for a language or alias, or None if it has no rules."""
+    rules = LANGUAGES.get(language_name(language))
+    if rules is None:
+        return None
+    return Lexer(rules)
+
+
+def highlight(code, lexer):
+    """HTML for code with every token wrapped in a classed span."""
+    parts = []
+    for token_class, text in lexer.tokens(code):
+        if token_class is None:
+            parts.append(escape_text(text))
+        else:
+            parts.append(f'<span class="{token_class}">{escape_text(text)}</span>')
+    return "".join(parts)
+
+
+def highlight_key(code, language):
+    digest = hashlib.blake2b(f"{HIGHLIGHT_VERSION}\0{language_name(language)}\0".encode("utf-8"), digest_size=16)
+    digest.update(code.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class HighlightCache:
+    """
+    Highlighted HTML by (language, code) hash: an LRU in memory in front
+    of one file per entry under directory, so snippets repeated across
+    pages are tokenized once and later builds reuse earlier ones. Render
+    workers share the directory, so what one worker highlights is there
+    for the others and for the next build. Files are written through a
+    temporary name, and a missing or unreadable one is simply a miss.
+    A file's mtime is when it was last used, so prune() can keep the
+    directory to max_files by dropping the least recently used.
+    """
+
+    def __init__(self, directory=None, max_entries=DEFAULT_MAX_ENTRIES, max_files=DEFAULT_MAX_FILES):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_files = max_files
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def path(self, key):
+        return os.path.join(self.directory, key[:2], key + ".html")
+
+    def get(self, key):
+        html = self.entries.get(key)
+        if html is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return html
+
+        if self.directory is not None:
+            path = self.path(key)
+            try:
+                with open(path, encoding="utf-8") as f:
+                    html = f.read()
+                os.utime(path)
+            except (OSError, ValueError):
+                html = None
+        if html is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.remember(key, html)
+        return html
+
+    def put(self, key, html):
+        self.remember(key, html)
+        if self.directory is None:
+            return
+        path = self.path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(html)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.debug("Could not cache highlighted code in %s: %s", path, e)
+
+    def prune(self):
+        """
+        Delete the least recently used files beyond max_files, and any
+        temporary files left by an interrupted write. Run once the build
+        is done with the cache. Returns the number of files deleted.
+        """
+        if self.directory is None:
+            return 0
+        files = []
+        stray = []
+        try:
+            with os.scandir(self.directory) as shards:
+                for shard in shards:
+                    if not shard.is_dir():
+                        continue
+                    with os.scandir(shard.path) as it:
+                        for entry in it:
+                            (files if entry.name.endswith(".html") else stray).append(entry)
+        except OSError:
+            # No cache written yet
+            return 0
+
+        if len(files) > self.max_files:
+            # Only stat the files when some have to go
+            files.sort(key=lambda entry: entry.stat().st_mtime_ns)
+            stray.extend(files[:len(files) - self.max_files])
+
+        removed = 0
+        for entry in stray:
+            try:
+                os.remove(entry.path)
+                removed += 1
+            except OSError as e:
+                logger.debug("Could not prune %s: %s", entry.path, e)
+        return removed
+
+    def remember(self, key, html):
+        self.entries[key] = html
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+
+def highlight_code(code, language, cache=None):
+    """
+    Highlighted HTML for code in language, through cache when given.
+    Returns None for languages without a lexer.
+    """
+    lexer = get_lexer(language)
+    if lexer is None:
+        return None
+    if cache is None:
+        return highlight(code, lexer)
+
+    key = highlight_key(code, language)
+    html = cache.get(key)
+    if html is None:
+        html = highlight(code, lexer)
+        cache.put(key, html)
+    return html
@@ -1,20 +1,43 @@
+import sys
+
+
 class HTMLNode:
+    # Nodes are created by the million on big sites; __slots__ keeps each one
+    # small. Subclasses declare empty __slots__ so they don't regain a dict.
+    # Tag names are interned so e.g. every f"h{level}" shares one string.
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(self, tag=None, value=None, children=None, props=None):
-        self.tag = tag
+        self.tag = tag if tag is None else sys.intern(tag)
         self.value = value
         self.children = children
         self.props = props
 
     def to_html(self):
+        parts = []
+        self.write_html(parts.append)
+        return "".join(parts)
+
+    def write_html(self, write):
+        """
+        Stream the HTML for this node by calling write() with each fragment,
+        so a whole document can go straight to a file without building the
+        string for every subtree first.
+        """
         raise NotImplementedError
 
+    def write_props(self, write):
+        if self.props:
+            for key, value in self.props.items():
+                write(f' {key}="{escape_attribute(value)}"')
+
     def props_to_html(self):
         if self.props is None or len(self.props) == 0:
             return ""
         
         result = ""
         for key, value in self.props.items():
-            result += f' {key}="{value}"'
+            result += f' {key}="{escape_attribute(value)}"'
 
         return result
 
@@ -23,50 +46,105 @@ class HTMLNode:
 
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag=None, value=None, props=None):
-        super().__init__(tag, value, None, props)
+        self.tag = tag if tag is None else sys.intern(tag)
+        self.value = value
+        self.children = None
+        self.props = props
 
     def to_html(self):
         if self.value == None:
             raise ValueError("A value is required for LeafNode")
         if self.tag == None:
-            return self.value
+            return escape_text(self.value)
+        if not self.props:
+            return f"<{self.tag}>{escape_text(self.value)}</{self.tag}>"
+        return f"<{self.tag}{self.props_to_html()}>{escape_text(self.value)}</{self.tag}>"
 
-        attribute_strings = []
-        
-        if self.props:
-            for key, value in self.props.items():
-                attribute_strings.append(f'{key}="{value}"')
+    def write_html(self, write):
+        if self.value == None:
+            raise ValueError("A value is required for LeafNode")
+        if self.tag == None:
+            write(escape_text(self.value))
+            return
+        if not self.props:
+            write(f"<{self.tag}>{escape_text(self.value)}</{self.tag}>")
+            return
+
+        write(f"<{self.tag}")
+        self.write_props(write)
+        write(f">{escape_text(self.value)}</{self.tag}>")
+
+
+class RawHTMLNode(HTMLNode):
+    """Already-rendered HTML (e.g. a cached block), written out unescaped."""
+
+    __slots__ = ()
 
-        attributes = " ".join(attribute_strings)
-        attributes_part = " " + attributes if attributes else ""
-        return f"<{self.tag}{attributes_part}>{self.value}</{self.tag}>"
+    def __init__(self, value):
+        self.tag = None
+        self.value = value
+        self.children = None
+        self.props = None
+
+    def to_html(self):
+        return self.value
+
+    def write_html(self, write):
+        write(self.value)
 
 
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, children, props=None):
-        super().__init__(tag, None, children, props)
+        self.tag = tag if tag is None else sys.intern(tag)
+        self.value = None
+        self.children = children
+        self.props = props
 
-    def to_html(self):
+    def write_html(self, write):
         if self.tag == None:
             raise ValueError("ParentNode must contain a tag")
         if self.children == None:
             raise ValueError("Children are required for ParentNode")
 
-        html =f"<{self.tag}"
+        write(f"<{self.tag}")
+        self.write_props(write)
+        write(">")
 
-        if self.props:
-            for prop, value in self.props.items():
-                html += f' {prop}="{value}"'
+        for child in self.children:
+            child.write_html(write)
 
-        html += ">"
+        write(f"</{self.tag}>")
 
-        for child in self.children:
-            html += child.to_html()
 
-        html += f"</{self.tag}>"
+def escape_text(text):
+    """
+    Escape text content for HTML. Only & and < can start markup in text, so
+    > is left alone. Most text has nothing to escape and the membership
+    tests are far cheaper than rebuilding the string; when it does, chained
+    str.replace is many times faster than str.translate or a regex
+    substitution in CPython.
+    """
+    if "&" in text:
+        text = text.replace("&", "&amp;")
+    if "<" in text:
+        text = text.replace("<", "&lt;")
+    return text
+
 
-        return html
+def escape_attribute(value):
+    """Escape an attribute value for use inside double quotes."""
+    if value is None:
+        return value
+    if "&" in value:
+        value = value.replace("&", "&amp;")
+    if '"' in value:
+        value = value.replace('"', "&quot;")
+    return value
 
 
 def to_html(node):
@@ -74,11 +152,6 @@ def to_html(node):
     return node.to_html()
 
 
-
-        
-
-
-
-
-    
-
+def write_html(node, write):
+    """Helper function that streams the node's HTML fragments into write()."""
+    node.write_html(write)
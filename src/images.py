@@ -0,0 +1,232 @@
+import logging
+import os
+import struct
+from concurrent.futures import ProcessPoolExecutor
+
+from . import settings
+from .manifest import combine_hashes, hash_file
+from .static_sync import is_unchanged, scan_files, sync_file
+
+try:
+    from PIL import Image
+except ImportError:  # Resized derivatives are only made when Pillow is installed
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+IMAGE_CACHE_DIR = "./.ssg-cache/images"
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".gif", ".webp"}
+# Widths of the resized copies offered in srcset, when narrower than the original
+DERIVATIVE_WIDTHS = (480, 960)
+JPEG_QUALITY = 82
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+class ImageInfo:
+    """Intrinsic size of a site image and its resized (url, width) copies."""
+
+    __slots__ = ("width", "height", "srcset")
+
+    def __init__(self, width, height, srcset=()):
+        self.width = width
+        self.height = height
+        self.srcset = srcset
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, ImageInfo) and
+            (self.width, self.height, self.srcset) == (other.width, other.height, other.srcset)
+        )
+
+    def __repr__(self):
+        return f"ImageInfo({self.width}, {self.height}, {self.srcset})"
+
+
+class ImageIndex:
+    """
+    Map from an image's site URL (e.g. /images/tom.png) to its ImageInfo.
+
+    digest changes whenever any size or derivative changes, so it can be
+    folded into the keys of anything that caches rendered img tags.
+    """
+
+    def __init__(self, entries=None):
+        self.entries = entries if entries is not None else {}
+        parts = []
+        for url in sorted(self.entries):
+            info = self.entries[url]
+            parts.append(f"{url} {info.width}x{info.height} {info.srcset}")
+        self.digest = combine_hashes(*parts)
+
+    def get(self, url):
+        return self.entries.get(url)
+
+
+def read_dimensions(path):
+    """
+    Return (width, height) of an image, or None when it cannot be told.
+    PNG and GIF sizes are read straight from the file header; other
+    formats need Pillow.
+    """
+    with open(path, "rb") as f:
+        head = f.read(24)
+
+    if head.startswith(PNG_SIGNATURE) and head[12:16] == b"IHDR":
+        return struct.unpack(">II", head[16:24])
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        return struct.unpack("<HH", head[6:10])
+
+    if Image is not None:
+        try:
+            with Image.open(path) as image:
+                return image.size
+        except OSError:
+            return None
+    return None
+
+
+def derivative_suffix(width):
+    return f"-{width}w"
+
+
+def cache_path(cache_dir, digest, width, extension):
+    return os.path.join(cache_dir, f"{digest}{derivative_suffix(width)}{extension}")
+
+
+def make_derivative(task):
+    """
+    Worker entry point: write source resized to width into target, going
+    through a temporary file so an interrupted build leaves no partial
+    image in the cache.
+    """
+    source_path, target_path, width = task
+    with Image.open(source_path) as image:
+        image_format = image.format
+        height = max(1, round(image.height * width / image.width))
+        resized = image.resize((width, height), Image.LANCZOS)
+
+    extension = os.path.splitext(target_path)[1].lower()
+    options = {"optimize": True}
+    if extension in (".jpg", ".jpeg"):
+        options["quality"] = JPEG_QUALITY
+
+    tmp_path = f"{target_path}.{os.getpid()}.tmp"
+    resized.save(tmp_path, format=image_format, **options)
+    os.replace(tmp_path, target_path)
+    return target_path
+
+
+def make_derivatives(tasks, jobs=1):
+    """
+    Run make_derivative over tasks, on a process pool when there is more
+    than one. Returns the set of target paths that could not be made.
+    """
+    failed = set()
+    if jobs > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(tasks))) as pool:
+            futures = [(task, pool.submit(make_derivative, task)) for task in tasks]
+            results = [(task, future.exception()) for task, future in futures]
+    else:
+        results = []
+        for task in tasks:
+            try:
+                make_derivative(task)
+                results.append((task, None))
+            except Exception as e:
+                results.append((task, e))
+
+    for (source_path, target_path, width), error in results:
+        if error is not None:
+            logger.warning("Could not resize %s to %dpx: %s", source_path, width, error)
+            failed.add(target_path)
+    return failed
+
+
+def process_images(source_dir, output_dir, outputs=None, jobs=1, link=False, cache_dir=IMAGE_CACHE_DIR,
+                   manifest=None):
+    """
+    Index every image under source_dir and place its resized derivatives
+    next to the original in output_dir.
+
+    Derivatives are cached in cache_dir under the source's content hash,
+    so an image is only resized again when its bytes change; cache misses
+    are resized in parallel. Without Pillow only the sizes are indexed.
+    Derivative paths are added to outputs when it is given, and recorded
+    in the manifest like static files, so an incremental build removes
+    them once their source image is gone or too small to need them.
+
+    Returns the ImageIndex.
+    """
+    images = []
+    for source_path, destination_path, _ in scan_files(source_dir, output_dir):
+        extension = os.path.splitext(source_path)[1].lower()
+        if extension not in IMAGE_EXTENSIONS:
+            continue
+        size = read_dimensions(source_path)
+        if size is None:
+            continue
+        url = "/" + os.path.relpath(source_path, source_dir).replace(os.sep, "/")
+        images.append((source_path, destination_path, url, extension, size))
+
+    pending = []
+    planned = []
+    if Image is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        for source_path, destination_path, url, extension, (width, _) in images:
+            digest = hash_file(source_path)
+            for derivative_width in DERIVATIVE_WIDTHS:
+                if derivative_width >= width:
+                    continue
+                cached = cache_path(cache_dir, digest, derivative_width, extension)
+                if not os.path.exists(cached):
+                    pending.append((source_path, cached, derivative_width))
+                planned.append((source_path, url, destination_path, cached, derivative_width))
+
+    failed = make_derivatives(pending, jobs)
+    if pending:
+        logger.info("Resized %d images", len(pending) - len(failed))
+
+    srcsets = {}
+    for source_path, url, destination_path, cached, derivative_width in planned:
+        if cached in failed:
+            continue
+        base, extension = os.path.splitext(destination_path)
+        derivative_path = base + derivative_suffix(derivative_width) + extension
+        if not is_unchanged(cached, derivative_path, os.stat(cached)):
+            os.makedirs(os.path.dirname(derivative_path), exist_ok=True)
+            sync_file(cached, derivative_path, link)
+        if manifest is not None:
+            # The cached file is named after the source's content hash
+            manifest.record(f"{source_path}#{derivative_width}w", os.path.basename(cached), derivative_path)
+        if outputs is not None:
+            outputs.add(os.path.normpath(derivative_path))
+        url_base, url_extension = os.path.splitext(url)
+        srcsets.setdefault(url, []).append((url_base + derivative_suffix(derivative_width) + url_extension, derivative_width))
+
+    entries = {}
+    for _, _, url, _, (width, height) in images:
+        srcset = srcsets.get(url)
+        if srcset:
+            srcset = tuple(srcset) + ((url, width),)
+        entries[url] = ImageInfo(width, height, srcset or ())
+    return ImageIndex(entries)
+
+
+def image_props(url, alt):
+    """
+    Attributes for an img tag: the intrinsic size, so the browser can
+    reserve space before the image loads, srcset when resized copies
+    exist, and lazy loading.
+    """
+    props = {"src": url, "alt": alt}
+    index = settings.active.images
+    info = index.get(url) if index is not None else None
+    if info is not None:
+        props["width"] = str(info.width)
+        props["height"] = str(info.height)
+        if info.srcset:
+            props["srcset"] = ", ".join(f"{src} {width}w" for src, width in info.srcset)
+            props["sizes"] = f"(max-width: {info.width}px) 100vw, {info.width}px"
+    props["loading"] = "lazy"
+    props["decoding"] = "async"
+    return props
@@ -1,70 +1,414 @@
 import sys
-import shutil
 import os
+import argparse
+import logging
 from .sitegen import generate_page
+from .manifest import Manifest, hash_file, combine_hashes
+from .parallel import render_pages, default_jobs, merge_cache_delta
+from .profiler import Profiler
+from .static_sync import sync_directory
+from .pipeline import build_pipelined, DEFAULT_QUEUE_SIZE, DEFAULT_IO_THREADS
+from . import block_cache
+from . import highlight
+from . import images
+from . import nav
+from . import settings
+from . import template
+from .precompress import precompress_outputs
+from .search import build_search_index
+from .aggregates import POSTS_PER_PAGE, build_aggregates
+from . import page_index
+from .page_index import build_page_index
 
+logger = logging.getLogger(__name__)
 
-def copy_static_directory(source, destination):
-    print(f"Copying from {source} to {destination}") # A helpful log
 
-    if os.path.exists(destination):
-        shutil.rmtree(destination)
-        
-    print(f"Creating destination directory: {destination}")
-    os.makedirs(destination) # os.makedirs is useful for creating nested directories
+def copy_static_directory(source, destination, manifest=None, stats=None, link=False, checksum=False, outputs=None,
+                          minify=False):
+    """
+    Copy the static files into the output directory, transferring only
+    files whose size and mtime changed. An incremental build (with a
+    manifest) removes files that were deleted from source; a full build
+    collects every destination into outputs so remove_unlisted_outputs
+    can clear the rest afterwards.
+    """
+    logger.debug("Copying from %s to %s", source, destination)
 
-    for item in os.listdir(source):
-        source_item_path = os.path.join(source, item)
-        destination_item_path = os.path.join(destination, item) # Need a destination path too
+    counts = sync_directory(source, destination, manifest, link=link, checksum=checksum, outputs=outputs,
+                            minify=minify)
 
-        if os.path.isfile(source_item_path):
-            print(f"Copying file: {source_item_path} to {destination_item_path}") # Add log here
-            shutil.copy(source_item_path, destination_item_path)
-        else:
-            print(f"Entering directory: {source_item_path}") # Add another log
-            copy_static_directory(source_item_path, destination_item_path)
+    if stats is not None:
+        stats["skipped"] += counts["skipped"]
+        written = counts["copied"] + counts["reflinked"] + counts["linked"] + counts["minified"]
+        stats["rebuilt"] += written
+        # Static files are only written when they differ from the output
+        stats["changed"] += written
 
-def generate_pages_recursive(source_dir, basepath):
-    for item in os.listdir(source_dir):
-        source_path = os.path.join(source_dir, item)
-        
+def generate_pages_recursive(source_dir, basepath, manifest=None, stats=None, jobs=1, page_profiler=None,
+                             pipeline=None, outputs=None):
+    pages = collect_pages(source_dir)
+    if outputs is not None:
+        outputs.update(os.path.normpath(page.destination) for page in pages)
+    set_up_nav(pages, manifest)
+    build_pages(pages, basepath, manifest, stats, jobs, page_profiler, pipeline)
+    return pages
 
-        if os.path.isfile(source_path):
-            if source_path.endswith(".md"):
-                destination_path = source_path.replace("content", OUTPUT_DIR_PATH).replace(".md", ".html")
-                
-                destination_dir = os.path.dirname(destination_path)
-                os.makedirs(destination_dir, exist_ok=True)
 
-                generate_page(source_path, "template.html", destination_path, basepath)
-                          
-        else:
-            generate_pages_recursive(source_path, basepath)
+def collect_pages(source_dir):
+    """Return the Page index for every .md file under source_dir."""
+    return build_page_index(source_dir, OUTPUT_DIR_PATH)
+
+
+def page_destination(source_path):
+    return page_index.page_destination(source_path, CONTENT_DIR_PATH, OUTPUT_DIR_PATH)
+
+
+def static_destination(source_path):
+    return os.path.join(OUTPUT_DIR_PATH, os.path.relpath(source_path, STATIC_DIR_PATH))
+
+
+def build_pages(pages, basepath, manifest=None, stats=None, jobs=1, page_profiler=None, pipeline=None):
+    """
+    Render the given Pages, skipping those the manifest shows as current
+    (by cached size and mtime first, then by content hash). With jobs > 1 rendering is spread across a
+    process pool; failures are reported per page once every page has run.
+    Stage timings are collected into page_profiler when one is given.
+    pipeline, a dict of queue_size and io_threads, switches to the build
+    that overlaps reads, rendering and writes (not profiled).
+    """
+    stale = []
+    for page in pages:
+        source_path, destination_path = page.source, page.destination
+        digest = fingerprint = None
+        if manifest is not None:
+            fingerprint = combine_hashes(page.fingerprint(), manifest.context)
+            if manifest.is_unmodified(source_path, fingerprint, destination_path):
+                count_build(stats, "skipped")
+                continue
+            digest = combine_hashes(hash_file(source_path), manifest.context)
+            if manifest.is_current(source_path, digest, destination_path):
+                # Touched but not changed; remember the new stat
+                manifest.record(source_path, digest, destination_path, fingerprint)
+                count_build(stats, "skipped")
+                continue
+        stale.append((source_path, destination_path, digest, fingerprint))
+
+    changed = 0
+    if pipeline is not None:
+        errors, changed = build_pipelined([(source_path, destination_path) for source_path, destination_path, _, _ in stale],
+                                          TEMPLATE_PATH, basepath, jobs, **pipeline)
+    elif jobs > 1:
+        tasks = [(source_path, TEMPLATE_PATH, destination_path, basepath, page_profiler is not None)
+                 for source_path, destination_path, _, _ in stale]
+        errors = {}
+        for source_path, error, profile, page_changed, cached in render_pages(tasks, jobs):
+            merge_cache_delta(cached)
+            if error is not None:
+                errors[source_path] = error
+            if profile is not None:
+                page_profiler.merge(profile)
+            changed += page_changed
+    else:
+        errors = {}
+        for source_path, destination_path, _, _ in stale:
+            if page_profiler is not None:
+                with page_profiler.page(source_path):
+                    changed += generate_page(source_path, TEMPLATE_PATH, destination_path, basepath)
+            else:
+                changed += generate_page(source_path, TEMPLATE_PATH, destination_path, basepath)
+
+    for source_path, destination_path, digest, fingerprint in stale:
+        if source_path in errors:
+            logger.error("Failed to generate %s: %s", source_path, errors[source_path])
+            count_build(stats, "failed")
+            continue
+        if manifest is not None:
+            manifest.record(source_path, digest, destination_path, fingerprint)
+        count_build(stats, "rebuilt")
+
+    if stats is not None:
+        stats["changed"] += changed
+
+
+def count_build(stats, key):
+    if stats is not None:
+        stats[key] += 1
+
+
+def remove_stale_outputs(manifest):
+    for path in manifest.prune():
+        if os.path.isfile(path):
+            logger.info("Removing stale output: %s", path)
+            os.remove(path)
+
+
+def set_up_images(manifest=None, outputs=None, jobs=1, link=False):
+    """
+    Index the static images into the render settings and write their
+    resized copies. Image sizes end up in every img tag, so they are
+    folded into what pages and cached blocks are keyed on.
+    """
+    index = images.process_images(STATIC_DIR_PATH, OUTPUT_DIR_PATH, outputs, jobs, link, manifest=manifest)
+    settings.active.images = index
+    if manifest is not None:
+        manifest.context = combine_hashes(manifest.context, index.digest)
+    if settings.active.block_cache is not None:
+        settings.active.block_cache.context = index.digest
+
+
+def set_up_nav(pages, manifest=None):
+    """
+    Build the site navigation from the top-level pages into the render
+    settings. Every page shows it, so it is folded into what pages are
+    keyed on.
+    """
+    settings.active.nav_html = nav.nav_html(nav.nav_links(pages, OUTPUT_DIR_PATH))
+    if manifest is not None:
+        manifest.context = combine_hashes(manifest.context, settings.active.nav_html)
+
+
+def remove_unlisted_outputs(output_dir, outputs):
+    """
+    Delete every file under output_dir that this build did not produce,
+    then any directories left empty. Full builds write over the previous
+    output instead of wiping it, so unchanged files keep their mtime.
+    """
+    for directory, _, files in os.walk(output_dir, topdown=False):
+        for name in files:
+            path = os.path.join(directory, name)
+            if os.path.normpath(path) not in outputs:
+                logger.info("Removing stale output: %s", path)
+                os.remove(path)
+        if directory != output_dir and not os.listdir(directory):
+            os.rmdir(directory)
+
 
 STATIC_DIR_PATH = "./static"
+CONTENT_DIR_PATH = "content"
 # PUBLIC_DIR_PATH = "./public" (for testing purposes)
 OUTPUT_DIR_PATH = "./docs"
+TEMPLATE_PATH = "template.html"
 
 
+def positive_int(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
 
 
-def main():
-    if len(sys.argv) > 1:
-        basepath = sys.argv[1]
-    else:
-        basepath = "/"
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Build the static site")
+    parser.add_argument("basepath", nargs="?", default="/")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="only rebuild pages and static files whose inputs changed",
+    )
+    parser.add_argument(
+        "--block-cache",
+        action="store_true",
+        help="reuse rendered blocks within the build and across builds",
+    )
+    parser.add_argument(
+        "--block-cache-size",
+        type=int,
+        default=block_cache.DEFAULT_MAX_ENTRIES,
+        help="maximum number of cached blocks",
+    )
+    parser.add_argument(
+        "--stream-threshold",
+        type=float,
+        default=settings.DEFAULT_STREAM_THRESHOLD_BYTES / (1024 * 1024),
+        help="render sources of at least this many MB block by block",
+    )
+    parser.add_argument(
+        "--link",
+        action="store_true",
+        help="reflink or hard link static files instead of copying when possible",
+    )
+    parser.add_argument(
+        "--checksum",
+        action="store_true",
+        help="compare static files by content rather than size and mtime",
+    )
+    parser.add_argument(
+        "--minify",
+        action="store_true",
+        help="strip layout whitespace from the template and minify stylesheets",
+    )
+    parser.add_argument(
+        "--precompress",
+        action="store_true",
+        help="write .gz (and .br with brotli installed) next to text outputs",
+    )
+    parser.add_argument(
+        "--search",
+        action="store_true",
+        help="write a prefix-sharded search index to search/ in the output",
+    )
+    parser.add_argument(
+        "--listings",
+        action="store_true",
+        help="generate paginated blog index pages under blog/",
+    )
+    parser.add_argument(
+        "--posts-per-page",
+        type=positive_int,
+        default=POSTS_PER_PAGE,
+        help="posts on each blog index page",
+    )
+    parser.add_argument(
+        "--site-url",
+        help="absolute URL the site is served at, basepath included; enables rss.xml and sitemap.xml",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="render pages across N worker processes (0 uses every core)",
+    )
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="overlap reading, rendering and writing pages",
+    )
+    parser.add_argument(
+        "--queue-size",
+        type=positive_int,
+        default=DEFAULT_QUEUE_SIZE,
+        help="pages buffered between pipeline stages before they block",
+    )
+    parser.add_argument(
+        "--io-threads",
+        type=positive_int,
+        default=DEFAULT_IO_THREADS,
+        help="threads reading and writing files in --pipeline mode",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="report time and allocations per pipeline stage and per page (not with --pipeline)",
+    )
+    parser.add_argument(
+        "--profile-top",
+        type=int,
+        default=10,
+        help="number of slowest pages to list with --profile",
+    )
+    parser.add_argument(
+        "--trace",
+        default="profile-trace.json",
+        help="Chrome trace-event file written with --profile",
+    )
+    verbosity = parser.add_mutually_exclusive_group()
+    verbosity.add_argument("-v", "--verbose", action="store_true", help="log every file")
+    verbosity.add_argument("-q", "--quiet", action="store_true", help="only log errors")
+    args = parser.parse_args(argv)
+    if args.profile and args.pipeline:
+        # The pipelined build overlaps the stages across threads and
+        # processes, so there are no per-page stage timings to report
+        parser.error("--profile cannot time a --pipeline build; drop one of them")
+    return args
 
-    copy_static_directory(STATIC_DIR_PATH, OUTPUT_DIR_PATH)
 
-    generate_page("content/index.md", "template.html", os.path.join(OUTPUT_DIR_PATH, "index.html"), basepath)
+def configure_logging(verbose, quiet):
+    level = logging.INFO
+    if verbose:
+        level = logging.DEBUG
+    elif quiet:
+        level = logging.ERROR
+    logging.basicConfig(level=level, format="%(message)s", force=True)
 
-    generate_pages_recursive("content", basepath)
 
-if __name__ == "__main__":
-    main()
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == "serve":
+        from .server import serve_main
+        serve_main(argv[1:])
+        return
+
+    args = parse_args(argv)
+    basepath = args.basepath
+    configure_logging(args.verbose, args.quiet)
+
+    manifest = None
+    if args.incremental:
+        manifest = Manifest.load()
+        # Everything a page depends on besides its own source
+        manifest.context = combine_hashes(template.template_digest(TEMPLATE_PATH), basepath, f"minify={args.minify}")
+    jobs = args.jobs if args.jobs > 0 else default_jobs()
+    stats = {"rebuilt": 0, "skipped": 0, "failed": 0, "changed": 0}
+    page_profiler = Profiler() if args.profile else None
+    render_settings = settings.configure(settings.RenderSettings(
+        stream_threshold=int(args.stream_threshold * 1024 * 1024),
+        minify=args.minify,
+        # Workers share the on-disk half of the cache, so snippets highlighted
+        # by one are reused by the others and by later builds
+        highlight=highlight.HighlightCache(highlight.HIGHLIGHT_CACHE_DIR),
+    ))
+    if args.block_cache:
+        # Workers get a copy and send the blocks they render back with
+        # each page to be saved
+        render_settings.block_cache = block_cache.BlockCache.load(max_entries=args.block_cache_size)
+
+    # Without a manifest, anything in the output this build does not
+    # produce is removed at the end
+    outputs = set() if manifest is None else None
+    copy_static_directory(STATIC_DIR_PATH, OUTPUT_DIR_PATH, manifest, stats, args.link, args.checksum, outputs,
+                          args.minify)
+    set_up_images(manifest, outputs, jobs, args.link)
 
+    pipeline = None
+    if args.pipeline:
+        pipeline = {"queue_size": args.queue_size, "io_threads": args.io_threads}
 
+    pages = generate_pages_recursive(CONTENT_DIR_PATH, basepath, manifest, stats, jobs, page_profiler, pipeline, outputs)
 
+    if args.search:
+        shards = build_search_index(pages, OUTPUT_DIR_PATH, basepath, outputs=outputs)
+        logger.info("Search index: rewrote %d shards", shards)
 
+    if args.listings or args.site_url:
+        built = build_aggregates(pages, CONTENT_DIR_PATH, OUTPUT_DIR_PATH, TEMPLATE_PATH, basepath, args.site_url,
+                                 args.listings, args.posts_per_page, outputs=outputs)
+        logger.info("Built %d listing, feed and sitemap files", built)
 
+    if manifest is not None:
+        remove_stale_outputs(manifest)
+        manifest.save()
 
+    if args.precompress:
+        # After the stale outputs are gone, so their siblings go too; on a
+        # full build, before the unlisted ones are, so siblings are kept
+        compressed = precompress_outputs(OUTPUT_DIR_PATH, outputs, jobs)
+        logger.info("Compressed %d files", compressed)
+
+    if manifest is None:
+        remove_unlisted_outputs(OUTPUT_DIR_PATH, outputs)
+
+    logger.info("Rebuilt %d files, skipped %d", stats["rebuilt"], stats["skipped"])
+    logger.info("%d output files changed on disk", stats["changed"])
+
+    if render_settings.block_cache is not None:
+        cache = render_settings.block_cache
+        logger.info("Block cache: %d hits, %d misses", cache.hits, cache.misses)
+        cache.save()
+
+    pruned = render_settings.highlight.prune()
+    if pruned:
+        logger.debug("Pruned %d highlighted snippets from the cache", pruned)
+
+    if page_profiler is not None:
+        for line in page_profiler.report(args.profile_top):
+            logger.info(line)
+        page_profiler.write_trace(args.trace)
+        logger.info("Wrote trace to %s", args.trace)
+
+    if stats["failed"]:
+        logger.error("%d pages failed to build", stats["failed"])
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import hashlib
+import json
+import os
+
+
+MANIFEST_PATH = "./.ssg-manifest.json"
+
+
+def hash_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_file(path):
+    """Return the sha256 hex digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def combine_hashes(*parts):
+    """Fold several digests (or plain strings like the basepath) into one."""
+    return hash_bytes("\0".join(parts).encode("utf-8"))
+
+
+class Manifest:
+    """
+    On-disk record of the input hashes each output was built from.
+
+    Entries map a key (usually the source path) to a digest and the output
+    path it produced. An output is considered current when its digest
+    matches and the output file still exists.
+    """
+
+    def __init__(self, path=MANIFEST_PATH, entries=None):
+        self.path = path
+        self.entries = entries if entries is not None else {}
+        self.seen = set()
+        # Digest of the build-wide inputs (template, basepath) folded into
+        # every page digest
+        self.context = ""
+
+    @classmethod
+    def load(cls, path=MANIFEST_PATH):
+        try:
+            with open(path) as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            # Missing or corrupt manifest just means a full rebuild
+            entries = {}
+
+        if not isinstance(entries, dict):
+            entries = {}
+
+        return cls(path, entries)
+
+    def is_current(self, key, digest, dest_path):
+        self.seen.add(key)
+        entry = self.entries.get(key)
+        if entry is None:
+            return False
+        return entry.get("digest") == digest and os.path.exists(dest_path)
+
+    def is_unmodified(self, key, fingerprint, dest_path):
+        """
+        Cheap check against the fingerprint (e.g. size and mtime) recorded
+        with the last digest, so unchanged files need not be hashed.
+        """
+        self.seen.add(key)
+        entry = self.entries.get(key)
+        if entry is None or entry.get("fingerprint") is None:
+            return False
+        return entry["fingerprint"] == fingerprint and os.path.exists(dest_path)
+
+    def record(self, key, digest, dest_path, fingerprint=None):
+        self.seen.add(key)
+        self.entries[key] = {"digest": digest, "dest": dest_path}
+        if fingerprint is not None:
+            self.entries[key]["fingerprint"] = fingerprint
+
+    def prune(self):
+        """
+        Drop entries that were not checked during this run and return the
+        output paths they pointed at, so the caller can remove them.
+        """
+        stale = [key for key in self.entries if key not in self.seen]
+        removed = []
+        for key in stale:
+            removed.append(self.entries.pop(key)["dest"])
+        return removed
+
+    def save(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.entries, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
@@ -1,32 +1,168 @@
+import io
 import re
+from src.blocktype import BlockType, classify_lines, is_fence_opener
+
+
+IMAGE_PATTERN = re.compile(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)")
+LINK_PATTERN = re.compile(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)")
 
 
 def extract_markdown_images(text):
-    matches = re.findall(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)", text)
+    # Text without "![" cannot contain an image; skip the regex entirely
+    if "![" not in text:
+        return []
+    matches = IMAGE_PATTERN.findall(text)
     return matches
 
 
 def extract_markdown_links(text):
-    matches = re.findall(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)", text)
+    if "[" not in text:
+        return []
+    matches = LINK_PATTERN.findall(text)
     return matches
 
 
+def find_markdown_images(text):
+    """Return (start, end, alt, url) for every image, so callers can slice."""
+    if "![" not in text:
+        return []
+    return [(match.start(), match.end(), match.group(1), match.group(2))
+            for match in IMAGE_PATTERN.finditer(text)]
+
+
+def find_markdown_links(text):
+    """Return (start, end, text, url) for every link, so callers can slice."""
+    if "[" not in text:
+        return []
+    return [(match.start(), match.end(), match.group(1), match.group(2))
+            for match in LINK_PATTERN.finditer(text)]
+
+
 
 def markdown_to_blocks(markdown):
-    # Split by double newlines and clean up each block
-    blocks = [block.strip() for block in markdown.split("\n\n") if block.strip()]
+    # Blocks are separated by blank lines; fenced code keeps its blank lines
+    return [block.text for block in scan_blocks(markdown.split("\n"))]
+
+
+class Block:
+    """A block of markdown with its type and lines already worked out."""
 
-    return blocks
+    __slots__ = ("block_type", "lines", "_text")
+
+    def __init__(self, block_type, lines):
+        self.block_type = block_type
+        self.lines = lines
+        self._text = None
+
+    @property
+    def text(self):
+        if self._text is None:
+            self._text = "\n".join(self.lines)
+        return self._text
+
+    def __eq__(self, other):
+        return self.block_type == other.block_type and self.lines == other.lines
+
+    def __repr__(self):
+        return f"Block({self.block_type.value}, {self.lines})"
+
+
+def scan_blocks(lines):
+    """
+    Group an iterable of lines into typed Blocks in a single pass.
+
+    Blank lines separate blocks, except inside a fenced code block, which
+    runs from a ``` line (see is_fence_opener) to the next line that is just ```,
+    or to the end of the input when it is never closed.
+    Like the old split on blank lines, the first line of a block loses its
+    leading whitespace and the last line its trailing whitespace. Accepts
+    any iterable, so a file object can be scanned without reading it all.
+    """
+    current = []
+    in_fence = False
+
+    for line in lines:
+        if line.endswith("\n"):
+            line = line[:-1]
+
+        if in_fence:
+            current.append(line)
+            if line.strip() == "```":
+                in_fence = False
+                yield make_block(current, BlockType.code)
+                current = []
+            continue
+
+        if not line.strip():
+            if current:
+                yield make_block(current)
+                current = []
+            continue
+
+        if not current:
+            line = line.lstrip()
+            if is_fence_opener(line):
+                in_fence = True
+        current.append(line)
+
+    if in_fence:
+        # An unclosed fence runs to the end, so close it after the last
+        # line of code for the block to render like any other code block
+        while len(current) > 1 and not current[-1].strip():
+            current.pop()
+        current.append("```")
+        yield make_block(current, BlockType.code)
+    elif current:
+        yield make_block(current)
+
+
+def make_block(lines, block_type=None):
+    lines[-1] = lines[-1].rstrip()
+    if block_type is None:
+        block_type = classify_lines(lines)
+    return Block(block_type, lines)
 
 
 def extract_title(markdown):
-    lines = markdown.split("\n")
+    # Lines are produced lazily, so only the text up to the title is split
+    return find_title(io.StringIO(markdown))
+
+
+def h1_text(line):
+    """The text of line if it is a non-empty h1, else None."""
+    if line.startswith("#") and not line.startswith("##"):
+        return line[1:].strip() or None
+    return None
+
+
+class TitleWatcher:
+    """
+    Passes lines through while noting the first h1 by find_title's rule,
+    for callers that group the same lines into blocks. Starts from title
+    when one is already known, e.g. from front matter.
+    """
+
+    __slots__ = ("title",)
+
+    def __init__(self, title=None):
+        self.title = title
+
+    def watch(self, lines):
+        for line in lines:
+            if self.title is None:
+                self.title = h1_text(line)
+            yield line
+
 
+def find_title(lines):
+    """
+    Return the text of the first h1 in an iterable of lines, stopping as
+    soon as it is found, so an open file is only read up to the title.
+    """
     for line in lines:
-        if line.startswith("#") and not line.startswith("##"):
-            title = line[1:].strip()
-            if title:
-                return title
+        title = h1_text(line)
+        if title:
+            return title
 
     else:
         raise ValueError("No header found")
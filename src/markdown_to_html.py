@@ -1,9 +1,14 @@
-from src.htmlnode import HTMLNode, ParentNode
-from src.textnode import TextNode, TextType
+from src import htmlnode
+from src.htmlnode import HTMLNode, ParentNode, RawHTMLNode
 from src.split_nodes import text_to_textnodes
 from src.blocktype import BlockType, block_to_block_type
 from src.text_node_to_html_node import text_node_to_html_node
-from src.markdown import markdown_to_blocks
+from src.markdown import scan_blocks
+from src import profiler
+from src import highlight
+from src import settings
+from src.block_cache import block_key
+from src.toc import Outline
 
 
 def text_to_children(text):
@@ -19,7 +24,8 @@ def text_to_children(text):
 
     # Step 1: Convert the text to TextNode objects
 
-    text_nodes = text_to_textnodes(text)
+    with profiler.stage("inline_parse", trace=False):
+        text_nodes = text_to_textnodes(text)
 
     # Step 2: Convert each TextNode to an HTMLNode
 
@@ -31,18 +37,22 @@ def text_to_children(text):
     return html_nodes
 
 
-def paragraph_to_html_node(block):
+def paragraph_to_html_node(block, lines=None):
     """
     Convert a paragraph block to an HTMLNode
 
     Args:
         block (str): The paragraph text
+        lines (list, optional): The block already split into lines
 
     Returns:
         HTMLNode: An HTMLNode representing the paragraph
     """
 
-    text = block.replace("\n", " ")
+    if lines is None:
+        text = block.replace("\n", " ")
+    else:
+        text = " ".join(lines)
 
     # Create children nodes from the paragraph text
 
@@ -53,12 +63,14 @@ def paragraph_to_html_node(block):
     return ParentNode("p", children)
 
 
-def heading_to_html_node(block):
+def heading_to_html_node(block, outline=None):
     """
     Convert a heading block to an HTMLNode
 
     Args:
         block (str): The heading text including # characters
+        outline (Outline, optional): The page's outline; the heading is
+            added to it and given the id it returns
 
     Returns:
         HTMLNode: An HTMLNode representing the heading
@@ -83,19 +95,38 @@ def heading_to_html_node(block):
 
     # Create children nodes from the heading text
 
-    children = text_to_children(content)
+    if outline is None:
+        return ParentNode(f"h{level}", text_to_children(content))
+
+    # The slug comes from the same text nodes the children are built from
+    with profiler.stage("inline_parse", trace=False):
+        text_nodes = text_to_textnodes(content)
+    heading_id = outline.add(level, "".join(text_node.text for text_node in text_nodes))
+    children = [text_node_to_html_node(text_node) for text_node in text_nodes]
 
     # Create and return the appropriate heading HTMLNode
 
-    return ParentNode(f"h{level}", children)
+    return ParentNode(f"h{level}", children, {"id": heading_id})
 
 
-def code_block_to_html_node(block):
+def code_language(fence):
+    """The language tag after an opening ``` fence, or "" when there is none."""
+    info = fence.strip().lstrip("`")
+    if "`" in info:
+        return ""
+    words = info.strip("{} \t").split()
+    return words[0].lstrip(".") if words else ""
+
+
+def code_block_to_html_node(block, lines=None):
     """
-    Convert a code block to an HTMLNode
+    Convert a code block to an HTMLNode. The code of a block tagged with
+    a language the highlighter knows is highlighted, through the active
+    highlight cache.
 
     Args:
         block (str): The code block text including the ``` markers
+        lines (list, optional): The block already split into lines
 
     Returns:
         HTMLNode: An HTMLNode representing the code block
@@ -104,28 +135,39 @@ def code_block_to_html_node(block):
     # Remove the ``` markers and get the content
     # The content starts after the first line and ends before the last line
 
-    lines = block.split("\n")
+    if lines is None:
+        lines = block.split("\n")
     if len(lines) >= 2:
         # Skip the first and last lines which contain ```
         content = "\n".join(lines[1:-1]) + "\n"
     else:
         content = ""
 
-    # Directly create the code node
-    text_node = TextNode(content, TextType.TEXT)
-    code_node = ParentNode("code", [text_node_to_html_node(text_node)])
+    language = code_language(lines[0]) if lines else ""
+    code_html = None
+    if language:
+        with profiler.stage("highlight", trace=False):
+            code_html = highlight.highlight_code(content, language, settings.active.highlight)
+    if code_html is None:
+        # Escaped once here, so writing the page does no per-call escaping
+        # of what is often the bulk of its text
+        code_html = htmlnode.escape_text(content)
+
+    props = {"class": f"language-{language}"} if language else None
+    code_node = ParentNode("code", [RawHTMLNode(code_html)], props)
 
     # Wrap the code node in a pre node
 
     return ParentNode("pre", [code_node])
 
 
-def quote_to_html_node(block):
+def quote_to_html_node(block, lines=None):
     """
     Convert a quote block to an HTMLNode
 
     Args:
         block (str): The quote text including the > markers
+        lines (list, optional): The block already split into lines
 
     Returns:
         HTMLNode: an HTMLNode representing the blockquote
@@ -133,7 +175,8 @@ def quote_to_html_node(block):
 
     # Remove the > marker and any leading/trailing whitespace from each line
 
-    lines = block.split("\n")
+    if lines is None:
+        lines = block.split("\n")
     cleaned_lines = []
 
     for line in lines:
@@ -160,12 +203,13 @@ def quote_to_html_node(block):
     return ParentNode("blockquote", children)
 
 
-def unordered_list_to_html_node(block):
+def unordered_list_to_html_node(block, lines=None):
     """
     Convert an unordered list block to an HTMLNode
 
     Args:
         block (str): The list text with items marked by -, *, or +
+        lines (list, optional): The block already split into lines
 
     Returns:
         HTMLNode: An HTMLNode representing the unordered list
@@ -173,7 +217,8 @@ def unordered_list_to_html_node(block):
 
     # Split the block into lines
 
-    lines = block.split("\n")
+    if lines is None:
+        lines = block.split("\n")
 
     # Create a list to hold the li nodes
 
@@ -217,12 +262,13 @@ def unordered_list_to_html_node(block):
     return ParentNode("ul", list_items)
 
 
-def ordered_list_to_html_node(block):
+def ordered_list_to_html_node(block, lines=None):
     """
     Convert an ordered list block to an HTMLNode
 
     Args:
         block (str): The list text with items marked by numbers (e.g., 1., 2., etc.)
+        lines (list, optional): The block already split into lines
 
     Returns:
         HTMLNode: An HTMLNode representing the ordered list
@@ -230,7 +276,8 @@ def ordered_list_to_html_node(block):
 
     # Split the block into lines
 
-    lines = block.split("\n")
+    if lines is None:
+        lines = block.split("\n")
 
     # Create a list to hold the li nodes
 
@@ -273,13 +320,53 @@ def ordered_list_to_html_node(block):
     return ParentNode("ol", list_items)
 
                                            
-def markdown_to_html_node(markdown):
+def block_to_html_node(block, lines=None, block_type=None, outline=None):
+    """
+    Convert a single markdown block to an HTMLNode
+
+    Args:
+        block (str): The block text
+        lines (list, optional): The block already split into lines
+        block_type (BlockType, optional): The block's type, if already known
+        outline (Outline, optional): Collects headings and gives them ids
+
+    Returns:
+        HTMLNode: An HTMLNode for the block's type
+    """
+
+    # Determine the type of block
+
+    if block_type is None:
+        block_type = block_to_block_type(block)
+    # For debugging, print (f"Block type: {block_type} for: {block[:30]}...")
+
+    # Based on the type, call the appropriate handler function
+
+    if block_type == BlockType.paragraph:
+        return paragraph_to_html_node(block, lines)
+    elif block_type == BlockType.heading:
+        return heading_to_html_node(block, outline)
+    elif block_type == BlockType.code:
+        return code_block_to_html_node(block, lines)
+    elif block_type == BlockType.quote:
+        return quote_to_html_node(block, lines)
+    elif block_type == BlockType.unordered_list:
+        return unordered_list_to_html_node(block, lines)
+    elif block_type == BlockType.ordered_list:
+        return ordered_list_to_html_node(block, lines)
+
+
+def markdown_to_html_node(markdown, cache=None, outline=None):
     # For debugging, print("Function called with:", markdown[:30] + "...")
     """
     Convert a markdown string to an HTMLNode
 
     Args:
         markdown (str): The markdown text to convert
+        cache (BlockCache, optional): Rendered fragments keyed by block hash;
+            blocks found there are reused instead of parsed again
+        outline (Outline, optional): Filled with the page's headings, for a
+            table of contents; headings get unique ids either way
 
     Returns:
         ParentNode: A ParentNode representing the entire markdown document
@@ -291,56 +378,59 @@ def markdown_to_html_node(markdown):
 
     # Split the markdown into blocks
 
-    blocks = markdown_to_blocks(markdown)
+    with profiler.stage("block_split"):
+        blocks = list(scan_blocks(markdown.split("\n")))
     # For debugging, print(f"Number of blocks found: {len(blocks)}")
-    for i, block in enumerate(blocks):
-        # For debugging, print(f"Block {i}: {block[:30]}...")
-        pass
 
-    # Process each block
+    # Process each block; headings are collected into the outline as
+    # they are rendered
 
+    if outline is None:
+        outline = Outline()
     for block in blocks:
-        # Determine the type of block
-
-        block_type = block_to_block_type(block)
-        # For debugging, print (f"Block type: {block_type} for: {block[:30]}...")
-
-        # Based on the type, call the appropriate handler function
-
-        if block_type == BlockType.paragraph:
-            children.append(paragraph_to_html_node(block))
-        elif block_type == BlockType.heading:
-            children.append(heading_to_html_node(block))
-        elif block_type == BlockType.code:
-            children.append(code_block_to_html_node(block))
-        elif block_type == BlockType.quote:
-            children.append(quote_to_html_node(block))
-        elif block_type == BlockType.unordered_list:
-            children.append(unordered_list_to_html_node(block))
-        elif block_type == BlockType.ordered_list:
-            children.append(ordered_list_to_html_node(block))
-
-
+        children.append(scanned_block_to_html_node(block, cache, outline))
 
     # For debugging, print(f"Number of children created: {len(children)}")
     return ParentNode("div", children)
 
 
+def scanned_block_to_html_node(block, cache=None, outline=None):
+    """
+    Convert a Block from scan_blocks to an HTMLNode, reusing the rendered
+    fragment from cache when there is one. Headings are never cached when
+    there is an outline, as their ids depend on the rest of the page.
+    """
 
+    if cache is None or (outline is not None and block.block_type == BlockType.heading):
+        return block_to_html_node(block.text, block.lines, block.block_type, outline)
 
+    key = block_key(block.text, cache.context)
+    fragment = cache.get(key)
+    if fragment is None:
+        fragment = block_to_html_node(block.text, block.lines, block.block_type).to_html()
+        cache.put(key, fragment)
 
+    return RawHTMLNode(fragment)
 
 
+def write_markdown_html(lines, write, cache=None, outline=None):
+    """
+    Stream the HTML for markdown read line by line, writing each block as
+    soon as it is rendered. Produces the same output as
+    markdown_to_html_node(...).write_html(write), but only one block is
+    held in memory at a time, however large the document.
 
+    Args:
+        lines (iterable): Lines of markdown, e.g. an open file
+        write (callable): Receives the HTML fragments in order
+        cache (BlockCache, optional): Rendered fragments keyed by block hash
+        outline (Outline, optional): Filled with the headings as they are
+            written
+    """
 
-
-
-
-
-
-
-
-
-
-
-
+    if outline is None:
+        outline = Outline()
+    write("<div>")
+    for block in scan_blocks(lines):
+        scanned_block_to_html_node(block, cache, outline).write_html(write)
+    write("</div>")
@@ -0,0 +1,109 @@
+import json
+import logging
+import os
+
+from .frontmatter import front_matter_date, read_header
+from .page_index import page_url
+from .sitegen import page_date
+
+logger = logging.getLogger(__name__)
+
+METADATA_PATH = "./.ssg-cache/metadata.json"
+# Bump whenever what is read from a page changes, so stored entries are reread
+STORE_VERSION = 2
+
+
+class PageMeta:
+    """What listings, feeds and sitemaps need to know about a page."""
+
+    __slots__ = ("source", "url", "title", "date", "summary")
+
+    FIELDS = ("url", "title", "date", "summary")
+
+    def __init__(self, source, url, title, date, summary=""):
+        self.source = source
+        self.url = url
+        self.title = title
+        self.date = date
+        self.summary = summary
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    @classmethod
+    def from_dict(cls, source, data):
+        return cls(source, *(data.get(field) for field in cls.FIELDS))
+
+    def __eq__(self, other):
+        return isinstance(other, PageMeta) and self.source == other.source and self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return f"PageMeta({self.source}, {self.title}, {self.date})"
+
+
+class MetadataStore:
+    """
+    PageMeta for every page, kept between builds in a JSON file along
+    with the fingerprint it was read from, so unchanged pages are not
+    read again. aggregates holds the dependency graph of the outputs
+    built from the metadata, and config the settings they were built with.
+    """
+
+    def __init__(self, path=METADATA_PATH, pages=None, aggregates=None, config=""):
+        self.path = path
+        self.pages = pages if pages is not None else {}
+        self.aggregates = aggregates if aggregates is not None else {}
+        self.config = config
+
+    @classmethod
+    def load(cls, path=METADATA_PATH):
+        try:
+            with open(path) as f:
+                data = json.load(f)
+            if data.get("version") != STORE_VERSION:
+                return cls(path)
+            return cls(path, data["pages"], data["aggregates"], data["config"])
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            # Missing or unreadable store just means reading every page
+            return cls(path)
+
+    def save(self):
+        if self.path is None:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"version": STORE_VERSION, "pages": self.pages, "aggregates": self.aggregates, "config": self.config}, f, indent=1)
+        os.replace(tmp_path, self.path)
+
+    def refresh(self, pages, output_dir):
+        """
+        Bring the store up to date with pages and return (metas, changed):
+        the PageMeta of every page, and the sources whose metadata was
+        added, removed or changed since the last build. URLs are
+        root-relative, without the basepath.
+        """
+        metas = []
+        changed = set()
+        entries = {}
+        for page in pages:
+            fingerprint = page.fingerprint()
+            url = page_url(page.destination, output_dir)
+            entry = self.pages.get(page.source)
+
+            if entry is not None and entry["fingerprint"] == fingerprint and entry["url"] == url:
+                meta = PageMeta.from_dict(page.source, entry)
+            else:
+                with open(page.source) as f:
+                    header, title, summary = read_header(f, with_summary=True)
+                date = front_matter_date(header) or page_date(page.source)
+                meta = PageMeta(page.source, url, title, date, summary)
+
+            if entry is None or PageMeta.from_dict(page.source, entry) != meta:
+                changed.add(page.source)
+            entries[page.source] = dict(meta.to_dict(), fingerprint=fingerprint)
+            metas.append(meta)
+
+        changed.update(self.pages.keys() - entries.keys())
+        self.pages = entries
+        return metas, changed
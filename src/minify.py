@@ -0,0 +1,64 @@
+import re
+
+
+# Elements whose text is rendered as written, so their whitespace is kept
+RAW_TEXT_ELEMENT = re.compile(r"<(pre|textarea|script|style)\b.*?</\1\s*>", re.S | re.I)
+# Conditional comments (<!--[if IE]>) carry markup and are kept
+HTML_COMMENT = re.compile(r"<!--(?!\[if).*?-->", re.S)
+# Line breaks and indentation between two tags, or at either end of the text
+TAG_GAP = re.compile(r">\s*\n\s*<")
+LEADING_GAP = re.compile(r"^\s*\n\s*(?=<)")
+TRAILING_GAP = re.compile(r"(?<=>)\s*\n\s*$")
+LINE_BREAK = re.compile(r"\s*\n\s*")
+
+CSS_TOKEN = re.compile(
+    r"""("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')"""  # strings, kept as they are
+    r"|(/\*.*?\*/)"  # comments, dropped
+    r"|\s*([{};,>])\s*"  # punctuation that needs no surrounding space
+    r"|(:)\s+"  # space after a colon; a space before one is a selector combinator
+    r"|(\s+)",  # any other whitespace, collapsed to one space
+    re.S,
+)
+
+
+def minify_html(html):
+    """
+    Drop comments and the line breaks and indentation used to lay out
+    markup. Only whitespace containing a line break is touched, and the
+    contents of pre, textarea, script and style are left alone, so the
+    rendered page does not change.
+    """
+    parts = []
+    pos = 0
+    for match in RAW_TEXT_ELEMENT.finditer(html):
+        parts.append(collapse_whitespace(html[pos:match.start()]))
+        parts.append(match.group(0))
+        pos = match.end()
+    parts.append(collapse_whitespace(html[pos:]))
+    return "".join(parts)
+
+
+def collapse_whitespace(html):
+    html = HTML_COMMENT.sub("", html)
+    html = TAG_GAP.sub("><", html)
+    html = LEADING_GAP.sub("", html)
+    html = TRAILING_GAP.sub("", html)
+    return LINE_BREAK.sub(" ", html)
+
+
+def minify_css(css):
+    """Strip comments and redundant whitespace and semicolons from a stylesheet."""
+
+    def replace(match):
+        string, comment, punctuation, colon, whitespace = match.groups()
+        if string is not None:
+            return string
+        if comment is not None:
+            return ""
+        if punctuation is not None:
+            return punctuation
+        if colon is not None:
+            return colon
+        return " "
+
+    return CSS_TOKEN.sub(replace, css).replace(";}", "}").strip()
@@ -0,0 +1,34 @@
+from .frontmatter import read_header
+from .htmlnode import LeafNode, ParentNode
+from .page_index import page_url
+
+
+def is_top_level(url):
+    """Whether a root-relative page URL is the home page or one level below it."""
+    return "/" not in url.strip("/")
+
+
+def nav_links(pages, output_dir):
+    """
+    (url, title) for the pages at the top of the site, the home page
+    first and the rest by URL. Only the headers of those pages are read;
+    one without a title is listed by its URL.
+    """
+    links = []
+    for page in pages:
+        url = page_url(page.destination, output_dir)
+        if not is_top_level(url):
+            continue
+        with open(page.source) as f:
+            _, title, _ = read_header(f)
+        links.append((url, title or url))
+    links.sort(key=lambda link: (link[0] != "/", link[0]))
+    return links
+
+
+def nav_html(links):
+    """A <nav class="site-nav"> list of the links, or "" when there are none."""
+    if not links:
+        return ""
+    items = [ParentNode("li", [LeafNode("a", title, {"href": url})]) for url, title in links]
+    return ParentNode("nav", [ParentNode("ul", items)], {"class": "site-nav"}).to_html()
@@ -0,0 +1,108 @@
+import os
+import tempfile
+
+
+CHUNK_SIZE = 1 << 16
+
+
+def current_umask():
+    # os.umask can only be read by setting it, so put it straight back
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+# Temporary files are created 0600; outputs get the mode a plain open()
+# would have given them
+FILE_MODE = 0o666 & ~current_umask()
+
+
+def same_contents(path_a, path_b):
+    """Compare two files by size first, then chunk by chunk."""
+    try:
+        if os.path.getsize(path_a) != os.path.getsize(path_b):
+            return False
+    except OSError:
+        return False
+
+    with open(path_a, "rb") as a, open(path_b, "rb") as b:
+        while True:
+            chunk = a.read(CHUNK_SIZE)
+            if chunk != b.read(CHUNK_SIZE):
+                return False
+            if not chunk:
+                return True
+
+
+def replace_if_changed(tmp_path, dest_path):
+    """
+    Move a finished temporary file over dest_path unless dest_path already
+    holds the same bytes, in which case the existing file (and its mtime)
+    is left alone. Returns True when dest_path was replaced.
+    """
+    if same_contents(tmp_path, dest_path):
+        os.remove(tmp_path)
+        return False
+    os.chmod(tmp_path, FILE_MODE)
+    os.replace(tmp_path, dest_path)
+    return True
+
+
+class OutputFile:
+    """
+    Text file writer that only touches the destination when the new
+    contents differ from what is already there:
+
+        with OutputFile(path) as out:
+            out.write(...)
+        out.changed
+
+    Output goes to a temporary file beside the destination, so nothing is
+    held in memory and the destination is swapped in with an atomic rename.
+    If the block raises, the temporary file is discarded and the
+    destination is untouched.
+    """
+
+    def __init__(self, dest_path):
+        self.dest_path = dest_path
+        self.changed = False
+        self.tmp_path = None
+        self.file = None
+
+    def __enter__(self):
+        directory = os.path.dirname(self.dest_path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, self.tmp_path = tempfile.mkstemp(
+            dir=directory, prefix="." + os.path.basename(self.dest_path) + ".", suffix=".tmp"
+        )
+        self.file = os.fdopen(fd, "w")
+        self.write = self.file.write
+        self.writelines = self.file.writelines
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.file.close()
+        if exc_type is not None:
+            os.remove(self.tmp_path)
+            return False
+        self.changed = replace_if_changed(self.tmp_path, self.dest_path)
+        return False
+
+
+def write_text(dest_path, text):
+    """
+    Write an already rendered string to dest_path unless the file holds
+    exactly those bytes already. Returns True when the file was written.
+    """
+    try:
+        if os.path.getsize(dest_path) == len(text.encode()):
+            with open(dest_path) as f:
+                if f.read() == text:
+                    return False
+    except (OSError, ValueError):
+        # Missing or undecodable output is simply rewritten
+        pass
+
+    with OutputFile(dest_path) as out:
+        out.write(text)
+    return out.changed
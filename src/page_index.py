@@ -0,0 +1,83 @@
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+class Page:
+    """A source page, where it is written to, and its stat from discovery."""
+
+    __slots__ = ("source", "destination", "stat")
+
+    def __init__(self, source, destination, stat=None):
+        self.source = source
+        self.destination = destination
+        self.stat = stat
+
+    def fingerprint(self):
+        """Cheap change check from the cached stat: size and mtime."""
+        if self.stat is None:
+            self.stat = os.stat(self.source)
+        return f"{self.stat.st_size}:{self.stat.st_mtime_ns}"
+
+    def __eq__(self, other):
+        return self.source == other.source and self.destination == other.destination
+
+    def __repr__(self):
+        return f"Page({self.source}, {self.destination})"
+
+
+def page_destination(source_path, content_dir, output_dir):
+    """Map content/a/b.md to <output_dir>/a/b.html."""
+    relative = os.path.relpath(source_path, content_dir)
+    return os.path.join(output_dir, os.path.splitext(relative)[0] + ".html")
+
+
+def page_url(destination, output_dir, basepath="/"):
+    """The URL a page is served at: <output_dir>/a/index.html is <basepath>a/."""
+    path = os.path.relpath(destination, output_dir).replace(os.sep, "/")
+    if path == "index.html":
+        path = ""
+    elif path.endswith("/index.html"):
+        path = path[:-len("index.html")]
+    return basepath + path
+
+
+def scan_directory(directory):
+    """List one directory: (markdown files with their stat, subdirectories)."""
+    files = []
+    subdirectories = []
+    with os.scandir(directory) as it:
+        for entry in it:
+            if entry.is_dir():
+                subdirectories.append(entry.path)
+            elif entry.name.endswith(".md"):
+                # DirEntry.stat() reuses what scandir already fetched where
+                # the platform provides it
+                files.append((entry.path, entry.stat()))
+    return files, subdirectories
+
+
+def build_page_index(content_dir, output_dir, jobs=8):
+    """
+    Walk content_dir once and return a Page for every markdown file,
+    sorted by source path with duplicates removed.
+
+    Directories are listed on a thread pool as they are discovered, since
+    scandir spends its time in system calls that release the GIL.
+    """
+    pages = {}
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        running = {pool.submit(scan_directory, content_dir)}
+        while running:
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                files, subdirectories = future.result()
+                for source_path, stat in files:
+                    source_path = os.path.normpath(source_path)
+                    if source_path not in pages:
+                        destination = page_destination(source_path, content_dir, output_dir)
+                        pages[source_path] = Page(source_path, destination, stat)
+                for subdirectory in subdirectories:
+                    running.add(pool.submit(scan_directory, subdirectory))
+
+    return [pages[source_path] for source_path in sorted(pages)]
@@ -0,0 +1,94 @@
+import os
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+from . import settings
+from .sitegen import generate_page
+from .profiler import Profiler
+
+
+def render_page_task(task):
+    """
+    Worker entry point: render one page and report the outcome instead of
+    raising, so one broken page does not take the rest of the batch down.
+
+    Returns (source_path, error, profile, changed, cached); error is None
+    on success, profile is the page's profiler export when profiling was
+    requested, changed is whether the output file was rewritten and cached
+    is what the page added to the worker's block cache (see cache_delta).
+    """
+    source_path, template_path, dest_path, basepath, profile = task
+    page_profiler = Profiler() if profile else None
+    try:
+        if page_profiler is not None:
+            with page_profiler.page(source_path):
+                changed = generate_page(source_path, template_path, dest_path, basepath)
+        else:
+            changed = generate_page(source_path, template_path, dest_path, basepath)
+    except Exception as e:
+        return source_path, f"{type(e).__name__}: {e}\n{traceback.format_exc()}", None, False, cache_delta()
+    return source_path, None, page_profiler.export() if page_profiler else None, changed, cache_delta()
+
+
+def cache_delta():
+    """
+    The fragments and hit counts this worker's block cache gained since the
+    last call, or None. The parent merges them into its own cache, which is
+    the one saved at the end of the build.
+    """
+    cache = settings.active.block_cache
+    if cache is None:
+        return None
+    return cache.drain()
+
+
+def merge_cache_delta(delta):
+    cache = settings.active.block_cache
+    if cache is not None:
+        cache.merge(delta)
+
+
+def worker_settings():
+    """
+    The RenderSettings installed in this process. Workers are handed them
+    through the pool initializer rather than relying on fork to copy them,
+    so spawn and forkserver pools render the same bytes. Anything set on
+    them after the pool starts does not reach its workers.
+    """
+    return settings.active
+
+
+def apply_worker_settings(render_settings):
+    """Pool initializer: install the settings from worker_settings()."""
+    settings.configure(render_settings)
+    if render_settings.block_cache is not None:
+        render_settings.block_cache.track()
+
+
+def render_pool(jobs, mp_context=None):
+    """A process pool whose workers render with this process's settings."""
+    return ProcessPoolExecutor(max_workers=jobs, mp_context=mp_context,
+                               initializer=apply_worker_settings, initargs=(worker_settings(),))
+
+
+def default_jobs():
+    return os.cpu_count() or 1
+
+
+def chunk_size(task_count, jobs):
+    # A few chunks per worker keeps the pool balanced while sending pages
+    # over in batches rather than one IPC round trip per page
+    return max(1, task_count // (jobs * 4))
+
+
+def render_pages(tasks, jobs):
+    """
+    Render (source, template, dest, basepath, profile) tasks across a
+    process pool, yielding render_page_task results in task order.
+    """
+    if not tasks:
+        return
+
+    jobs = min(jobs, len(tasks))
+    with render_pool(jobs) as pool:
+        yield from pool.map(render_page_task, tasks, chunksize=chunk_size(len(tasks), jobs))
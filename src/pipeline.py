@@ -0,0 +1,136 @@
+import asyncio
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from . import settings
+from . import sitegen
+from .parallel import cache_delta, merge_cache_delta, render_pool
+from .output_writer import write_text
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUEUE_SIZE = 32
+DEFAULT_IO_THREADS = 4
+
+
+def read_source(source_path):
+    """Read a source, or return None when it is large enough to stream."""
+    if os.path.getsize(source_path) >= settings.active.stream_threshold:
+        return None
+    with open(source_path) as f:
+        return f.read()
+
+
+def render_or_stream(markdown_content, source_path, template_path, dest_path, basepath):
+    """
+    Render step run on the CPU pool. Returns (result, cached), where
+    cached is what the page added to a worker's block cache. Sources too
+    large to hold in memory are streamed to their output here; for those
+    the result is whether the output changed rather than the page's HTML,
+    and the writers are skipped.
+    """
+    if markdown_content is None:
+        result = sitegen.generate_page_streaming(source_path, template_path, dest_path, basepath)
+    else:
+        result = sitegen.render_page(markdown_content, source_path, template_path, basepath)
+    return result, cache_delta()
+
+
+async def run_pipeline(pages, template_path, basepath, jobs=1,
+                       queue_size=DEFAULT_QUEUE_SIZE, io_threads=DEFAULT_IO_THREADS):
+    """
+    Build (source, destination) pages with reading, rendering and writing
+    overlapped: reader tasks fill a bounded queue that renderers drain into
+    a second bounded queue for the writers. A full queue blocks the stage
+    feeding it, so at most about 2 * queue_size + jobs pages are in memory
+    at once however many pages there are.
+
+    Returns (errors, changed): a dict mapping each failed source path to
+    its error message, and how many output files were actually rewritten.
+    """
+    loop = asyncio.get_running_loop()
+    read_queue = asyncio.Queue(queue_size)
+    write_queue = asyncio.Queue(queue_size)
+    pending = iter(pages)
+    errors = {}
+    changed = 0
+
+    io_pool = ThreadPoolExecutor(max_workers=io_threads)
+    # Rendering is CPU bound; a single thread still overlaps with the I/O
+    # threads, a process pool also spreads it across cores
+    cpu_pool = render_pool(jobs) if jobs > 1 else ThreadPoolExecutor(max_workers=1)
+    renderer_count = max(jobs, 1)
+
+    async def reader():
+        for source_path, dest_path in pending:
+            try:
+                markdown_content = await loop.run_in_executor(io_pool, read_source, source_path)
+            except Exception as e:
+                errors[source_path] = f"{type(e).__name__}: {e}"
+                continue
+            await read_queue.put((source_path, dest_path, markdown_content))
+
+    async def renderer():
+        nonlocal changed
+        while True:
+            item = await read_queue.get()
+            if item is None:
+                return
+            source_path, dest_path, markdown_content = item
+            try:
+                result, cached = await loop.run_in_executor(
+                    cpu_pool, render_or_stream,
+                    markdown_content, source_path, template_path, dest_path, basepath,
+                )
+            except Exception as e:
+                errors[source_path] = f"{type(e).__name__}: {e}"
+                continue
+            merge_cache_delta(cached)
+            if isinstance(result, str):
+                await write_queue.put((source_path, dest_path, result))
+            elif result:
+                changed += 1
+
+    async def writer():
+        nonlocal changed
+        while True:
+            item = await write_queue.get()
+            if item is None:
+                return
+            source_path, dest_path, html = item
+            try:
+                if await loop.run_in_executor(io_pool, write_text, dest_path, html):
+                    changed += 1
+                    logger.debug("Wrote %s", dest_path)
+                else:
+                    logger.debug("Unchanged %s", dest_path)
+            except Exception as e:
+                errors[source_path] = f"{type(e).__name__}: {e}"
+
+    async def read_all():
+        await asyncio.gather(*(reader() for _ in range(io_threads)))
+        for _ in range(renderer_count):
+            await read_queue.put(None)
+
+    async def render_all():
+        await asyncio.gather(*(renderer() for _ in range(renderer_count)))
+        for _ in range(io_threads):
+            await write_queue.put(None)
+
+    try:
+        await asyncio.gather(
+            read_all(),
+            render_all(),
+            *(writer() for _ in range(io_threads)),
+        )
+    finally:
+        io_pool.shutdown()
+        cpu_pool.shutdown()
+
+    return errors, changed
+
+
+def build_pipelined(pages, template_path, basepath, jobs=1,
+                    queue_size=DEFAULT_QUEUE_SIZE, io_threads=DEFAULT_IO_THREADS):
+    return asyncio.run(run_pipeline(pages, template_path, basepath, jobs, queue_size, io_threads))
@@ -0,0 +1,110 @@
+import gzip
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from .parallel import chunk_size
+
+try:
+    import brotli
+except ImportError:  # .br files are only written when brotli is installed
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSIBLE_EXTENSIONS = {".html", ".css", ".js", ".svg", ".xml", ".json", ".txt"}
+COMPRESSED_EXTENSIONS = (".gz", ".br")
+# Below this, a compressed copy saves less than the request overhead
+MIN_SIZE = 256
+
+
+def compressors():
+    """(extension, compress) for each format this install can write."""
+    formats = [(".gz", lambda data: gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        formats.append((".br", lambda data: brotli.compress(data, quality=11)))
+    return formats
+
+
+def is_current(path, sibling_path):
+    """
+    A compressed sibling is stamped with its original's mtime, and
+    unchanged outputs keep theirs, so equal mtimes mean it is up to date.
+    """
+    try:
+        return os.stat(sibling_path).st_mtime_ns == os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return False
+
+
+def compress_file(path):
+    """Worker entry point: write every compressed sibling of path."""
+    with open(path, "rb") as f:
+        data = f.read()
+    stat = os.stat(path)
+
+    for extension, compress in compressors():
+        sibling_path = path + extension
+        tmp_path = f"{sibling_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(compress(data))
+        os.utime(tmp_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        os.replace(tmp_path, sibling_path)
+    return path
+
+
+def precompress_outputs(output_dir, outputs=None, jobs=1):
+    """
+    Write .gz (and .br, with brotli installed) siblings next to every
+    compressible file under output_dir, so a static host can serve them
+    without compressing per request. Files whose siblings are current are
+    skipped and the rest are compressed across a process pool. Siblings
+    that are stale or whose original is gone are removed.
+
+    When outputs is given, only files listed in it are compressed and the
+    siblings kept are added to it.
+
+    Returns the number of files compressed.
+    """
+    extensions = [extension for extension, _ in compressors()]
+    pending = []
+    for directory, _, files in os.walk(output_dir):
+        names = set(files)
+        for name in files:
+            path = os.path.join(directory, name)
+            base, extension = os.path.splitext(path)
+
+            if extension in COMPRESSED_EXTENSIONS:
+                if os.path.splitext(base)[1] not in COMPRESSIBLE_EXTENSIONS:
+                    # An archive shipped as is, not one of ours
+                    continue
+                original = os.path.basename(base)
+                if original not in names or not is_current(base, path):
+                    # Rewritten below if the original still needs it
+                    os.remove(path)
+                continue
+
+            if extension not in COMPRESSIBLE_EXTENSIONS:
+                continue
+            if outputs is not None and os.path.normpath(path) not in outputs:
+                continue
+            if os.path.getsize(path) < MIN_SIZE:
+                continue
+
+            sibling_paths = [path + sibling for sibling in extensions]
+            if outputs is not None:
+                outputs.update(os.path.normpath(sibling_path) for sibling_path in sibling_paths)
+            if not all(is_current(path, sibling_path) for sibling_path in sibling_paths):
+                pending.append(path)
+
+    if jobs > 1 and len(pending) > 1:
+        jobs = min(jobs, len(pending))
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            for path in pool.map(compress_file, pending, chunksize=chunk_size(len(pending), jobs)):
+                logger.debug("Compressed %s", path)
+    else:
+        for path in pending:
+            compress_file(path)
+            logger.debug("Compressed %s", path)
+
+    return len(pending)
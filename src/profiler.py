@@ -0,0 +1,143 @@
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+
+
+# Pipeline stages recorded by generate_page and markdown_to_html_node
+STAGES = ("read", "block_split", "inline_parse", "html_build", "template_render", "write")
+
+_active = None
+_null_stage = nullcontext()
+
+
+def stage(name, trace=True):
+    """
+    Time a pipeline stage against the profiler of the page being built.
+    Without an active profiler this is a shared no-op context manager, so
+    instrumented code costs one global lookup when profiling is off.
+    """
+    if _active is None:
+        return _null_stage
+    return _active.stage(name, trace)
+
+
+def is_active():
+    return _active is not None
+
+
+class Profiler:
+    """
+    Collects per-stage wall time and allocation counts, per-page totals and
+    Chrome trace events ("X" complete events, see chrome://tracing).
+
+    Stage times are exclusive: a stage nested in another (inline_parse runs
+    inside html_build) is not counted twice. Allocation counts are the net
+    change in sys.getallocatedblocks() over the stage.
+    """
+
+    def __init__(self):
+        self.pid = os.getpid()
+        self.events = []
+        # name -> [nanoseconds, allocated blocks, calls]
+        self.stage_totals = {}
+        # page path -> seconds
+        self.page_times = {}
+        # [child nanoseconds, child blocks] for each open stage
+        self._stack = []
+        self._page = None
+
+    @contextmanager
+    def page(self, path):
+        global _active
+        previous = _active
+        _active = self
+        self._page = path
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter_ns() - start
+            self.page_times[path] = duration / 1e9
+            self.events.append(trace_event(path, "page", start, duration, self.pid))
+            self._page = None
+            _active = previous
+
+    @contextmanager
+    def stage(self, name, trace=True):
+        blocks = sys.getallocatedblocks()
+        start = time.perf_counter_ns()
+        self._stack.append([0, 0])
+        try:
+            yield
+        finally:
+            duration = time.perf_counter_ns() - start
+            allocated = sys.getallocatedblocks() - blocks
+            child_time, child_blocks = self._stack.pop()
+            if self._stack:
+                self._stack[-1][0] += duration
+                self._stack[-1][1] += allocated
+
+            total = self.stage_totals.setdefault(name, [0, 0, 0])
+            total[0] += duration - child_time
+            total[1] += allocated - child_blocks
+            total[2] += 1
+
+            # High-frequency stages only feed the totals, one trace event
+            # per call would swamp the trace file
+            if trace:
+                event = trace_event(name, "stage", start, duration, self.pid)
+                event["args"] = {"page": self._page, "allocated_blocks": allocated}
+                self.events.append(event)
+
+    def export(self):
+        """Picklable snapshot, used to send worker results to the parent."""
+        return {
+            "events": self.events,
+            "stage_totals": self.stage_totals,
+            "page_times": self.page_times,
+        }
+
+    def merge(self, data):
+        self.events.extend(data["events"])
+        self.page_times.update(data["page_times"])
+        for name, (nanoseconds, blocks, calls) in data["stage_totals"].items():
+            total = self.stage_totals.setdefault(name, [0, 0, 0])
+            total[0] += nanoseconds
+            total[1] += blocks
+            total[2] += calls
+
+    def report(self, top=10):
+        """Return the stage table and the slowest pages as printable lines."""
+        lines = [f"{'stage':<16} {'time (ms)':>12} {'alloc blocks':>14} {'calls':>8}"]
+        for name in sorted(self.stage_totals, key=stage_order):
+            nanoseconds, blocks, calls = self.stage_totals[name]
+            lines.append(f"{name:<16} {nanoseconds / 1e6:>12.2f} {blocks:>14} {calls:>8}")
+
+        slowest = sorted(self.page_times.items(), key=lambda item: item[1], reverse=True)[:top]
+        if slowest:
+            lines.append(f"Slowest {len(slowest)} pages:")
+            for path, seconds in slowest:
+                lines.append(f"{seconds * 1000:>10.2f} ms  {path}")
+        return lines
+
+    def write_trace(self, path):
+        with open(path, "w") as f:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, f)
+
+
+def stage_order(name):
+    return STAGES.index(name) if name in STAGES else len(STAGES)
+
+
+def trace_event(name, category, start_ns, duration_ns, pid):
+    return {
+        "name": name,
+        "cat": category,
+        "ph": "X",
+        "ts": start_ns / 1000,
+        "dur": duration_ns / 1000,
+        "pid": pid,
+        "tid": pid,
+    }
@@ -0,0 +1,255 @@
+import json
+import logging
+import math
+import os
+import pickle
+import re
+
+from .blocktype import BlockType
+from .frontmatter import split_header
+from .markdown import TitleWatcher, scan_blocks
+from .output_writer import write_text
+from .page_index import page_url
+from .split_nodes import text_to_textnodes
+
+logger = logging.getLogger(__name__)
+
+SEARCH_DIR = "search"
+SEARCH_STORE_PATH = "./.ssg-cache/search.pickle"
+# Bump whenever tokenizing, weighting or titles change, so stored pages are redone
+STORE_VERSION = 3
+
+# Terms are sharded by their first characters; the browser fetches
+# index.json once and then only the shard for the prefix being typed
+SHARD_PREFIX_LENGTH = 2
+# Weights are stored as integers out of this
+WEIGHT_SCALE = 1000
+# Heading text counts this many times over body text
+HEADING_BOOST = 3
+
+TOKEN = re.compile(r"\w+")
+BLOCK_MARKER = re.compile(r"^(?:#{1,6} |> ?|[-*+] |\d+\. )")
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have he her his i if in is it its me my "
+    "not of on or our she so that the their them then there they this to was we were "
+    "what when which who will with you your".split()
+)
+
+
+def tokenize(text):
+    for token in TOKEN.findall(text.lower()):
+        if len(token) > 1 and token not in STOPWORDS:
+            yield token
+
+
+def block_texts(block):
+    """
+    Yield the visible text of a block: the text of each TextNode on every
+    line once block markers are stripped. Link and image URLs are not
+    text, and code blocks are left out of the index.
+    """
+    if block.block_type == BlockType.code:
+        return
+
+    for line in block.lines:
+        line = BLOCK_MARKER.sub("", line.strip(), count=1)
+        if not line:
+            continue
+        try:
+            nodes = text_to_textnodes(line)
+        except Exception:
+            # An unclosed delimiter renders as an error; index the raw words
+            yield line
+            continue
+        for node in nodes:
+            yield node.text
+
+
+def page_terms(lines):
+    """
+    Return (title, {term: count}) for the markdown in an iterable of
+    lines. The title is found as for the page itself (see read_header).
+    A front matter title is indexed like a heading; the rest of the front
+    matter is not indexed.
+    """
+    meta, lines = split_header(lines)
+    title = meta.get("title") or None
+    counts = {}
+    if title is not None:
+        for token in tokenize(title):
+            counts[token] = counts.get(token, 0) + HEADING_BOOST
+    watcher = TitleWatcher(title)
+    for block in scan_blocks(watcher.watch(lines)):
+        boost = HEADING_BOOST if block.block_type == BlockType.heading else 1
+        for text in block_texts(block):
+            for token in tokenize(text):
+                counts[token] = counts.get(token, 0) + boost
+    return watcher.title, counts
+
+
+def term_weights(counts):
+    """
+    Log-scaled term frequencies normalized by the page's own length, so a
+    posting's weight only changes when its page does. Ranking multiplies
+    it by the term's inverse document frequency at query time, from the
+    posting count and the number of pages in index.json.
+    """
+    logs = {term: 1 + math.log(count) for term, count in counts.items()}
+    norm = math.sqrt(sum(value * value for value in logs.values())) or 1
+    return {term: max(1, round(WEIGHT_SCALE * value / norm)) for term, value in logs.items()}
+
+
+def shard_name(term):
+    # File-name-safe prefix; anything but ASCII letters and digits is hex escaped
+    prefix = term[:SHARD_PREFIX_LENGTH]
+    return "".join(char if char.isascii() and char.isalnum() else f"_{ord(char):x}" for char in prefix)
+
+
+def group_by_shard(weights):
+    shards = {}
+    for term, weight in weights.items():
+        shards.setdefault(shard_name(term), {})[term] = weight
+    return shards
+
+
+class SearchDoc:
+    """A page's title and term weights grouped by shard, plus the fingerprint they were built from."""
+
+    __slots__ = ("fingerprint", "title", "shards")
+
+    def __init__(self, fingerprint, title, shards):
+        self.fingerprint = fingerprint
+        self.title = title
+        self.shards = shards
+
+
+class SearchStore:
+    """
+    The indexed pages of the last build, kept between builds so only new
+    or edited pages are tokenized again. ids maps each source to its
+    stable document number in the shards.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.docs = {}
+        self.ids = {}
+
+    @classmethod
+    def load(cls, path=SEARCH_STORE_PATH):
+        store = cls(path)
+        try:
+            with open(path, "rb") as f:
+                version, docs, ids = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError, TypeError):
+            return store
+
+        if version == STORE_VERSION:
+            store.docs = docs
+            store.ids = ids
+        return store
+
+    def save(self):
+        if self.path is None:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump((STORE_VERSION, self.docs, self.ids), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.path)
+
+    def assign_ids(self, sources):
+        """Give each new source the lowest free document number."""
+        taken = set(self.ids.values())
+        doc_id = 0
+        for source in sources:
+            if source in self.ids:
+                continue
+            while doc_id in taken:
+                doc_id += 1
+            self.ids[source] = doc_id
+            taken.add(doc_id)
+
+
+def build_search_index(pages, output_dir, basepath="/", store=None, outputs=None):
+    """
+    Bring the search index under output_dir/search up to date with pages.
+
+    Only pages whose fingerprint changed are tokenized, and only the
+    shards holding terms of changed, new or removed pages are rewritten.
+    Each shard, <prefix>.json, maps its terms to a flat list of
+    document number, weight pairs. index.json lists [url, title] by
+    document number, with null for numbers not in use.
+    Shard and index paths are added to outputs when it is given.
+
+    Returns the number of shards written.
+    """
+    if store is None:
+        store = SearchStore.load()
+    search_dir = os.path.join(output_dir, SEARCH_DIR)
+
+    affected = set()
+    docs = {}
+    for page in pages:
+        fingerprint = page.fingerprint()
+        doc = store.docs.get(page.source)
+        if doc is None or doc.fingerprint != fingerprint:
+            with open(page.source) as f:
+                title, counts = page_terms(f)
+            if doc is not None:
+                affected.update(doc.shards)
+            doc = SearchDoc(fingerprint, title, group_by_shard(term_weights(counts)))
+            affected.update(doc.shards)
+        docs[page.source] = doc
+
+    for source in store.docs.keys() - docs.keys():
+        affected.update(store.docs[source].shards)
+    for source in store.ids.keys() - docs.keys():
+        del store.ids[source]
+    store.assign_ids(docs)
+    store.docs = docs
+
+    shards = set()
+    for doc in docs.values():
+        shards.update(doc.shards)
+    # Shards deleted from the output since the last build are written again
+    affected.update(shard for shard in shards if not os.path.exists(os.path.join(search_dir, shard + ".json")))
+
+    postings = {shard: {} for shard in affected}
+    for source, doc in docs.items():
+        doc_id = store.ids[source]
+        for shard, terms in doc.shards.items():
+            shard_postings = postings.get(shard)
+            if shard_postings is None:
+                continue
+            for term, weight in terms.items():
+                shard_postings.setdefault(term, []).append((doc_id, weight))
+
+    written = 0
+    for shard in sorted(affected):
+        path = os.path.join(search_dir, shard + ".json")
+        if not postings[shard]:
+            if os.path.exists(path):
+                os.remove(path)
+            continue
+
+        encoded = {term: [value for pair in sorted(pairs) for value in pair] for term, pairs in postings[shard].items()}
+        written += write_text(path, json.dumps(encoded, separators=(",", ":"), sort_keys=True))
+
+    index = [None] * (max(store.ids.values(), default=-1) + 1)
+    for page in pages:
+        url = page_url(page.destination, output_dir, basepath)
+        index[store.ids[page.source]] = [url, docs[page.source].title or url]
+    write_text(os.path.join(search_dir, "index.json"), json.dumps({
+        "prefix_length": SHARD_PREFIX_LENGTH,
+        "weight_scale": WEIGHT_SCALE,
+        "docs": index,
+    }, separators=(",", ":")))
+
+    if outputs is not None:
+        outputs.add(os.path.normpath(os.path.join(search_dir, "index.json")))
+        outputs.update(os.path.normpath(os.path.join(search_dir, shard + ".json")) for shard in shards)
+
+    store.save()
+    logger.debug("Search index: %d pages, %d of %d shards rewritten", len(docs), written, len(shards))
+    return written
@@ -0,0 +1,354 @@
+import argparse
+import logging
+import os
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from . import main as build
+from .nav import is_top_level
+from .page_index import page_url
+from .sitegen import generate_page
+from .static_sync import sync_file
+from .template import template_files
+from . import block_cache
+from . import highlight
+from . import images
+from . import settings
+
+logger = logging.getLogger(__name__)
+
+LIVERELOAD_PATH = "/__livereload"
+LIVERELOAD_SCRIPT = (
+    f'<script>new EventSource("{LIVERELOAD_PATH}").onmessage = '
+    "function () { location.reload(); };</script>"
+).encode("utf-8")
+
+
+class Watcher:
+    """
+    Polls files and directories for changes by comparing (mtime, size)
+    snapshots. Polling needs nothing outside the standard library and a
+    short interval keeps the edit-to-reload delay well under 100 ms.
+    """
+
+    def __init__(self, paths):
+        self.paths = paths
+        self.snapshot = self.scan()
+
+    def scan(self):
+        snapshot = {}
+        for path in self.paths:
+            if os.path.isdir(path):
+                scan_tree(path, snapshot)
+            elif os.path.exists(path):
+                stat = os.stat(path)
+                snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def set_paths(self, paths):
+        """Watch paths from now on, without reporting what is already there."""
+        self.paths = paths
+        self.snapshot = self.scan()
+
+    def poll(self):
+        """Return (changed, deleted) paths since the previous poll."""
+        current = self.scan()
+        changed = [path for path, state in current.items() if self.snapshot.get(path) != state]
+        deleted = [path for path in self.snapshot if path not in current]
+        self.snapshot = current
+        return changed, deleted
+
+
+def scan_tree(directory, snapshot):
+    with os.scandir(directory) as it:
+        for entry in it:
+            if entry.is_dir():
+                scan_tree(entry.path, snapshot)
+            else:
+                stat = entry.stat()
+                snapshot[entry.path] = (stat.st_mtime_ns, stat.st_size)
+
+
+class LiveReload:
+    """Version counter that open browsers wait on for a reload."""
+
+    def __init__(self):
+        self.version = 0
+        self.condition = threading.Condition()
+
+    def notify(self):
+        with self.condition:
+            self.version += 1
+            self.condition.notify_all()
+
+    def wait(self, version, timeout):
+        with self.condition:
+            self.condition.wait_for(lambda: self.version != version, timeout)
+            return self.version
+
+
+class DevRequestHandler(SimpleHTTPRequestHandler):
+    """Serves the output directory, adding the live-reload hook to HTML pages."""
+
+    def __init__(self, *args, livereload=None, **kwargs):
+        self.livereload = livereload
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self):
+        if self.path == LIVERELOAD_PATH:
+            self.stream_reloads()
+            return
+
+        path = self.translate_path(self.path)
+        if os.path.isdir(path) and self.path.split("?", 1)[0].endswith("/"):
+            path = os.path.join(path, "index.html")
+        if path.endswith(".html") and os.path.isfile(path):
+            self.send_html(path)
+            return
+
+        super().do_GET()
+
+    def send_html(self, path):
+        with open(path, "rb") as f:
+            body = f.read()
+
+        end = body.rfind(b"</body>")
+        if end == -1:
+            body += LIVERELOAD_SCRIPT
+        else:
+            body = body[:end] + LIVERELOAD_SCRIPT + body[end:]
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def stream_reloads(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+        version = self.livereload.version
+        try:
+            while True:
+                new_version = self.livereload.wait(version, 15)
+                if new_version != version:
+                    self.wfile.write(b"data: reload\n\n")
+                    version = new_version
+                else:
+                    # Comment line keeps idle connections from timing out
+                    self.wfile.write(b": ping\n\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            return
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+def layout_files():
+    """
+    The template and the partials it includes; just the template while it
+    cannot be parsed, e.g. because a partial is missing.
+    """
+    try:
+        return template_files(build.TEMPLATE_PATH)
+    except (OSError, ValueError):
+        return [build.TEMPLATE_PATH]
+
+
+def watched_paths(layout):
+    return [build.CONTENT_DIR_PATH, build.STATIC_DIR_PATH, *layout]
+
+
+def is_nav_source(path):
+    """Whether a content path is a page listed in the site navigation."""
+    return path.endswith(".md") and is_top_level(page_url(build.page_destination(path), build.OUTPUT_DIR_PATH))
+
+
+def is_image(path):
+    return os.path.splitext(path)[1].lower() in images.IMAGE_EXTENSIONS
+
+
+def refresh_images():
+    """
+    Re-index the static images and write the resized copies of changed
+    ones. Returns the URLs whose size or resized copies changed; copies
+    that are no longer made are deleted from the output.
+    """
+    previous = settings.active.images or images.ImageIndex()
+    build.set_up_images()
+    current = settings.active.images
+
+    urls = {url for url in previous.entries.keys() | current.entries.keys() if previous.get(url) != current.get(url)}
+    for url in urls:
+        before = previous.get(url)
+        after = current.get(url)
+        kept = {candidate for candidate, _ in after.srcset} if after is not None else set()
+        for candidate, _ in before.srcset if before is not None else ():
+            output = os.path.join(build.OUTPUT_DIR_PATH, *candidate.lstrip("/").split("/"))
+            if candidate != url and candidate not in kept and os.path.isfile(output):
+                os.remove(output)
+    return urls
+
+
+def pages_using(urls, pages):
+    """The pages whose source mentions any of the URLs."""
+    using = []
+    for page in pages:
+        try:
+            with open(page.source) as f:
+                text = f.read()
+        except OSError:
+            continue
+        if any(url in text for url in urls):
+            using.append(page)
+    return using
+
+
+def rebuild(changed, deleted, basepath="/", layout=None):
+    """
+    Bring the output up to date for the given changed and deleted inputs:
+    only the touched pages are re-rendered and only the touched static
+    files copied, unless the template or one of its partials (layout,
+    by default those of the current template) changed, or the site
+    navigation did, which affects every page. A changed or deleted image
+    is re-indexed and resized, and the pages that show it re-rendered,
+    since their img tags carry its size and srcset. Returns the number
+    of outputs that changed or were removed.
+    """
+    count = 0
+    content_prefix = build.CONTENT_DIR_PATH + os.sep
+    static_prefix = os.path.normpath(build.STATIC_DIR_PATH) + os.sep
+    layout = set(layout if layout is not None else layout_files())
+
+    site_pages = None
+    rebuild_all = not layout.isdisjoint(changed) or not layout.isdisjoint(deleted)
+    if any(path.startswith(content_prefix) and is_nav_source(path) for path in (*changed, *deleted)):
+        site_pages = build.collect_pages(build.CONTENT_DIR_PATH)
+        nav = settings.active.nav_html
+        build.set_up_nav(site_pages)
+        rebuild_all = rebuild_all or settings.active.nav_html != nav
+
+    image_urls = set()
+    if any(os.path.normpath(path).startswith(static_prefix) and is_image(path) for path in (*changed, *deleted)):
+        image_urls = refresh_images()
+
+    if rebuild_all:
+        if site_pages is None:
+            site_pages = build.collect_pages(build.CONTENT_DIR_PATH)
+        pages = [(page.source, page.destination) for page in site_pages]
+    else:
+        pages = [(path, build.page_destination(path)) for path in changed
+                 if path.startswith(content_prefix) and path.endswith(".md")]
+        if image_urls:
+            if site_pages is None:
+                site_pages = build.collect_pages(build.CONTENT_DIR_PATH)
+            touched = {source for source, _ in pages}
+            pages += [(page.source, page.destination) for page in pages_using(image_urls, site_pages)
+                      if page.source not in touched]
+
+    for source_path, destination_path in pages:
+        try:
+            # Saving a file without changing its output needs no reload
+            if generate_page(source_path, build.TEMPLATE_PATH, destination_path, basepath):
+                count += 1
+        except Exception as e:
+            logger.error("Failed to generate %s: %s", source_path, e)
+
+    for path in changed:
+        if os.path.normpath(path).startswith(static_prefix):
+            destination = build.static_destination(path)
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            sync_file(path, destination)
+            count += 1
+
+    for path in deleted:
+        if path.startswith(content_prefix) and path.endswith(".md"):
+            output = build.page_destination(path)
+        elif os.path.normpath(path).startswith(static_prefix):
+            output = build.static_destination(path)
+        else:
+            continue
+        if os.path.isfile(output):
+            os.remove(output)
+            count += 1
+
+    return count
+
+
+def watch(watcher, livereload, interval, basepath="/"):
+    layout = layout_files()
+    while True:
+        time.sleep(interval)
+        changed, deleted = watcher.poll()
+        if not changed and not deleted:
+            continue
+
+        start = time.perf_counter()
+        try:
+            count = rebuild(changed, deleted, basepath, layout)
+        except Exception:
+            # Keep serving; the next save gets another chance
+            logger.exception("Rebuild failed")
+            continue
+        finally:
+            # The template may now include different partials
+            new_layout = layout_files()
+            if new_layout != layout:
+                layout = new_layout
+                watcher.set_paths(watched_paths(layout))
+        livereload.notify()
+        logger.info("Rebuilt %d outputs in %.0f ms", count, (time.perf_counter() - start) * 1000)
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="serve", description="Serve the site locally")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--bind", default="127.0.0.1")
+    parser.add_argument("--watch", action="store_true", help="rebuild and reload on changes")
+    parser.add_argument("--interval", type=float, default=0.05, help="seconds between polls")
+    parser.add_argument("-v", "--verbose", action="store_true", help="log every request")
+    return parser.parse_args(argv)
+
+
+def serve_main(argv):
+    args = parse_args(argv)
+    build.configure_logging(args.verbose, False)
+
+    # Edits usually touch a block or two, so keep rendered blocks around
+    render_settings = settings.configure(settings.RenderSettings(
+        block_cache=block_cache.BlockCache(),
+        highlight=highlight.HighlightCache(highlight.HIGHLIGHT_CACHE_DIR),
+    ))
+
+    start = time.perf_counter()
+    outputs = set()
+    build.copy_static_directory(build.STATIC_DIR_PATH, build.OUTPUT_DIR_PATH, outputs=outputs)
+    build.set_up_images(outputs=outputs)
+    build.generate_pages_recursive(build.CONTENT_DIR_PATH, "/", outputs=outputs)
+    build.remove_unlisted_outputs(build.OUTPUT_DIR_PATH, outputs)
+    render_settings.highlight.prune()
+    logger.info("Built site in %.0f ms", (time.perf_counter() - start) * 1000)
+
+    livereload = LiveReload()
+    handler = partial(DevRequestHandler, directory=build.OUTPUT_DIR_PATH, livereload=livereload)
+    server = ThreadingHTTPServer((args.bind, args.port), handler)
+    server.daemon_threads = True
+    logger.info("Serving %s on http://%s:%d/", build.OUTPUT_DIR_PATH, args.bind, args.port)
+
+    if not args.watch:
+        server.serve_forever()
+        return
+
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    watcher = Watcher(watched_paths(layout_files()))
+    try:
+        watch(watcher, livereload, args.interval)
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,44 @@
+# Sources at least this large are rendered block by block straight from the
+# file instead of being read and parsed whole
+DEFAULT_STREAM_THRESHOLD_BYTES = 16 * 1024 * 1024
+
+
+class RenderSettings:
+    """
+    Everything a page is rendered with beyond its source, template and
+    basepath, in one object:
+
+    stream_threshold  source size in bytes from which pages are streamed
+    minify            strip layout whitespace and comments from templates
+    nav_html          the site navigation filled into {{ Nav }}
+    images            ImageIndex of static image sizes and srcsets, or None
+    block_cache       BlockCache of rendered blocks, or None
+    highlight         HighlightCache of highlighted code, or None
+
+    Each entry point (a build, the dev server) builds one and installs it
+    with configure() before rendering. A render pool hands the same object
+    to its workers through its initializer (see parallel.render_pool), so
+    workers render with it whether they are forked or spawned.
+    """
+
+    __slots__ = ("stream_threshold", "minify", "nav_html", "images", "block_cache", "highlight")
+
+    def __init__(self, stream_threshold=DEFAULT_STREAM_THRESHOLD_BYTES, minify=False, nav_html="", images=None,
+                 block_cache=None, highlight=None):
+        self.stream_threshold = stream_threshold
+        self.minify = minify
+        self.nav_html = nav_html
+        self.images = images
+        self.block_cache = block_cache
+        self.highlight = highlight
+
+
+# The settings this process renders with
+active = RenderSettings()
+
+
+def configure(settings):
+    """Install settings for this process and return them."""
+    global active
+    active = settings
+    return settings
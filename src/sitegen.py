@@ -1,38 +1,145 @@
 import sys
 import os
+import datetime
+import logging
+from . import frontmatter
 from . import markdown
 from . import markdown_to_html
+from . import template
+from . import profiler
+from . import settings
+from . import output_writer
+from .toc import Outline
+
+logger = logging.getLogger(__name__)
 
 # def main(): for debug purposes only
 
-def generate_page(from_path, template_path, dest_path, basepath):
-    print(f"Generating page from {from_path} to {dest_path} using {template_path}")
+def page_date(path):
+    """Last-modified date of the source file, as YYYY-MM-DD."""
+    return datetime.date.fromtimestamp(os.path.getmtime(path)).isoformat()
 
-    with open(from_path) as f:
-        markdown_content = f.read()
 
-    with open(template_path) as f:
-        template_content = f.read()
+def generate_page(from_path, template_path, dest_path, basepath, context=None):
+    """
+    Render from_path into dest_path. Returns False when the output already
+    held the rendered bytes and was left untouched.
+    """
+    logger.debug("Generating page from %s to %s using %s", from_path, dest_path, template_path)
+
+    if os.path.getsize(from_path) >= settings.active.stream_threshold:
+        return generate_page_streaming(from_path, template_path, dest_path, basepath, context)
+
+    with profiler.stage("read"):
+        with open(from_path) as f:
+            markdown_content = f.read()
+    meta, markdown_content = frontmatter.split_front_matter(markdown_content)
+
+    page_template = template.load_template(template_path, basepath)
+
+    outline = Outline()
+    with profiler.stage("html_build"):
+        html_node = markdown_to_html.markdown_to_html_node(markdown_content, settings.active.block_cache, outline)
+
+    title = page_title(markdown_content, meta)
+
+    # The page body is streamed into the file node by node
+    page_context = build_context(from_path, title, html_node.write_html, context, meta, outline)
+
+    if profiler.is_active():
+        # Render into memory first so rendering and writing are timed apart
+        with profiler.stage("template_render"):
+            parts = []
+            page_template.render(page_context, parts.append)
+        with profiler.stage("write"):
+            with output_writer.OutputFile(dest_path) as out:
+                out.writelines(parts)
+        return out.changed
+
+    with output_writer.OutputFile(dest_path) as out:
+        page_template.render(page_context, out.write)
+    return out.changed
 
-    html_node = markdown_to_html.markdown_to_html_node(markdown_content)
-    html_content = html_node.to_html()
 
+def render_page(markdown_content, from_path, template_path, basepath, context=None):
+    """
+    Render a page to a string without touching the output file; used by
+    the pipelined build, which reads and writes on separate threads.
+    """
+    meta, markdown_content = frontmatter.split_front_matter(markdown_content)
+    page_template = template.load_template(template_path, basepath)
+    outline = Outline()
+    html_node = markdown_to_html.markdown_to_html_node(markdown_content, settings.active.block_cache, outline)
+    title = page_title(markdown_content, meta)
+    page_context = build_context(from_path, title, html_node.write_html, context, meta, outline)
+    return page_template.render_to_string(page_context)
+
+
+def page_title(markdown_content, meta=None):
+    """The front matter title, or else the first h1 of the body."""
+    if meta and meta.get("title"):
+        return meta["title"]
     try:
-        title = markdown.extract_title(markdown_content)
+        return markdown.extract_title(markdown_content)
     except Exception as e:
         raise Exception("No title found in the markdown file")
 
-    result = template_content.replace("{{ Title }}", title).replace("{{ Content }}", html_content)
-    result = result.replace('href="/', f'href="{basepath}')
-    result = result.replace('src="/', f'src="{basepath}')
+
+def generate_page_streaming(from_path, template_path, dest_path, basepath, context=None):
+    """
+    Like generate_page, but never holds the whole document: the title is
+    read from the head of the file, then the body is parsed and written
+    one block at a time while the template is rendered. The outline is
+    filled in as the body is written, so {{ Toc }} is only complete when
+    the template places it after {{ Content }}.
+    """
+    with open(from_path) as f:
+        meta, title, _ = frontmatter.read_header(f)
+    if title is None:
+        raise Exception("No title found in the markdown file")
+
+    page_template = template.load_template(template_path, basepath)
+    outline = Outline()
+
+    def write_content(write):
+        with open(from_path) as f:
+            _, body = frontmatter.split_header(f)
+            markdown_to_html.write_markdown_html(body, write, settings.active.block_cache, outline)
+
+    page_context = build_context(from_path, title, write_content, context, meta, outline)
+
+    with profiler.stage("html_build"):
+        with output_writer.OutputFile(dest_path) as out:
+            page_template.render(page_context, out.write)
+    return out.changed
 
 
-    directory = os.path.dirname(dest_path)
+def write_nav(write):
+    write(settings.active.nav_html)
 
-    os.makedirs(directory, exist_ok=True)
 
-    with open(dest_path, "w") as f:
-        f.write(result) # 'result' is final HTML string
+def build_context(from_path, title, content, context=None, meta=None, outline=None):
+    """
+    Template variables for a page. Date and Description come from the
+    front matter when it has them; Date falls back to the file's mtime.
+    Nav is the site navigation and Toc the table of contents of the
+    outline, if one is given.
+    """
+    meta = meta or {}
+    description = meta.get("description", "")
+    if isinstance(description, list):
+        description = ", ".join(description)
+    page_context = {
+        "Title": title,
+        "Content": content,
+        "Date": frontmatter.front_matter_date(meta) or page_date(from_path),
+        "Description": description,
+        "Nav": write_nav,
+        "Toc": outline.write_html if outline is not None else "",
+    }
+    if context:
+        page_context.update(context)
+    return page_context
 
     # generate_page(
            # "content/index.md",
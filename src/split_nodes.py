@@ -1,5 +1,6 @@
+import re
 from src.textnode import TextNode, TextType
-from src.markdown import extract_markdown_images, extract_markdown_links
+from src.markdown import IMAGE_PATTERN, LINK_PATTERN, find_markdown_images, find_markdown_links
 
 def split_nodes_delimiter(old_nodes, delimiter, text_type):
     new_list = []
@@ -36,76 +37,153 @@ def split_nodes_delimiter(old_nodes, delimiter, text_type):
 
 
 def split_nodes_image(old_nodes):
-    new_nodes = []
+    return split_nodes_spans(old_nodes, find_markdown_images, TextType.IMAGE)
 
-    for node in old_nodes:
 
-        if node.text_type == TextType.TEXT:
-            text_to_process = node.text
-            images = extract_markdown_images(text_to_process)
-            while images:
-                alt, url = images[0]
-                markdown = f"![{alt}]({url})"
-                sections = text_to_process.split(markdown, 1)
-                
-                if sections[0]:
-                    new_nodes.append(TextNode(sections[0], TextType.TEXT))
-                new_nodes.append(TextNode(alt, TextType.IMAGE, url))
-                text_to_process = sections[1]
-                images = extract_markdown_images(text_to_process)
-                
-            if text_to_process:
-                new_nodes.append(TextNode(text_to_process, TextType.TEXT))
+def split_nodes_link(old_nodes):
+    return split_nodes_spans(old_nodes, find_markdown_links, TextType.LINK)
+
 
-        else:
+def split_nodes_spans(old_nodes, find_spans, text_type):
+    """
+    Split TEXT nodes around the (start, end, text, url) spans returned by
+    find_spans, slicing the text once per match.
+    """
+    new_nodes = []
+
+    for node in old_nodes:
+        if node.text_type != TextType.TEXT:
             new_nodes.append(node)
+            continue
+
+        text = node.text
+        position = 0
+        for start, end, span_text, url in find_spans(text):
+            if start > position:
+                new_nodes.append(TextNode(text[position:start], TextType.TEXT))
+            new_nodes.append(TextNode(span_text, text_type, url))
+            position = end
+
+        if position == 0:
+            if text:
+                new_nodes.append(node)
+        elif position < len(text):
+            new_nodes.append(TextNode(text[position:], TextType.TEXT))
 
-        
-        
     return new_nodes
 
 
 
 
-def split_nodes_link(old_nodes):
-    new_nodes = []
+# Anything that can start an inline element; plain text between matches is
+# skipped over by the regex engine instead of character by character
+INLINE_SPECIAL = re.compile(r"[*_`\[!]")
+EMPHASIS_TYPES = {"**": TextType.BOLD, "_": TextType.ITALIC}
 
-    for node in old_nodes:
 
-        if node.text_type == TextType.TEXT:
-            text_to_process = node.text
-            links = extract_markdown_links(text_to_process)
-            while links:
-                link_text, url = links[0]
-                markdown = f"[{link_text}]({url})"
-                sections = text_to_process.split(markdown, 1)
-                
-                if sections[0]:
-                    new_nodes.append(TextNode(sections[0], TextType.TEXT))
-                new_nodes.append(TextNode(link_text, TextType.LINK, url))
-                text_to_process = sections[1]
-                links = extract_markdown_links(text_to_process)
-                
-            if text_to_process:
-                new_nodes.append(TextNode(text_to_process, TextType.TEXT))
+def text_to_textnodes(text):
+    """
+    Tokenize inline markdown in a single left-to-right scan.
+
+    For markup that does not nest, produces the same TextNode stream as
+    chaining split_nodes_delimiter, split_nodes_image and split_nodes_link,
+    but in linear time. Code spans, images and links are matched where they
+    start; ** and _ open and close emphasis on a stack, so they may nest
+    (e.g. "**bold _and italic_**"). Nested emphasis is returned as a
+    BOLD/ITALIC node with children. A delimiter still open when an
+    enclosing one closes is literal text, so "**snake_case**" is bold
+    "snake_case" as with the chained splits.
+    """
+    # Most text has no inline markup at all; a few substring checks are much
+    # cheaper than running the scanner over it
+    if "[" not in text and "*" not in text and "_" not in text and "`" not in text:
+        return [TextNode(text, TextType.TEXT)] if text else []
+
+    # Each frame is (closing delimiter, text type, nodes collected so far)
+    stack = [(None, None, [])]
+    plain_start = 0
+    pos = 0
+
+    while True:
+        match = INLINE_SPECIAL.search(text, pos)
+        if match is None:
+            break
+
+        start = match.start()
+        token = match.group()
+
+        if token == "*":
+            if not text.startswith("**", start):
+                # A single * is plain text
+                pos = start + 1
+                continue
+            token = "**"
+
+        if token == "`":
+            end = text.find("`", start + 1)
+            if end == -1:
+                raise Exception("No closing delimiter '`' found")
+            nodes = stack[-1][2]
+            append_text_node(nodes, text[plain_start:start])
+            nodes.append(TextNode(text[start + 1:end], TextType.CODE))
+            pos = plain_start = end + 1
+
+        elif token == "!" or token == "[":
+            pattern = IMAGE_PATTERN if token == "!" else LINK_PATTERN
+            found = pattern.match(text, start)
+            if found is None:
+                # Not an image or link after all, keep it as plain text
+                pos = start + 1
+                continue
+
+            nodes = stack[-1][2]
+            append_text_node(nodes, text[plain_start:start])
+            text_type = TextType.IMAGE if token == "!" else TextType.LINK
+            nodes.append(TextNode(found.group(1), text_type, found.group(2)))
+            pos = plain_start = found.end()
 
         else:
-            new_nodes.append(node)
-
-        
-        
-    return new_nodes
+            append_text_node(stack[-1][2], text[plain_start:start])
+            if any(frame[0] == token for frame in stack):
+                # Frames opened since this delimiter's opener never closed;
+                # their delimiters were plain text
+                while stack[-1][0] != token:
+                    unclosed, _, children = stack.pop()
+                    nodes = stack[-1][2]
+                    append_text_node(nodes, unclosed)
+                    for child in children:
+                        if child.text_type == TextType.TEXT:
+                            append_text_node(nodes, child.text)
+                        else:
+                            nodes.append(child)
+                _, text_type, children = stack.pop()
+                stack[-1][2].append(emphasis_node(children, text_type))
+            else:
+                stack.append((token, EMPHASIS_TYPES[token], []))
+            pos = plain_start = start + len(token)
 
+    if len(stack) > 1:
+        raise Exception(f"No closing delimiter '{stack[-1][0]}' found")
 
+    nodes = stack[0][2]
+    append_text_node(nodes, text[plain_start:])
+    return nodes
 
 
-def text_to_textnodes(text):
-    nodes = [TextNode(text, TextType.TEXT)]
-    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)  
-    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
-    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
-    nodes = split_nodes_image(nodes)
-    nodes = split_nodes_link(nodes)
-    return nodes
+def append_text_node(nodes, text):
+    if not text:
+        return
+    if nodes and nodes[-1].text_type == TextType.TEXT:
+        # Only happens when an unclosed delimiter is turned back into text
+        nodes[-1] = TextNode(nodes[-1].text + text, TextType.TEXT)
+    else:
+        nodes.append(TextNode(text, TextType.TEXT))
 
 
+def emphasis_node(children, text_type):
+    if not children:
+        return TextNode("", text_type)
+    if len(children) == 1 and children[0].text_type == TextType.TEXT:
+        return TextNode(children[0].text, text_type)
+    text = "".join(child.text for child in children)
+    return TextNode(text, text_type, children=children)
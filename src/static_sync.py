@@ -0,0 +1,147 @@
+import logging
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+from .manifest import hash_file
+from .minify import minify_css
+from .output_writer import write_text
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# ioctl request for a copy-on-write clone of a whole file (Linux btrfs/xfs)
+FICLONE = 0x40049409
+
+
+def scan_files(source, destination, entries=None):
+    """Return (source_path, destination_path, stat) for every file under source."""
+    if entries is None:
+        entries = []
+
+    with os.scandir(source) as it:
+        for entry in it:
+            destination_path = os.path.join(destination, entry.name)
+            if entry.is_dir():
+                scan_files(entry.path, destination_path, entries)
+            else:
+                entries.append((entry.path, destination_path, entry.stat()))
+
+    return entries
+
+
+def is_unchanged(source_path, destination_path, source_stat, checksum=False):
+    """
+    Compare a source file with its copy. Copies keep the source mtime, so a
+    matching size and mtime means the file was synced already; with
+    checksum=True files of equal size are compared by content instead.
+    """
+    try:
+        destination_stat = os.stat(destination_path)
+    except FileNotFoundError:
+        return False
+
+    if destination_stat.st_size != source_stat.st_size:
+        return False
+    if checksum:
+        return hash_file(source_path) == hash_file(destination_path)
+    return destination_stat.st_mtime_ns == source_stat.st_mtime_ns
+
+
+def reflink(source_path, destination_path):
+    with open(source_path, "rb") as src, open(destination_path, "wb") as dst:
+        fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+    shutil.copystat(source_path, destination_path)
+
+
+def sync_file(source_path, destination_path, link=False):
+    """
+    Copy one file, preferring a reflink and then a hard link when link=True.
+    Returns how the file was transferred.
+    """
+    if os.path.lexists(destination_path):
+        os.remove(destination_path)
+
+    if link:
+        if fcntl is not None:
+            try:
+                reflink(source_path, destination_path)
+                return "reflinked"
+            except OSError:
+                if os.path.exists(destination_path):
+                    os.remove(destination_path)
+        try:
+            os.link(source_path, destination_path)
+            return "linked"
+        except OSError:
+            pass
+
+    shutil.copy2(source_path, destination_path)
+    return "copied"
+
+
+def minify_file(source_path, destination_path):
+    with open(source_path) as f:
+        css = f.read()
+    if write_text(destination_path, minify_css(css)):
+        logger.debug("Minified %s to %s", source_path, destination_path)
+        return "minified"
+    return "skipped"
+
+
+def sync_directory(source, destination, manifest=None, jobs=None, link=False, checksum=False, outputs=None,
+                   minify=False):
+    """
+    Make destination hold an up-to-date copy of every file under source,
+    transferring only new or changed files on a thread pool.
+
+    When a manifest is given each synced file is recorded in it, so files
+    that later disappear from source are pruned along with the manifest
+    entry; nothing else in destination is deleted. The destination path
+    of every file is added to the outputs set when one is given.
+
+    With minify=True stylesheets are minified rather than copied; their
+    output never matches the source, so they are minified every time and
+    only written when the result differs.
+
+    Returns a dict counting copied, reflinked, linked, minified and
+    skipped files.
+    """
+    counts = {"copied": 0, "reflinked": 0, "linked": 0, "minified": 0, "skipped": 0}
+    pending = []
+
+    for source_path, destination_path, source_stat in scan_files(source, destination):
+        if manifest is not None:
+            digest = f"{source_stat.st_size}:{source_stat.st_mtime_ns}"
+            manifest.record(source_path, digest, destination_path)
+        if outputs is not None:
+            outputs.add(os.path.normpath(destination_path))
+
+        if minify and source_path.endswith(".css"):
+            pending.append((source_path, destination_path))
+            continue
+        if is_unchanged(source_path, destination_path, source_stat, checksum):
+            counts["skipped"] += 1
+            continue
+        pending.append((source_path, destination_path))
+
+    for directory in {os.path.dirname(destination_path) for _, destination_path in pending}:
+        os.makedirs(directory, exist_ok=True)
+
+    def transfer(paths):
+        source_path, destination_path = paths
+        if minify and source_path.endswith(".css"):
+            return minify_file(source_path, destination_path)
+        logger.debug("Copying file: %s to %s", source_path, destination_path)
+        return sync_file(source_path, destination_path, link)
+
+    if pending:
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            for method in pool.map(transfer, pending):
+                counts[method] += 1
+
+    return counts
@@ -0,0 +1,221 @@
+import os
+import re
+
+from . import settings
+from .htmlnode import escape_text
+from .manifest import combine_hashes, hash_file
+from .minify import minify_html
+
+
+# {{ Name }} variables and {% include "partial.html" %} partials
+TEMPLATE_TAG = re.compile(r'\{\{\s*(\w+)\s*\}\}|\{%\s*include\s+"([^"]+)"\s*%\}')
+SRCSET_ATTRIBUTE = re.compile(r'srcset="([^"]*)"')
+
+
+class Slot:
+    """A named hole in a compiled template, filled from the render context."""
+
+    def __init__(self, name):
+        self.name = name
+
+    def __eq__(self, other):
+        return isinstance(other, Slot) and self.name == other.name
+
+    def __repr__(self):
+        return f"Slot({self.name})"
+
+
+class Template:
+    """
+    A template parsed once into static segments and slots.
+
+    Static segments already have the basepath applied to root-relative
+    href/src attributes, so rendering a page only rewrites the values that
+    are filled into slots. partials lists the files it includes, directly
+    or through other partials.
+    """
+
+    def __init__(self, segments, basepath="/", partials=()):
+        self.segments = segments
+        self.basepath = basepath
+        self.partials = tuple(partials)
+
+    def render(self, context, write):
+        """
+        Write the template with its slots filled from context. A value may be
+        a string, which is escaped, or a callable taking write(), which
+        writes HTML as is and lets large values such as the page body be
+        streamed instead of passed in as one string. Unknown slots render
+        as empty.
+        """
+        value_write = basepath_writer(write, self.basepath)
+
+        for segment in self.segments:
+            if type(segment) is str:
+                write(segment)
+                continue
+
+            value = context.get(segment.name)
+            if value is None:
+                continue
+            if callable(value):
+                value(value_write)
+            else:
+                value_write(escape_value(str(value)))
+
+    def render_to_string(self, context):
+        parts = []
+        self.render(context, parts.append)
+        return "".join(parts)
+
+
+def escape_value(value):
+    """Escape a plain slot value, which may sit in text or in a double-quoted attribute."""
+    value = escape_text(value)
+    if '"' in value:
+        value = value.replace('"', "&quot;")
+    return value
+
+
+def parse_template(text, base_dir=".", basepath="/", including=(), partials=None):
+    """
+    Split template text into static segments and Slot objects. The path of
+    every partial read is appended to partials when it is given.
+    """
+    segments = []
+    pos = 0
+
+    for match in TEMPLATE_TAG.finditer(text):
+        add_static_segment(segments, text[pos:match.start()], basepath)
+        name, partial = match.groups()
+
+        if name is not None:
+            segments.append(Slot(name))
+        else:
+            partial_path = os.path.normpath(os.path.join(base_dir, partial))
+            if partial_path in including:
+                raise ValueError(f"Template include cycle through {partial_path}")
+            with open(partial_path) as f:
+                partial_text = f.read()
+            if partials is not None and partial_path not in partials:
+                partials.append(partial_path)
+            partial_segments = parse_template(
+                partial_text,
+                os.path.dirname(partial_path),
+                basepath,
+                including + (partial_path,),
+                partials,
+            )
+            for segment in partial_segments:
+                if type(segment) is str:
+                    add_static_segment(segments, segment, "/")
+                else:
+                    segments.append(segment)
+
+        pos = match.end()
+
+    add_static_segment(segments, text[pos:], basepath)
+    return segments
+
+
+def add_static_segment(segments, text, basepath):
+    if not text:
+        return
+    text = rewrite_basepath(text, basepath)
+    # Merge neighbouring static text so render() writes it in one call
+    if segments and type(segments[-1]) is str:
+        segments[-1] += text
+    else:
+        segments.append(text)
+
+
+_template_cache = {}
+
+
+def file_mtimes(paths):
+    """mtimes of paths, with None for any that no longer exist."""
+    mtimes = []
+    for path in paths:
+        try:
+            mtimes.append(os.stat(path).st_mtime_ns)
+        except FileNotFoundError:
+            mtimes.append(None)
+    return tuple(mtimes)
+
+
+def load_template(path, basepath="/"):
+    """
+    Return the compiled template for path, reading and parsing it only the
+    first time it is asked for (or again after it or one of its partials
+    changes).
+    """
+    minify = settings.active.minify
+    key = (path, basepath, minify)
+    cached = _template_cache.get(key)
+    if cached is not None:
+        mtimes, template = cached
+        if file_mtimes((path,) + template.partials) == mtimes:
+            return template
+
+    mtime = os.stat(path).st_mtime_ns
+    with open(path) as f:
+        text = f.read()
+
+    partials = []
+    segments = parse_template(text, os.path.dirname(path) or ".", basepath, partials=partials)
+    if minify:
+        # Only the template's own markup; filled-in values are left as rendered
+        segments = [minify_html(segment) if type(segment) is str else segment for segment in segments]
+    template = Template(segments, basepath, partials)
+    _template_cache[key] = ((mtime,) + file_mtimes(partials), template)
+    return template
+
+
+def template_files(path):
+    """The template file followed by every partial it includes."""
+    return [path, *load_template(path).partials]
+
+
+def template_digest(path):
+    """
+    Digest of a template and its partials, for folding into the hashes of
+    outputs rendered with it: editing a partial changes it too.
+    """
+    return combine_hashes(*(part for file in template_files(path) for part in (file, hash_file(file))))
+
+
+def rewrite_basepath(html, basepath):
+    if basepath == "/":
+        return html
+    html = html.replace('href="/', f'href="{basepath}')
+    html = html.replace('src="/', f'src="{basepath}')
+    if 'srcset="' in html:
+        html = SRCSET_ATTRIBUTE.sub(lambda match: rewrite_srcset(match, basepath), html)
+    return html
+
+
+def rewrite_srcset(match, basepath):
+    # Every comma separated candidate in a srcset carries its own URL
+    candidates = []
+    for candidate in match.group(1).split(", "):
+        if candidate.startswith("/"):
+            candidate = basepath + candidate[1:]
+        candidates.append(candidate)
+    return 'srcset="' + ", ".join(candidates) + '"'
+
+
+def basepath_writer(write, basepath):
+    """
+    Wrap write() so root-relative href/src attributes get the basepath.
+    Nodes emit each attribute as a single fragment, so rewriting fragment by
+    fragment matches rewriting the finished page.
+    """
+    if basepath == "/":
+        return write
+
+    def rewrite(fragment):
+        if '="/' in fragment:
+            fragment = rewrite_basepath(fragment, basepath)
+        write(fragment)
+
+    return rewrite
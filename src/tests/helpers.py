@@ -0,0 +1,47 @@
+import os
+import struct
+import tempfile
+import unittest
+import zlib
+
+from src.images import PNG_SIGNATURE
+
+
+def png_bytes(width, height):
+    """A valid, blank greyscale PNG."""
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 0, 0, 0, 0)
+    rows = b"".join(b"\0" + b"\0" * width for _ in range(height))
+    return (
+        PNG_SIGNATURE + chunk(b"IHDR", header) +
+        chunk(b"IDAT", zlib.compress(rows)) + chunk(b"IEND", b"")
+    )
+
+
+class TempDirTestCase(unittest.TestCase):
+    """A test case with a fresh temporary directory and helpers to fill it."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def path(self, *parts):
+        return os.path.join(self.tmp.name, *parts)
+
+    def write(self, path, data, mtime=None):
+        """
+        Write text or bytes to path, creating its directory first, and
+        set its modification time (in ns) when given. Returns path.
+        """
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb" if isinstance(data, bytes) else "w") as f:
+            f.write(data)
+        if mtime is not None:
+            os.utime(path, ns=(mtime, mtime))
+        return path
+
+    def read(self, path):
+        with open(path) as f:
+            return f.read()
@@ -0,0 +1,90 @@
+import os
+import unittest
+
+from src.aggregates import DependencyGraph, build_aggregates
+from src.metadata import MetadataStore
+from src.page_index import Page
+from src.tests.helpers import TempDirTestCase
+
+
+class TestDependencyGraph(unittest.TestCase):
+    def test_stale(self):
+        previous = DependencyGraph()
+        previous.add("blog.html", ["a", "b"], "page 1 of 1")
+        previous.add("rss.xml", ["a"])
+
+        graph = DependencyGraph()
+        graph.add("blog.html", ["a", "b"], "page 1 of 1")
+        graph.add("rss.xml", ["a"])
+        self.assertEqual(graph.stale(previous, set()), set())
+        self.assertEqual(graph.stale(previous, {"b"}), {"blog.html"})
+
+        graph.add("blog.html", ["a", "b"], "page 1 of 2")
+        graph.add("sitemap.xml", ["a", "b"])
+        self.assertEqual(graph.stale(previous, set()), {"blog.html", "sitemap.xml"})
+        self.assertEqual(DependencyGraph().removed(previous), {"blog.html", "rss.xml"})
+
+
+class TestBuildAggregates(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = self.path("content")
+        self.docs = self.path("docs")
+        self.template = self.path("template.html")
+        self.write(self.template, "<title>{{ Title }}</title><main>{{ Content }}</main>")
+        self.store = MetadataStore(self.path("metadata.json"))
+        self.pages = [self.page("index.md", "# Home\n\nWelcome", day=1)]
+        for day in range(1, 4):
+            self.pages.append(self.page(f"blog/post{day}/index.md", f"# Post {day}\n\nAbout {day}", day))
+
+    def read_output(self, *parts):
+        return self.read(os.path.join(self.docs, *parts))
+
+    def page(self, name, text, day):
+        source = self.write(self.path("content", name), text, (86400 * (365 * 50 + day)) * 10**9)
+        destination = os.path.join(self.docs, os.path.splitext(name)[0] + ".html")
+        return Page(source, destination)
+
+    def build(self, **options):
+        options.setdefault("site_url", "https://example.com/site/")
+        return build_aggregates(self.pages, self.content, self.docs, self.template, "/site/",
+                                posts_per_page=2, store=self.store, **options)
+
+    def test_listings_feed_and_sitemap(self):
+        self.assertEqual(self.build(), 4)
+
+        first = self.read_output("blog", "index.html")
+        self.assertIn('<a href="/site/blog/post3/">Post 3</a>', first)
+        self.assertIn('<a href="/site/blog/page/2/" rel="next">Older posts</a>', first)
+        self.assertNotIn("Post 1", first)
+        self.assertIn("Post 1", self.read_output("blog", "page", "2", "index.html"))
+
+        rss = self.read_output("rss.xml")
+        self.assertIn("<title>Home</title>", rss)
+        self.assertLess(rss.index("Post 3"), rss.index("Post 1"))
+        self.assertIn("<link>https://example.com/site/blog/post1/</link>", rss)
+        self.assertIn("<loc>https://example.com/site/blog/page/2/</loc>", self.read_output("sitemap.xml"))
+
+    def test_edits_without_metadata_changes_rebuild_nothing(self):
+        self.build()
+        self.pages[1] = self.page("blog/post1/index.md", "# Post 1\n\nAbout 1\n\nMore text", 1)
+        self.assertEqual(self.build(), 0)
+
+        self.pages[1] = self.page("blog/post1/index.md", "# Post one\n\nAbout 1", 1)
+        self.assertEqual(self.build(), 3)
+        self.assertIn("Post one", self.read_output("blog", "page", "2", "index.html"))
+
+    def test_shrinking_listing_removes_pages(self):
+        self.build()
+        del self.pages[1]
+        self.build()
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "blog", "page", "2", "index.html")))
+        self.assertNotIn("Older posts", self.read_output("blog", "index.html"))
+
+    def test_no_feeds_without_site_url(self):
+        self.assertEqual(self.build(site_url=None), 2)
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "rss.xml")))
+
+
+if __name__ == "__main__":
+    unittest.main()
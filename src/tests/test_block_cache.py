@@ -0,0 +1,80 @@
+import os
+import tempfile
+import unittest
+
+from src.block_cache import BlockCache, block_key
+from src.markdown_to_html import markdown_to_html_node
+
+
+MARKDOWN = """
+# Title
+
+Some **bold** text with a [link](/home)
+
+- one
+- two
+
+Shared footer
+"""
+
+
+class TestBlockCache(unittest.TestCase):
+    def test_lru_eviction(self):
+        cache = BlockCache(max_entries=2)
+        cache.put(b"a", "<p>a</p>")
+        cache.put(b"b", "<p>b</p>")
+        cache.get(b"a")
+        cache.put(b"c", "<p>c</p>")
+        self.assertIsNone(cache.get(b"b"))
+        self.assertEqual(cache.get(b"a"), "<p>a</p>")
+
+    def test_cached_output_matches_uncached(self):
+        cache = BlockCache()
+        expected = markdown_to_html_node(MARKDOWN).to_html()
+        self.assertEqual(markdown_to_html_node(MARKDOWN, cache).to_html(), expected)
+        # The heading is rendered every time, for its page-unique id
+        self.assertEqual(cache.misses, 3)
+
+        self.assertEqual(markdown_to_html_node(MARKDOWN, cache).to_html(), expected)
+        self.assertEqual(cache.hits, 3)
+
+    def test_shared_blocks_across_pages(self):
+        cache = BlockCache()
+        markdown_to_html_node("# One\n\nShared footer", cache)
+        markdown_to_html_node("# Two\n\nShared footer", cache)
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(cache.get(block_key("Shared footer")), "<p>Shared footer</p>")
+
+    def test_drain_and_merge(self):
+        self.assertIsNone(BlockCache().drain())
+
+        worker = BlockCache()
+        worker.put(b"old", "<p>old</p>")
+        worker.track()
+        markdown_to_html_node("Shared footer", worker)
+        markdown_to_html_node("Shared footer", worker)
+        delta = worker.drain()
+        self.assertEqual(delta, ([(block_key("Shared footer"), "<p>Shared footer</p>")], 1, 1))
+        self.assertEqual(worker.drain(), ([], 0, 0))
+
+        parent = BlockCache()
+        parent.merge(delta)
+        self.assertEqual(parent.get(block_key("Shared footer")), "<p>Shared footer</p>")
+        self.assertEqual(parent.misses, 1)
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cache", "blocks.pickle")
+            cache = BlockCache(path=path)
+            markdown_to_html_node(MARKDOWN, cache)
+            cache.save()
+
+            loaded = BlockCache.load(path)
+            self.assertEqual(loaded.entries, cache.entries)
+
+    def test_load_missing_file(self):
+        self.assertEqual(len(BlockCache.load("/nonexistent/blocks.pickle").entries), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import io
+import unittest
+
+from src.frontmatter import SUMMARY_LENGTH, front_matter_date, parse_value, read_header, split_front_matter, split_header
+from src.sitegen import page_title
+
+
+class TestFrontMatter(unittest.TestCase):
+    def test_parse_value(self):
+        self.assertEqual(parse_value(' "quoted: value" '), "quoted: value")
+        self.assertEqual(parse_value("[a, 'b c', ]"), ["a", "b c"])
+        self.assertEqual(parse_value("bare"), "bare")
+
+    def test_split_front_matter(self):
+        text = "---\nTitle: Hello\n# a comment\ntags: [x, y]\n---\n# Body\n"
+        self.assertEqual(split_front_matter(text), ({"title": "Hello", "tags": ["x", "y"]}, "# Body\n"))
+
+    def test_no_front_matter(self):
+        self.assertEqual(split_front_matter("# Title\n---\n"), ({}, "# Title\n---\n"))
+        # A horizontal rule that is never closed is body text
+        self.assertEqual(split_front_matter("---\ntext"), ({}, "---\ntext"))
+
+    def test_split_header_leaves_body_unread(self):
+        lines = iter(["---\n", "title: T\n", "...\n", "body\n", "more\n"])
+        meta, body = split_header(lines)
+        self.assertEqual(meta, {"title": "T"})
+        self.assertEqual(next(body), "body\n")
+        self.assertEqual(next(lines), "more\n")
+
+    def test_split_header_unclosed(self):
+        meta, body = split_header(["---", "a: b"])
+        self.assertEqual(meta, {})
+        self.assertEqual(list(body), ["---", "a: b"])
+
+    def test_read_header_falls_back_to_h1(self):
+        lines = ["---\n", "date: 2024-05-06T10:00\n", "---\n", "Intro\n", "\n", "# Heading\n", "\n", "Body"]
+        self.assertEqual(read_header(lines), ({"date": "2024-05-06T10:00"}, "Heading", ""))
+        self.assertEqual(read_header(["No title"]), ({}, None, ""))
+
+    def test_read_header_title_matches_the_page(self):
+        # Whatever h1 the page itself is titled by, listings see too
+        for text in ["Intro\n#Tight\n", "```\ncode\n```\n\n# After code\n", "  # Indented\n\n# Real\n"]:
+            lines = io.StringIO(text)
+            self.assertEqual(read_header(lines, with_summary=True)[1], page_title(text))
+
+    def test_read_header_summary(self):
+        lines = iter([
+            "# Title", "", "[< Back Home](/)", "", "![img](/a.png)", "",
+            "First **real** [prose](/x).", "", "Second paragraph",
+        ])
+        self.assertEqual(read_header(lines, with_summary=True), ({}, "Title", "First real prose."))
+        # Stops once both are found
+        self.assertEqual(next(lines), "Second paragraph")
+
+    def test_full_front_matter_stops_before_the_body(self):
+        lines = iter([
+            "---", "title: Post", "date: 2024-05-06", 'description: "About it"', "---", "# Heading", "Body",
+        ])
+        meta, title, summary = read_header(lines, with_summary=True)
+        self.assertEqual((title, front_matter_date(meta), summary), ("Post", "2024-05-06", "About it"))
+        self.assertEqual(next(lines), "# Heading")
+
+    def test_summary_is_cut_at_a_word(self):
+        _, _, summary = read_header(["# T", "", "word " * 100], with_summary=True)
+        self.assertTrue(summary.endswith("word…"))
+        self.assertLessEqual(len(summary), SUMMARY_LENGTH + 1)
+
+    def test_front_matter_date(self):
+        self.assertEqual(front_matter_date({"date": "2024-05-06T10:00"}), "2024-05-06")
+        self.assertIsNone(front_matter_date({"date": "someday"}))
+        self.assertIsNone(front_matter_date({}))
+
+
+if __name__ == "__main__":
+    unittest.main()
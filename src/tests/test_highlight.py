@@ -0,0 +1,79 @@
+import os
+import tempfile
+import unittest
+
+from src.highlight import HighlightCache, get_lexer, highlight, highlight_code, highlight_key
+
+
+class TestHighlight(unittest.TestCase):
+    def test_lexer_is_compiled_once_per_language(self):
+        self.assertIs(get_lexer("python"), get_lexer("python"))
+        self.assertIs(get_lexer("py"), get_lexer("py"))
+        self.assertIsNone(get_lexer("cobol"))
+
+    def test_tokens_cover_the_code(self):
+        code = 'def f(x=None):\n    return "a # b" # c\n'
+        tokens = list(get_lexer("python").tokens(code))
+        self.assertEqual("".join(text for _, text in tokens), code)
+        self.assertIn(("s", '"a # b"'), tokens)
+        self.assertIn(("c", "# c"), tokens)
+        self.assertIn(("kc", "None"), tokens)
+
+    def test_highlight_escapes(self):
+        self.assertEqual(
+            highlight('<a href="x">', get_lexer("html")),
+            '<span class="nt">&lt;a</span> <span class="na">href</span>=<span class="s">"x"</span><span class="nt">></span>',
+        )
+
+    def test_json_keys(self):
+        html = highlight('{"a": [1, true, "b"]}', get_lexer("json"))
+        self.assertIn('<span class="nt">"a"</span>', html)
+        self.assertIn('<span class="s">"b"</span>', html)
+
+    def test_unknown_language(self):
+        self.assertIsNone(highlight_code("x", "cobol", HighlightCache()))
+
+    def test_key_depends_on_language_and_code(self):
+        self.assertEqual(highlight_key("x", "py"), highlight_key("x", "python"))
+        self.assertNotEqual(highlight_key("x", "python"), highlight_key("x", "bash"))
+        self.assertNotEqual(highlight_key("x", "python"), highlight_key("y", "python"))
+
+    def test_cache_is_shared_through_the_directory(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            first = HighlightCache(tmp)
+            html = highlight_code("x = 1", "python", first)
+            self.assertEqual(first.misses, 1)
+            highlight_code("x = 1", "python", first)
+            self.assertEqual(first.hits, 1)
+
+            # A fresh cache, as in another worker or a later build
+            second = HighlightCache(tmp)
+            self.assertEqual(highlight_code("x = 1", "python", second), html)
+            self.assertEqual((second.hits, second.misses), (1, 0))
+            self.assertTrue(os.path.exists(second.path(highlight_key("x = 1", "python"))))
+
+    def test_prune_keeps_the_most_recently_used(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = HighlightCache(tmp, max_files=2)
+            keys = [highlight_key(code, "python") for code in ("a", "b", "c")]
+            for i, code in enumerate(("a", "b", "c")):
+                highlight_code(code, "python", cache)
+                os.utime(cache.path(keys[i]), ns=(i * 10**9, i * 10**9))
+            stray = cache.path(keys[0]) + ".123.tmp"
+            with open(stray, "w") as f:
+                f.write("partial")
+
+            # Reading "a" from disk marks it as used again
+            self.assertIsNotNone(HighlightCache(tmp).get(keys[0]))
+            self.assertEqual(cache.prune(), 2)
+            self.assertEqual([os.path.exists(cache.path(key)) for key in keys], [True, False, True])
+            self.assertFalse(os.path.exists(stray))
+            self.assertEqual(cache.prune(), 0)
+
+    def test_prune_without_a_directory(self):
+        self.assertEqual(HighlightCache().prune(), 0)
+        self.assertEqual(HighlightCache(os.path.join(tempfile.gettempdir(), "no-such-cache")).prune(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
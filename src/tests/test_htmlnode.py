@@ -1,6 +1,8 @@
 import unittest
 
-from src.htmlnode import HTMLNode, LeafNode, ParentNode
+import io
+
+from src.htmlnode import HTMLNode, LeafNode, ParentNode, RawHTMLNode, write_html, escape_text, escape_attribute
 
 
 
@@ -85,6 +87,53 @@ class TestParentNode(unittest.TestCase):
         parent_node = ParentNode("div", [])
         self.assertEqual(parent_node.to_html(), "<div></div>")
 
+    def test_write_html_streams_fragments(self):
+        node = ParentNode("p", [
+            LeafNode(None, "Go "),
+            LeafNode("a", "home", {"href": "/"}),
+        ], {"class": "nav"})
+        fragments = []
+        node.write_html(fragments.append)
+        self.assertIn(' href="/"', fragments)
+        self.assertEqual("".join(fragments), node.to_html())
+        self.assertEqual(node.to_html(), '<p class="nav">Go <a href="/">home</a></p>')
+
+    def test_write_html_to_file(self):
+        node = ParentNode("div", [ParentNode("span", [LeafNode("b", "deep")])])
+        out = io.StringIO()
+        write_html(node, out.write)
+        self.assertEqual(out.getvalue(), "<div><span><b>deep</b></span></div>")
+
+    def test_escapes_text_and_attributes(self):
+        node = ParentNode("p", [
+            LeafNode(None, "a < b && c > d"),
+            LeafNode("a", "x<y", {"href": '/q?a=1&b="2"'}),
+        ])
+        expected = '<p>a &lt; b &amp;&amp; c > d<a href="/q?a=1&amp;b=&quot;2&quot;">x&lt;y</a></p>'
+        self.assertEqual(node.to_html(), expected)
+        self.assertEqual(LeafNode("a", "x<y", {"href": "/?a&b"}).to_html(), '<a href="/?a&amp;b">x&lt;y</a>')
+
+    def test_escape_fast_path_returns_same_object(self):
+        text = "nothing to escape here"
+        self.assertIs(escape_text(text), text)
+        self.assertIs(escape_attribute(text), text)
+
+    def test_raw_html_node_is_not_escaped(self):
+        node = ParentNode("div", [RawHTMLNode("<p>cached &amp; ready</p>")])
+        self.assertEqual(node.to_html(), "<div><p>cached &amp; ready</p></div>")
+
+    def test_nodes_have_no_instance_dict(self):
+        for node in (HTMLNode(), LeafNode("p", "x"), ParentNode("div", [])):
+            self.assertFalse(hasattr(node, "__dict__"))
+
+    def test_tags_are_interned(self):
+        level = 2
+        self.assertIs(ParentNode(f"h{level}", []).tag, LeafNode("h2", "x").tag)
+
+    def test_write_html_validates(self):
+        with self.assertRaises(ValueError):
+            ParentNode("div", [LeafNode("p")]).write_html(lambda fragment: None)
+
 
 if __name__ == "__main__":
     unittest.main()
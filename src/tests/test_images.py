@@ -0,0 +1,91 @@
+import os
+import shutil
+import struct
+import unittest
+from unittest import mock
+
+from src import images
+from src import settings
+from src.images import ImageIndex, ImageInfo, image_props, process_images, read_dimensions
+from src.manifest import Manifest
+from src.tests.helpers import TempDirTestCase, png_bytes
+
+
+class TestImages(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.static = self.path("static")
+        self.docs = self.path("docs")
+        self.cache = self.path("cache")
+        self.write(self.path("static", "images", "wide.png"), png_bytes(1200, 600))
+        self.write(self.path("static", "images", "small.png"), png_bytes(300, 200))
+        self.write(self.path("static", "index.css"), b"body {}")
+
+    def test_read_dimensions(self):
+        self.assertEqual(read_dimensions(self.path("static", "images", "wide.png")), (1200, 600))
+        self.write(self.path("anim.gif"), b"GIF89a" + struct.pack("<HH", 40, 30) + b"\0" * 20)
+        self.assertEqual(read_dimensions(self.path("anim.gif")), (40, 30))
+
+    def test_index_without_pillow(self):
+        with mock.patch.object(images, "Image", None):
+            index = process_images(self.static, self.docs, cache_dir=self.cache)
+        self.assertEqual(index.get("/images/wide.png"), ImageInfo(1200, 600))
+        self.assertEqual(index.get("/images/small.png"), ImageInfo(300, 200))
+        self.assertIsNone(index.get("/index.css"))
+        self.assertFalse(os.path.exists(self.cache))
+
+    @unittest.skipIf(images.Image is None, "Pillow is not installed")
+    def test_derivatives_are_cached(self):
+        outputs = set()
+        index = process_images(self.static, self.docs, outputs, cache_dir=self.cache)
+        self.assertEqual(index.get("/images/wide.png").srcset, (
+            ("/images/wide-480w.png", 480), ("/images/wide-960w.png", 960), ("/images/wide.png", 1200),
+        ))
+        self.assertEqual(index.get("/images/small.png").srcset, ())
+        derivative = self.path("docs", "images", "wide-480w.png")
+        self.assertEqual(read_dimensions(derivative), (480, 240))
+        self.assertIn(os.path.normpath(derivative), outputs)
+
+        with mock.patch.object(images, "make_derivative") as make_derivative:
+            again = process_images(self.static, self.docs, cache_dir=self.cache)
+        make_derivative.assert_not_called()
+        self.assertEqual(again.digest, index.digest)
+
+    def test_derivatives_of_deleted_images_are_pruned(self):
+        def copy_derivative(task):
+            source_path, target_path, _ = task
+            shutil.copyfile(source_path, target_path)
+
+        derivatives = [self.path("docs", "images", "wide-480w.png"), self.path("docs", "images", "wide-960w.png")]
+        manifest = Manifest(self.path("manifest.json"))
+        # Resizing is stubbed out, so this runs without Pillow
+        with mock.patch.object(images, "Image", mock.Mock()), mock.patch.object(images, "make_derivative", copy_derivative):
+            process_images(self.static, self.docs, cache_dir=self.cache, manifest=manifest)
+            self.assertTrue(all(os.path.exists(path) for path in derivatives))
+
+            os.remove(self.path("static", "images", "wide.png"))
+            manifest = Manifest(manifest.path, manifest.entries)
+            process_images(self.static, self.docs, cache_dir=self.cache, manifest=manifest)
+        self.assertEqual(sorted(manifest.prune()), derivatives)
+
+    def test_image_props(self):
+        self.addCleanup(settings.configure, settings.active)
+        settings.configure(settings.RenderSettings(images=ImageIndex({
+            "/a.png": ImageInfo(800, 400, (("/a-480w.png", 480), ("/a.png", 800))),
+        })))
+        props = image_props("/a.png", "A")
+        self.assertEqual(props["width"], "800")
+        self.assertEqual(props["height"], "400")
+        self.assertEqual(props["srcset"], "/a-480w.png 480w, /a.png 800w")
+        self.assertEqual(props["loading"], "lazy")
+        self.assertNotIn("width", image_props("https://example.com/b.png", "B"))
+
+    def test_digest_tracks_sizes(self):
+        self.assertNotEqual(
+            ImageIndex({"/a.png": ImageInfo(800, 400)}).digest,
+            ImageIndex({"/a.png": ImageInfo(800, 401)}).digest,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,30 @@
+import contextlib
+import io
+import unittest
+
+from src.main import parse_args
+
+
+class TestParseArgs(unittest.TestCase):
+    def assert_rejected(self, argv, message):
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr), self.assertRaises(SystemExit):
+            parse_args(argv)
+        self.assertIn(message, stderr.getvalue())
+
+    def test_posts_per_page_must_be_positive(self):
+        self.assertEqual(parse_args(["--posts-per-page", "3"]).posts_per_page, 3)
+        self.assert_rejected(["--listings", "--posts-per-page", "0"], "must be at least 1, got 0")
+
+    def test_pipeline_limits_must_be_positive(self):
+        # A queue of size 0 would be unbounded, turning off backpressure
+        self.assert_rejected(["--pipeline", "--queue-size", "0"], "must be at least 1, got 0")
+        self.assert_rejected(["--pipeline", "--io-threads", "-2"], "must be at least 1, got -2")
+
+    def test_profile_refuses_pipeline(self):
+        self.assert_rejected(["--profile", "--pipeline"], "--profile cannot time a --pipeline build")
+        self.assertTrue(parse_args(["--profile"]).profile)
+
+
+if __name__ == "__main__":
+    unittest.main()
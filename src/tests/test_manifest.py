@@ -0,0 +1,58 @@
+import os
+import tempfile
+import unittest
+
+from src.manifest import Manifest, combine_hashes, hash_file
+
+
+class TestManifest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "manifest.json")
+        self.dest = os.path.join(self.tmp.name, "out.html")
+        with open(self.dest, "w") as f:
+            f.write("<p>hi</p>")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_missing_manifest_is_empty(self):
+        manifest = Manifest.load(self.path)
+        self.assertEqual(manifest.entries, {})
+
+    def test_round_trip(self):
+        manifest = Manifest.load(self.path)
+        manifest.record("content/index.md", "abc", self.dest)
+        manifest.save()
+
+        manifest = Manifest.load(self.path)
+        self.assertTrue(manifest.is_current("content/index.md", "abc", self.dest))
+        self.assertFalse(manifest.is_current("content/index.md", "def", self.dest))
+
+    def test_missing_output_is_not_current(self):
+        manifest = Manifest(self.path)
+        manifest.record("content/index.md", "abc", self.dest)
+        os.remove(self.dest)
+        self.assertFalse(manifest.is_current("content/index.md", "abc", self.dest))
+
+    def test_prune_returns_unseen_outputs(self):
+        manifest = Manifest(self.path, {
+            "a.md": {"digest": "1", "dest": "a.html"},
+            "b.md": {"digest": "2", "dest": "b.html"},
+        })
+        manifest.is_current("a.md", "1", "a.html")
+        self.assertEqual(manifest.prune(), ["b.html"])
+        self.assertEqual(list(manifest.entries), ["a.md"])
+
+    def test_corrupt_manifest_is_empty(self):
+        with open(self.path, "w") as f:
+            f.write("{not json")
+        self.assertEqual(Manifest.load(self.path).entries, {})
+
+    def test_hashes(self):
+        self.assertEqual(len(hash_file(self.dest)), 64)
+        self.assertNotEqual(combine_hashes("a", "/"), combine_hashes("a", "/ssg/"))
+
+
+if __name__ == "__main__":
+    unittest.main()
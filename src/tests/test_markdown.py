@@ -1,5 +1,6 @@
 import unittest
-from src.markdown import extract_markdown_images, extract_markdown_links, markdown_to_blocks, extract_title
+from src.blocktype import BlockType
+from src.markdown import extract_markdown_images, extract_markdown_links, markdown_to_blocks, extract_title, scan_blocks, Block, find_markdown_images, find_markdown_links
 
 
 
@@ -36,6 +37,21 @@ class TestMarkdown(unittest.TestCase):
         ], matches)
 
 
+    def test_find_markdown_link_spans(self):
+        text = "See [a](/a) and ![img](/i.png) then [b](/b)"
+        spans = find_markdown_links(text)
+        self.assertEqual(spans, [(4, 11, "a", "/a"), (36, 43, "b", "/b")])
+        self.assertEqual(text[spans[0][0]:spans[0][1]], "[a](/a)")
+
+    def test_find_markdown_image_spans(self):
+        text = "See ![img](/i.png)"
+        self.assertEqual(find_markdown_images(text), [(4, 18, "img", "/i.png")])
+
+    def test_no_brackets_fast_path(self):
+        self.assertEqual(extract_markdown_links("just words"), [])
+        self.assertEqual(find_markdown_images("wow! no images"), [])
+
+
     def test_markdown_to_blocks(self):
         md = """
 This is **bolded** paragraph
@@ -59,6 +75,49 @@ This is the same paragraph on a new line
 
 
 
+    def test_markdown_to_blocks_fenced_code_keeps_blank_lines(self):
+        md = "Intro\n\n```\nfirst\n\nsecond\n```\n\nOutro"
+        self.assertEqual(
+            markdown_to_blocks(md),
+            ["Intro", "```\nfirst\n\nsecond\n```", "Outro"],
+        )
+
+    def test_scan_blocks_types_and_lines(self):
+        md = "  # Title  \n\n> quoted\n> more\n\n1. one\n2. two\n\n\n\nplain\ntext"
+        self.assertEqual(
+            list(scan_blocks(md.split("\n"))),
+            [
+                Block(BlockType.heading, ["# Title"]),
+                Block(BlockType.quote, ["> quoted", "> more"]),
+                Block(BlockType.ordered_list, ["1. one", "2. two"]),
+                Block(BlockType.paragraph, ["plain", "text"]),
+            ],
+        )
+
+    def test_scan_blocks_from_file_lines(self):
+        lines = iter(["```python\n", "x = 1\n", "\n", "```\n", "after\n"])
+        blocks = list(scan_blocks(lines))
+        self.assertEqual(blocks[0].block_type, BlockType.code)
+        self.assertEqual(blocks[0].text, "```python\nx = 1\n\n```")
+        self.assertEqual(blocks[1].text, "after")
+
+    def test_scan_blocks_unclosed_fence_runs_to_the_end(self):
+        lines = ["Intro", "", "```python", "x = 1", "", "# not a heading", "", ""]
+        self.assertEqual(
+            list(scan_blocks(lines)),
+            [
+                Block(BlockType.paragraph, ["Intro"]),
+                Block(BlockType.code, ["```python", "x = 1", "", "# not a heading", "```"]),
+            ],
+        )
+
+    def test_scan_blocks_inline_code_is_not_a_fence(self):
+        lines = ["```x``` is inline", "", "Next paragraph", "", "- item"]
+        self.assertEqual(
+            [block.block_type for block in scan_blocks(lines)],
+            [BlockType.paragraph, BlockType.paragraph, BlockType.unordered_list],
+        )
+
     def test_extract_title_from_markdown(self):
         markdown = "# My Awesome Title"
         md = extract_title(markdown)
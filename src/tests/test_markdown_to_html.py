@@ -1,6 +1,9 @@
 import unittest
-from src.markdown_to_html import markdown_to_html_node
+import io
+
+from src.markdown_to_html import code_language, markdown_to_html_node, write_markdown_html
 from src.htmlnode import to_html
+from src.toc import Outline
 
 
 
@@ -43,6 +46,38 @@ the **same** even with inline stuff
 
 
 
+    def test_codeblock_with_blank_line(self):
+        md = "```\nfirst\n\nsecond\n```"
+
+        node = markdown_to_html_node(md)
+        self.assertEqual(
+            node.to_html(),
+            "<div><pre><code>first\n\nsecond\n</code></pre></div>",
+        )
+
+
+
+    def test_codeblock_with_language(self):
+        md = "```python\nif x < 1:  # note\n```\n\n```brainfuck\n+<\n```"
+
+        node = markdown_to_html_node(md)
+        self.assertEqual(
+            node.to_html(),
+            '<div><pre><code class="language-python"><span class="k">if</span> x &lt; <span class="m">1</span>:  '
+            '<span class="c"># note</span>\n</code></pre>'
+            '<pre><code class="language-brainfuck">+&lt;\n</code></pre></div>',
+        )
+
+
+
+    def test_write_markdown_html_matches_tree(self):
+        md = "# Title\n\nSome **bold** text\n\n```\ncode\n\nmore\n```\n\n- a\n- b\n"
+        out = io.StringIO()
+        write_markdown_html(io.StringIO(md), out.write)
+        self.assertEqual(out.getvalue(), markdown_to_html_node(md).to_html())
+
+
+
     def test_headings(self):
         md = """
 # Heading 1
@@ -56,8 +91,22 @@ the **same** even with inline stuff
         html = node.to_html()
         self.assertEqual(
             html,
-            "<div><h1>Heading 1</h1><h2>Heading 2</h2><h3>Heading 3</h3></div>",
+            '<div><h1 id="heading-1">Heading 1</h1><h2 id="heading-2">Heading 2</h2><h3 id="heading-3">Heading 3</h3></div>',
+        )
+
+
+    def test_headings_fill_the_outline(self):
+        outline = Outline()
+        html = markdown_to_html_node("# Intro\n\n## Setup **now**\n\n## Intro", None, outline).to_html()
+        self.assertEqual(
+            html,
+            '<div><h1 id="intro">Intro</h1><h2 id="setup-now">Setup <b>now</b></h2><h2 id="intro-1">Intro</h2></div>',
         )
+        self.assertEqual(outline.entries, [(1, "intro", "Intro"), (2, "setup-now", "Setup now"), (2, "intro-1", "Intro")])
+
+        streamed = []
+        write_markdown_html(["# Intro", "", "## Intro"], streamed.append)
+        self.assertIn('<h2 id="intro-1">', "".join(streamed))
 
 
     def test_blockquote(self):
@@ -104,6 +153,19 @@ the **same** even with inline stuff
             "<div><ol><li>First item</li><li>Second item</li><li>Third item</li></ol></div>",
         )
 
+    def test_inline_code_at_paragraph_start_is_not_a_fence(self):
+        md = "# T\n\n```x``` is inline\n\nNext paragraph\n\n- list item"
+        html = markdown_to_html_node(md).to_html()
+        self.assertEqual(
+            html,
+            '<div><h1 id="t">T</h1><p><code></code><code>x</code><code></code> is inline</p>'
+            "<p>Next paragraph</p><ul><li>list item</li></ul></div>",
+        )
+
+    def test_code_language_rejects_backticks(self):
+        self.assertEqual(code_language("```python"), "python")
+        self.assertEqual(code_language("```{.js}"), "js")
+        self.assertEqual(code_language("```x```"), "")
 
 
 
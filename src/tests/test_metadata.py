@@ -0,0 +1,49 @@
+import os
+import unittest
+
+from src.metadata import MetadataStore
+from src.page_index import Page
+from src.tests.helpers import TempDirTestCase
+
+
+class TestMetadata(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.docs = self.path("docs")
+
+    def page(self, name, text, mtime=86400 * 365 * 50):
+        source = self.write(self.path("content", name, "index.md"), text, mtime * 10**9)
+        return Page(source, os.path.join(self.docs, name, "index.html"))
+
+    def test_front_matter_date_overrides_mtime(self):
+        store = MetadataStore(None)
+        metas, _ = store.refresh([self.page("a", "---\ndate: 2024-05-06\n---\n# A\n\nIntro")], self.docs)
+        self.assertEqual((metas[0].title, metas[0].date, metas[0].summary), ("A", "2024-05-06", "Intro"))
+
+    def test_refresh_reports_metadata_changes_only(self):
+        store = MetadataStore(None)
+        a = self.page("a", "# A\n\nIntro\n\nBody")
+        b = self.page("b", "# B\n\nIntro")
+        metas, changed = store.refresh([a, b], self.docs)
+        self.assertEqual([meta.url for meta in metas], ["/a/", "/b/"])
+        self.assertEqual(changed, {a.source, b.source})
+
+        a = self.page("a", "# A\n\nIntro\n\nBody, edited")
+        _, changed = store.refresh([a, b], self.docs)
+        self.assertEqual(changed, set())
+
+        a = self.page("a", "# A renamed\n\nIntro")
+        metas, changed = store.refresh([a], self.docs)
+        self.assertEqual(metas[0].title, "A renamed")
+        self.assertEqual(changed, {a.source, b.source})
+
+    def test_store_round_trip(self):
+        path = os.path.join(self.tmp.name, "cache", "metadata.json")
+        store = MetadataStore(path)
+        store.refresh([self.page("a", "# A\n\nIntro")], self.docs)
+        store.save()
+        self.assertEqual(MetadataStore.load(path).pages, store.pages)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,30 @@
+import unittest
+
+from src.minify import minify_css, minify_html
+
+
+class TestMinify(unittest.TestCase):
+    def test_minify_html_layout(self):
+        html = "<html>\n  <head>\n    <title>T</title>\n  </head>\n  <!-- note -->\n  <body>\n    <p>Hello\n    world</p>\n  </body>\n</html>\n"
+        self.assertEqual(
+            minify_html(html),
+            "<html><head><title>T</title></head><body><p>Hello world</p></body></html>",
+        )
+
+    def test_minify_html_keeps_inline_spaces_and_preformatted_text(self):
+        html = "<p><b>a</b> <i>b</i></p>\n<pre>\n  x  =  1\n</pre>\n<!--[if IE]><p>old</p><![endif]-->"
+        self.assertEqual(
+            minify_html(html),
+            "<p><b>a</b> <i>b</i></p><pre>\n  x  =  1\n</pre><!--[if IE]><p>old</p><![endif]-->",
+        )
+
+    def test_minify_css(self):
+        css = "/* theme */\nbody {\n  color: #fff;\n  font-family: \"A  B\", serif;\n}\n\na :hover > b,\nc { margin : 0 ; }\n"
+        self.assertEqual(
+            minify_css(css),
+            'body{color:#fff;font-family:"A  B",serif}a :hover>b,c{margin :0}',
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
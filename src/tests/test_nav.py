@@ -0,0 +1,41 @@
+import os
+import unittest
+
+from src.nav import is_top_level, nav_html, nav_links
+from src.page_index import Page
+from src.tests.helpers import TempDirTestCase
+
+
+class TestNav(TempDirTestCase):
+    def page(self, name, text):
+        source = self.write(self.path("content", name), text)
+        return Page(source, self.path("docs", os.path.splitext(name)[0] + ".html"))
+
+    def test_is_top_level(self):
+        self.assertTrue(is_top_level("/"))
+        self.assertTrue(is_top_level("/contact/"))
+        self.assertTrue(is_top_level("/about.html"))
+        self.assertFalse(is_top_level("/blog/tom/"))
+
+    def test_nav_links(self):
+        pages = [
+            self.page("blog/tom/index.md", "# Tom"),
+            self.page("contact/index.md", "---\ntitle: Get in touch\n---\n# Contact"),
+            self.page("about.md", "No title"),
+            self.page("index.md", "# Home"),
+        ]
+        self.assertEqual(
+            nav_links(pages, self.path("docs")),
+            [("/", "Home"), ("/about.html", "/about.html"), ("/contact/", "Get in touch")],
+        )
+
+    def test_nav_html(self):
+        self.assertEqual(
+            nav_html([("/", "Home"), ("/q/", "Q & A")]),
+            '<nav class="site-nav"><ul><li><a href="/">Home</a></li><li><a href="/q/">Q &amp; A</a></li></ul></nav>',
+        )
+        self.assertEqual(nav_html([]), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import os
+import stat
+import unittest
+
+from src.output_writer import FILE_MODE, OutputFile, same_contents, write_text
+from src.tests.helpers import TempDirTestCase
+
+
+class TestOutputWriter(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.dest = self.path("out", "index.html")
+
+    def backdate(self, path):
+        os.utime(path, ns=(1_000_000_000, 1_000_000_000))
+        return os.stat(path).st_mtime_ns
+
+    def test_writes_new_file(self):
+        with OutputFile(self.dest) as out:
+            out.write("<p>")
+            out.writelines(["hi", "</p>"])
+        self.assertTrue(out.changed)
+        self.assertEqual(self.read(self.dest), "<p>hi</p>")
+        self.assertEqual(stat.S_IMODE(os.stat(self.dest).st_mode), FILE_MODE)
+
+    def test_identical_output_keeps_mtime(self):
+        write_text(self.dest, "<p>hi</p>")
+        mtime = self.backdate(self.dest)
+
+        with OutputFile(self.dest) as out:
+            out.write("<p>hi</p>")
+        self.assertFalse(out.changed)
+        self.assertFalse(write_text(self.dest, "<p>hi</p>"))
+        self.assertEqual(os.stat(self.dest).st_mtime_ns, mtime)
+        self.assertEqual(os.listdir(os.path.dirname(self.dest)), ["index.html"])
+
+    def test_same_size_different_content_is_rewritten(self):
+        write_text(self.dest, "<p>hi</p>")
+        self.assertTrue(write_text(self.dest, "<p>ho</p>"))
+        self.assertEqual(self.read(self.dest), "<p>ho</p>")
+
+    def test_failure_leaves_destination_untouched(self):
+        write_text(self.dest, "old")
+        with self.assertRaises(ValueError):
+            with OutputFile(self.dest) as out:
+                out.write("partial")
+                raise ValueError("render failed")
+        self.assertEqual(self.read(self.dest), "old")
+        self.assertEqual(os.listdir(os.path.dirname(self.dest)), ["index.html"])
+
+    def test_same_contents(self):
+        other = self.path("other.html")
+        write_text(self.dest, "a" * 100_000)
+        write_text(other, "a" * 99_999 + "b")
+        self.assertFalse(same_contents(self.dest, other))
+        write_text(other, "a" * 100_000)
+        self.assertTrue(same_contents(self.dest, other))
+        self.assertFalse(same_contents(self.dest, self.path("missing")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import os
+import tempfile
+import unittest
+
+from src.page_index import Page, build_page_index, page_destination, page_url
+
+
+class TestPageIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        # "content" appearing higher up the path must not confuse the mapping
+        self.content = os.path.join(self.tmp.name, "my-content", "content")
+        for relative in ("index.md", "blog/a/index.md", "blog/b/index.md", "blog/notes.txt"):
+            path = os.path.join(self.content, relative)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.write("# Title")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_page_destination(self):
+        self.assertEqual(
+            page_destination("site/content/blog/content.md", "site/content", "docs"),
+            os.path.join("docs", "blog", "content.html"),
+        )
+
+    def test_page_url(self):
+        self.assertEqual(page_url(os.path.join("docs", "index.html"), "docs", "/site/"), "/site/")
+        self.assertEqual(page_url(os.path.join("docs", "blog", "index.html"), "docs"), "/blog/")
+        self.assertEqual(page_url(os.path.join("docs", "notes.html"), "docs"), "/notes.html")
+
+    def test_build_page_index(self):
+        pages = build_page_index(self.content, "docs")
+        self.assertEqual(
+            [page.destination for page in pages],
+            [
+                os.path.join("docs", "blog", "a", "index.html"),
+                os.path.join("docs", "blog", "b", "index.html"),
+                os.path.join("docs", "index.html"),
+            ],
+        )
+        self.assertTrue(all(page.stat.st_size == 7 for page in pages))
+
+    def test_many_directories(self):
+        for i in range(200):
+            path = os.path.join(self.content, "many", f"p{i}", "index.md")
+            os.makedirs(os.path.dirname(path))
+            open(path, "w").close()
+        pages = build_page_index(self.content, "docs", jobs=4)
+        self.assertEqual(len(pages), 203)
+        self.assertEqual(len({page.source for page in pages}), 203)
+
+    def test_fingerprint(self):
+        page = Page(os.path.join(self.content, "index.md"), "docs/index.html")
+        size, mtime = page.fingerprint().split(":")
+        self.assertEqual(size, "7")
+
+
+if __name__ == "__main__":
+    unittest.main()
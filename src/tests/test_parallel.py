@@ -0,0 +1,107 @@
+import multiprocessing
+import unittest
+
+from src.parallel import chunk_size, render_page_task, render_pages, render_pool
+from src import block_cache
+from src import settings
+from src.nav import nav_html
+from src.pipeline import build_pipelined
+from src.sitegen import generate_page
+from src.tests.helpers import TempDirTestCase
+
+
+TEMPLATE = "<title>{{ Title }}</title><main>{{ Content }}</main>"
+
+
+class TestParallel(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.template = self.path("template.html")
+        self.write(self.template, TEMPLATE)
+
+    def test_chunk_size(self):
+        self.assertEqual(chunk_size(3, 8), 1)
+        self.assertEqual(chunk_size(1000, 4), 62)
+
+    def test_task_reports_error(self):
+        source = self.path("bad.md")
+        self.write(source, "no title here")
+        source_path, error, _, _, _ = render_page_task((source, self.template, self.path("bad.html"), "/", False))
+        self.assertEqual(source_path, source)
+        self.assertIn("No title found", error)
+
+    def test_task_returns_profile(self):
+        source = self.path("page.md")
+        self.write(source, "# Title\n\nText")
+        _, error, profile, _, _ = render_page_task((source, self.template, self.path("page.html"), "/", True))
+        self.assertIsNone(error)
+        self.assertIn(source, profile["page_times"])
+        self.assertIn("html_build", profile["stage_totals"])
+
+    def test_matches_serial_output(self):
+        tasks = []
+        for i in range(6):
+            source = self.path(f"page{i}.md")
+            self.write(source, f"# Page {i}\n\nSome **bold** [link](/x{i})")
+            tasks.append((source, self.template, self.path("out", f"page{i}.html"), "/base/", False))
+
+        results = list(render_pages(tasks, 2))
+        self.assertEqual([error for _, error, _, _, _ in results], [None] * 6)
+
+        for source, template, dest, basepath, _ in tasks:
+            serial_dest = dest + ".serial"
+            generate_page(source, template, serial_dest, basepath)
+            self.assertEqual(self.read(dest), self.read(serial_dest))
+
+    def cached_pages(self):
+        pages = []
+        for i in range(4):
+            source = self.path(f"page{i}.md")
+            self.write(source, f"# Page {i}\n\nShared footer")
+            pages.append((source, self.path(f"page{i}.html")))
+        self.addCleanup(settings.configure, settings.active)
+        settings.configure(settings.RenderSettings(block_cache=block_cache.BlockCache()))
+        return pages
+
+    def assert_blocks_sent_back(self):
+        cache = settings.active.block_cache
+        self.assertIn("<p>Shared footer</p>", cache.entries.values())
+        # One paragraph per page; headings are not cached
+        self.assertEqual(cache.hits + cache.misses, 4)
+
+    def test_workers_send_rendered_blocks_back(self):
+        tasks = [(source, self.template, dest, "/", False) for source, dest in self.cached_pages()]
+        for *_, cached in render_pages(tasks, 2):
+            settings.active.block_cache.merge(cached)
+        self.assert_blocks_sent_back()
+
+    def test_pipeline_workers_send_rendered_blocks_back(self):
+        build_pipelined(self.cached_pages(), self.template, "/", jobs=2)
+        self.assert_blocks_sent_back()
+
+    def test_spawned_workers_get_the_render_settings(self):
+        self.write(self.template, "<title>{{ Title }}</title>\n    {{ Nav }}<main>  {{ Content }}  </main>\n")
+        source = self.path("page.md")
+        self.write(source, "# Page\n\nSome **bold** text")
+        tasks = [(source, self.template, self.path(f"spawn{i}.html"), "/", False) for i in range(2)]
+
+        previous = settings.active
+        settings.configure(settings.RenderSettings(stream_threshold=0, minify=True, nav_html=nav_html([("/", "Home")])))
+        try:
+            generate_page(source, self.template, self.path("serial.html"), "/")
+            # Spawned workers import everything afresh, so they only see
+            # what the pool initializer hands them
+            with render_pool(2, multiprocessing.get_context("spawn")) as pool:
+                results = list(pool.map(render_page_task, tasks))
+        finally:
+            settings.configure(previous)
+
+        self.assertEqual([error for _, error, _, _, _ in results], [None, None])
+        self.assertNotIn("\n", self.read(self.path("serial.html")))
+        self.assertIn('<a href="/">Home</a>', self.read(self.path("serial.html")))
+        for _, _, dest, _, _ in tasks:
+            self.assertEqual(self.read(dest), self.read(self.path("serial.html")))
+
+
+if __name__ == "__main__":
+    unittest.main()
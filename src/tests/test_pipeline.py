@@ -0,0 +1,60 @@
+import os
+import unittest
+
+from src.pipeline import build_pipelined
+from src.sitegen import generate_page
+from src.tests.helpers import TempDirTestCase
+
+
+TEMPLATE = '<title>{{ Title }}</title><link href="/index.css"><main>{{ Content }}</main>'
+
+
+class TestPipeline(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.template = self.path("template.html")
+        self.write(self.template, TEMPLATE)
+
+    def make_pages(self, count):
+        pages = []
+        for i in range(count):
+            source = self.path(f"page{i}.md")
+            self.write(source, f"# Page {i}\n\nText with [a link](/p/{i})\n\n- item")
+            pages.append((source, self.path("out", f"page{i}", "index.html")))
+        return pages
+
+    def test_matches_generate_page(self):
+        pages = self.make_pages(10)
+        errors, changed = build_pipelined(pages, self.template, "/base/", queue_size=2, io_threads=2)
+        self.assertEqual(errors, {})
+        self.assertEqual(changed, 10)
+
+        for source, dest in pages:
+            generate_page(source, self.template, dest + ".serial", "/base/")
+            self.assertEqual(self.read(dest), self.read(dest + ".serial"))
+
+    def test_errors_do_not_stop_other_pages(self):
+        pages = self.make_pages(3)
+        self.write(pages[1][0], "no title")
+        pages.append((self.path("missing.md"), self.path("out", "missing.html")))
+
+        errors, _ = build_pipelined(pages, self.template, "/", queue_size=1, io_threads=1)
+        self.assertEqual(sorted(errors), sorted([pages[1][0], self.path("missing.md")]))
+        self.assertTrue(os.path.exists(pages[0][1]))
+        self.assertTrue(os.path.exists(pages[2][1]))
+
+    def test_unchanged_outputs_are_not_rewritten(self):
+        pages = self.make_pages(4)
+        build_pipelined(pages, self.template, "/")
+        self.write(pages[0][0], "# Page 0\n\nEdited")
+
+        errors, changed = build_pipelined(pages, self.template, "/")
+        self.assertEqual(errors, {})
+        self.assertEqual(changed, 1)
+
+    def test_empty(self):
+        self.assertEqual(build_pipelined([], self.template, "/"), ({}, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
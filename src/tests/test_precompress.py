@@ -0,0 +1,58 @@
+import gzip
+import os
+import unittest
+
+from src.precompress import MIN_SIZE, precompress_outputs
+from src.tests.helpers import TempDirTestCase
+
+
+class TestPrecompress(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.docs = self.tmp.name
+        self.page = self.path("blog", "index.html")
+        self.write(self.page, "<p>hello</p>" * 100)
+        self.write(self.path("tiny.css"), "a{}")
+        self.write(self.path("logo.png"), "png" * 200)
+
+    def test_writes_gzip_siblings(self):
+        self.assertEqual(precompress_outputs(self.docs), 1)
+        with gzip.open(self.page + ".gz", "rt") as f:
+            self.assertEqual(f.read(), "<p>hello</p>" * 100)
+        self.assertEqual(os.stat(self.page + ".gz").st_mtime_ns, os.stat(self.page).st_mtime_ns)
+        self.assertFalse(os.path.exists(self.path("tiny.css.gz")))
+        self.assertFalse(os.path.exists(self.path("logo.png.gz")))
+
+    def test_skips_current_and_redoes_changed(self):
+        precompress_outputs(self.docs)
+        self.assertEqual(precompress_outputs(self.docs), 0)
+
+        self.write(self.page, "<p>changed</p>" * 100)
+        os.utime(self.page, ns=(1, 1))
+        self.assertEqual(precompress_outputs(self.docs), 1)
+        with gzip.open(self.page + ".gz", "rt") as f:
+            self.assertEqual(f.read(), "<p>changed</p>" * 100)
+
+    def test_removes_orphaned_and_stale_siblings(self):
+        precompress_outputs(self.docs)
+        self.write(self.path("old.html.br"), "stale")
+        self.write(self.path("backup.tar.gz"), "archive")
+        os.remove(self.page)
+
+        precompress_outputs(self.docs)
+        self.assertFalse(os.path.exists(self.page + ".gz"))
+        self.assertFalse(os.path.exists(self.path("old.html.br")))
+        self.assertTrue(os.path.exists(self.path("backup.tar.gz")))
+
+    def test_outputs_limits_and_collects(self):
+        other = self.path("other.html")
+        self.write(other, "x" * MIN_SIZE)
+        outputs = {os.path.normpath(self.page)}
+
+        precompress_outputs(self.docs, outputs)
+        self.assertIn(os.path.normpath(self.page + ".gz"), outputs)
+        self.assertFalse(os.path.exists(other + ".gz"))
+
+
+if __name__ == "__main__":
+    unittest.main()
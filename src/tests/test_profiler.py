@@ -0,0 +1,61 @@
+import json
+import os
+import tempfile
+import unittest
+
+from src import profiler
+from src.markdown_to_html import markdown_to_html_node
+from src.profiler import Profiler
+
+
+class TestProfiler(unittest.TestCase):
+    def test_stage_is_noop_without_profiler(self):
+        self.assertFalse(profiler.is_active())
+        with profiler.stage("read"):
+            pass
+
+    def test_nested_stages_are_exclusive(self):
+        page_profiler = Profiler()
+        with page_profiler.page("a.md"):
+            with profiler.stage("html_build"):
+                markdown_to_html_node("# Title\n\nSome **bold** text\n\n- a\n- b")
+
+        totals = page_profiler.stage_totals
+        self.assertEqual(totals["html_build"][2], 1)
+        self.assertEqual(totals["block_split"][2], 1)
+        self.assertEqual(totals["inline_parse"][2], 4)
+        self.assertIn("a.md", page_profiler.page_times)
+        self.assertFalse(profiler.is_active())
+
+        # inline_parse only feeds the totals, not the trace
+        names = [event["name"] for event in page_profiler.events]
+        self.assertEqual(sorted(names), ["a.md", "block_split", "html_build"])
+
+    def test_merge_and_report(self):
+        first, second = Profiler(), Profiler()
+        with first.page("a.md"):
+            with profiler.stage("read"):
+                pass
+        with second.page("b.md"):
+            with profiler.stage("read"):
+                pass
+
+        first.merge(second.export())
+        self.assertEqual(first.stage_totals["read"][2], 2)
+        report = first.report(top=1)
+        self.assertEqual(report[-2], "Slowest 1 pages:")
+
+    def test_write_trace(self):
+        page_profiler = Profiler()
+        with page_profiler.page("a.md"):
+            pass
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "trace.json")
+            page_profiler.write_trace(path)
+            with open(path) as f:
+                trace = json.load(f)
+        self.assertEqual(trace["traceEvents"][0]["ph"], "X")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import io
+import json
+import os
+import unittest
+
+from src.page_index import Page
+from src.search import SearchStore, build_search_index, page_terms, shard_name
+from src.sitegen import page_title
+from src.tests.helpers import TempDirTestCase
+
+
+class TestSearch(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.docs = self.path("docs")
+        self.store_path = self.path("cache", "search.pickle")
+
+    def read_json(self, *parts):
+        with open(os.path.join(self.docs, "search", *parts)) as f:
+            return json.load(f)
+
+    def page(self, name, text, mtime=1):
+        source = self.path("content", name, "index.md")
+        self.write(source, text, mtime)
+        return Page(source, os.path.join(self.docs, name, "index.html"))
+
+    def build(self, pages):
+        return build_search_index(pages, self.docs, "/site/", SearchStore.load(self.store_path))
+
+    def test_page_terms(self):
+        title, counts = page_terms([
+            "# Tolkien Notes", "",
+            "See **the** [wizard](https://gandalf.example) and `code`", "",
+            "```", "ignored_code_token", "```", "",
+            "- wizard hat",
+        ])
+        self.assertEqual(title, "Tolkien Notes")
+        self.assertEqual(counts["tolkien"], 3)
+        self.assertEqual(counts["wizard"], 2)
+        self.assertIn("code", counts)
+        self.assertNotIn("gandalf", counts)
+        self.assertNotIn("the", counts)
+        self.assertNotIn("ignored_code_token", counts)
+
+    def test_page_terms_skip_front_matter(self):
+        title, counts = page_terms(["---", "title: Wizard Notes", "tags: [secret]", "---", "Body words"])
+        self.assertEqual(title, "Wizard Notes")
+        self.assertEqual(counts["wizard"], 3)
+        self.assertIn("body", counts)
+        self.assertNotIn("secret", counts)
+        self.assertNotIn("tags", counts)
+
+    def test_page_terms_title_matches_the_page(self):
+        for text in ["#Title\n\nBody", "Intro para\n# Real Title\n"]:
+            title, _ = page_terms(io.StringIO(text))
+            self.assertEqual(title, page_title(text))
+
+    def test_shard_name(self):
+        self.assertEqual(shard_name("tolkien"), "to")
+        self.assertEqual(shard_name("éowyn"), "_e9o")
+
+    def test_builds_index_and_shards(self):
+        pages = [self.page("a", "# Alpha\n\nwizard wizard ring"), self.page("b", "# Beta\n\nwizard")]
+        self.build(pages)
+
+        index = self.read_json("index.json")
+        self.assertEqual(index["docs"], [["/site/a/", "Alpha"], ["/site/b/", "Beta"]])
+        postings = self.read_json("wi.json")["wizard"]
+        self.assertEqual(postings[0::2], [0, 1])
+        self.assertTrue(all(0 < weight <= index["weight_scale"] for weight in postings[1::2]))
+
+    def test_incremental_rewrites_only_affected_shards(self):
+        pages = [self.page("a", "# Alpha\n\nwizard"), self.page("b", "# Beta\n\nring")]
+        self.assertEqual(self.build(pages), 4)
+        self.assertEqual(self.build(pages), 0)
+
+        pages[1] = self.page("b", "# Beta\n\nring mountain", mtime=2)
+        self.assertEqual(self.build(pages), 3)
+        self.assertIn("mountain", self.read_json("mo.json"))
+
+    def test_removed_page_frees_postings_and_id(self):
+        pages = [self.page("a", "# Alpha\n\nwizard"), self.page("b", "# Beta\n\nhobbit")]
+        self.build(pages)
+        self.build(pages[1:])
+
+        self.assertEqual(self.read_json("index.json")["docs"], [None, ["/site/b/", "Beta"]])
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "search", "wi.json")))
+
+        self.build([pages[1], self.page("c", "# Gamma\n\nwizard")])
+        self.assertEqual(self.read_json("index.json")["docs"][0], ["/site/c/", "Gamma"])
+
+
+if __name__ == "__main__":
+    unittest.main()
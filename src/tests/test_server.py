@@ -0,0 +1,122 @@
+import os
+import threading
+import unittest
+from unittest import mock
+
+from src import main as build
+from src import images
+from src import server
+from src import settings
+from src.server import LiveReload, Watcher, layout_files, rebuild
+from src.tests.helpers import TempDirTestCase, png_bytes
+
+
+class TestWatcher(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = self.path("content")
+        self.page = self.write(os.path.join(self.content, "blog", "index.md"), "# Blog")
+
+    def test_no_changes(self):
+        watcher = Watcher([self.content])
+        self.assertEqual(watcher.poll(), ([], []))
+
+    def test_changed_added_and_deleted(self):
+        watcher = Watcher([self.content])
+        self.write(self.page, "# Blog, edited")
+        new_page = os.path.join(self.content, "new.md")
+        self.write(new_page, "# New")
+
+        changed, deleted = watcher.poll()
+        self.assertEqual(sorted(changed), sorted([self.page, new_page]))
+        self.assertEqual(deleted, [])
+
+        os.remove(self.page)
+        self.assertEqual(watcher.poll(), ([], [self.page]))
+
+    def test_missing_path_is_ignored(self):
+        watcher = Watcher([self.path("template.html")])
+        self.assertEqual(watcher.snapshot, {})
+
+
+class TestRebuild(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.saved = (build.CONTENT_DIR_PATH, build.STATIC_DIR_PATH, build.OUTPUT_DIR_PATH, build.TEMPLATE_PATH)
+        build.CONTENT_DIR_PATH = self.path("content")
+        build.STATIC_DIR_PATH = self.path("static")
+        build.OUTPUT_DIR_PATH = self.path("docs")
+        build.TEMPLATE_PATH = self.path("template.html")
+        self.write(self.path("content", "index.md"), "# Home")
+        self.write(self.path("content", "a", "index.md"), "# A")
+        self.write(self.path("footer.html"), "<footer>old</footer>")
+        self.write(build.TEMPLATE_PATH, '{{ Content }}{% include "footer.html" %}')
+        self.addCleanup(settings.configure, settings.active)
+        settings.configure(settings.RenderSettings())
+
+    def tearDown(self):
+        build.CONTENT_DIR_PATH, build.STATIC_DIR_PATH, build.OUTPUT_DIR_PATH, build.TEMPLATE_PATH = self.saved
+
+    def test_partial_change_rebuilds_every_page(self):
+        layout = layout_files()
+        self.assertEqual(layout, [build.TEMPLATE_PATH, self.path("footer.html")])
+        self.write(self.path("footer.html"), "<footer>new</footer>")
+        os.utime(self.path("footer.html"), ns=(0, 10**9))
+
+        self.assertEqual(rebuild([self.path("footer.html")], [], "/", layout), 2)
+        with open(self.path("docs", "a", "index.html")) as f:
+            self.assertIn("<footer>new</footer>", f.read())
+
+    def test_nav_change_rebuilds_every_page(self):
+        self.write(build.TEMPLATE_PATH, "{{ Nav }}{{ Content }}")
+        build.generate_pages_recursive(build.CONTENT_DIR_PATH, "/")
+
+        self.write(self.path("content", "a", "index.md"), "# A, renamed")
+        self.assertEqual(rebuild([self.path("content", "a", "index.md")], [], "/", [build.TEMPLATE_PATH]), 2)
+        with open(self.path("docs", "index.html")) as f:
+            self.assertIn('<a href="/a/">A, renamed</a>', f.read())
+
+        # Edits that leave the titles alone only re-render the page itself
+        self.write(self.path("content", "a", "index.md"), "# A, renamed\n\nBody")
+        self.assertEqual(rebuild([self.path("content", "a", "index.md")], [], "/", [build.TEMPLATE_PATH]), 1)
+
+    def test_new_static_directory(self):
+        font = self.write(self.path("static", "fonts", "a.woff"), b"font")
+        self.assertEqual(rebuild([font], [], "/", [build.TEMPLATE_PATH]), 1)
+        self.assertTrue(os.path.isfile(self.path("docs", "fonts", "a.woff")))
+
+    def test_image_change_rerenders_the_pages_showing_it(self):
+        image = self.write(self.path("static", "images", "a.png"), png_bytes(10, 10))
+        self.write(self.path("content", "a", "index.md"), "# A\n\n![pic](/images/a.png)")
+        # Sizes are read from the PNG header; nothing is resized
+        with mock.patch.object(images, "Image", None):
+            build.set_up_images()
+            build.generate_pages_recursive(build.CONTENT_DIR_PATH, "/")
+
+            self.write(image, png_bytes(20, 10))
+            # The copied image and the one page that shows it
+            self.assertEqual(rebuild([image], [], "/", [build.TEMPLATE_PATH]), 2)
+        self.assertIn('width="20"', self.read(self.path("docs", "a", "index.html")))
+
+    def test_failed_rebuild_keeps_watching(self):
+        watcher = mock.Mock()
+        watcher.poll.return_value = (["x"], [])
+        sleep = mock.patch.object(server.time, "sleep", side_effect=[None, None, KeyboardInterrupt])
+        with mock.patch.object(server, "rebuild", side_effect=OSError("boom")) as failing, sleep:
+            with self.assertLogs("src.server", "ERROR"), self.assertRaises(KeyboardInterrupt):
+                server.watch(watcher, LiveReload(), 0)
+        self.assertEqual(failing.call_count, 2)
+
+
+class TestLiveReload(unittest.TestCase):
+    def test_wait_returns_new_version(self):
+        livereload = LiveReload()
+        threading.Timer(0.01, livereload.notify).start()
+        self.assertEqual(livereload.wait(0, 5), 1)
+
+    def test_wait_times_out(self):
+        self.assertEqual(LiveReload().wait(0, 0.01), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+
+from src import settings
+from src.nav import nav_html
+from src.sitegen import generate_page
+from src.tests.helpers import TempDirTestCase
+
+
+TEMPLATE = "<title>{{ Title }}</title><main>{{ Content }}</main>"
+
+
+class TestGeneratePage(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.template = self.path("template.html")
+        self.write(self.template, TEMPLATE)
+
+    def generate_streaming(self, source, dest):
+        previous = settings.active
+        settings.configure(settings.RenderSettings(stream_threshold=0))
+        try:
+            generate_page(source, self.template, dest, "/")
+        finally:
+            settings.configure(previous)
+
+    def test_streaming_matches_in_memory(self):
+        source = self.path("big.md")
+        self.write(source, "Intro\n\n# Big\n\n" + "\n\n".join(f"Line **{i}**" for i in range(50)))
+        generate_page(source, self.template, self.path("memory.html"), "/")
+        self.generate_streaming(source, self.path("stream.html"))
+        self.assertEqual(self.read(self.path("stream.html")), self.read(self.path("memory.html")))
+
+    def test_streaming_unclosed_fence(self):
+        source = self.path("code.md")
+        self.write(source, "# Code\n\n```\nfirst\n\nsecond\n")
+        self.generate_streaming(source, self.path("stream.html"))
+        self.assertEqual(
+            self.read(self.path("stream.html")),
+            '<title>Code</title><main><div><h1 id="code">Code</h1><pre><code>first\n\nsecond\n</code></pre></div></main>',
+        )
+
+    def test_front_matter_is_not_rendered(self):
+        self.write(self.template, "<title>{{ Title }}</title><time>{{ Date }}</time><main>{{ Content }}</main>")
+        source = self.path("post.md")
+        self.write(source, "---\ntitle: From Front Matter\ndate: 2024-05-06\n---\n\nBody only")
+        generate_page(source, self.template, self.path("memory.html"), "/")
+        self.generate_streaming(source, self.path("stream.html"))
+
+        expected = "<title>From Front Matter</title><time>2024-05-06</time><main><div><p>Body only</p></div></main>"
+        self.assertEqual(self.read(self.path("memory.html")), expected)
+        self.assertEqual(self.read(self.path("stream.html")), expected)
+
+    def test_toc_slot(self):
+        self.write(self.template, "{{ Toc }}<main>{{ Content }}</main>")
+        source = self.path("page.md")
+        self.write(source, "# Title\n\n## Part")
+        generate_page(source, self.template, self.path("page.html"), "/")
+        self.assertEqual(
+            self.read(self.path("page.html")),
+            '<nav class="toc"><ul><li><a href="#title">Title</a><ul><li><a href="#part">Part</a></li></ul></li></ul></nav>'
+            '<main><div><h1 id="title">Title</h1><h2 id="part">Part</h2></div></main>',
+        )
+
+    def test_nav_slot(self):
+        self.write(self.template, "{{ Nav }}<main>{{ Content }}</main>")
+        source = self.write(self.path("page.md"), "# Title")
+        self.addCleanup(settings.configure, settings.active)
+        settings.configure(settings.RenderSettings(nav_html=nav_html([("/", "Home"), ("/contact/", "Contact")])))
+        generate_page(source, self.template, self.path("page.html"), "/site/")
+        self.assertEqual(
+            self.read(self.path("page.html")),
+            '<nav class="site-nav"><ul><li><a href="/site/">Home</a></li><li><a href="/site/contact/">Contact</a></li>'
+            '</ul></nav><main><div><h1 id="title">Title</h1></div></main>',
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -147,20 +147,77 @@ class TestSplitNodes(unittest.TestCase):
         assert nodes[1].url == "https://example.com"
 
 
+    def test_text_to_textnodes_matches_chained_splits(self):
+        text = "A **bold** and _italic_ with `code`, ![img](a.png) and [link](https://b.dev) end"
+        nodes = [TextNode(text, TextType.TEXT)]
+        nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
+        nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
+        nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
+        nodes = split_nodes_image(nodes)
+        nodes = split_nodes_link(nodes)
+        self.assertListEqual(nodes, text_to_textnodes(text))
+
+    def test_text_to_textnodes_nested_emphasis(self):
+        nodes = text_to_textnodes("**bold _and italic_**")
+        self.assertEqual(len(nodes), 1)
+        self.assertEqual(nodes[0].text_type, TextType.BOLD)
+        self.assertEqual(nodes[0].text, "bold and italic")
+        self.assertListEqual(
+            [
+                TextNode("bold ", TextType.TEXT),
+                TextNode("and italic", TextType.ITALIC),
+            ],
+            nodes[0].children,
+        )
 
+    def test_text_to_textnodes_code_is_literal(self):
+        nodes = text_to_textnodes("`a **b** _c_`")
+        self.assertListEqual([TextNode("a **b** _c_", TextType.CODE)], nodes)
 
+    def test_text_to_textnodes_link_url_with_underscore(self):
+        nodes = text_to_textnodes("[docs](https://x.dev/a_b)")
+        self.assertListEqual([TextNode("docs", TextType.LINK, "https://x.dev/a_b")], nodes)
 
+    def test_text_to_textnodes_underscore_inside_bold(self):
+        self.assertListEqual([TextNode("snake_case", TextType.BOLD)], text_to_textnodes("**snake_case**"))
+        self.assertListEqual(
+            [
+                TextNode("see ", TextType.TEXT),
+                TextNode("my_var", TextType.BOLD),
+                TextNode(" here", TextType.TEXT),
+            ],
+            text_to_textnodes("see **my_var** here"),
+        )
 
+    def test_text_to_textnodes_unclosed_inner_keeps_nested_nodes(self):
+        nodes = text_to_textnodes("**a_b `c` d**")
+        self.assertEqual(nodes[0].text_type, TextType.BOLD)
+        self.assertListEqual(
+            [
+                TextNode("a_b ", TextType.TEXT),
+                TextNode("c", TextType.CODE),
+                TextNode(" d", TextType.TEXT),
+            ],
+            nodes[0].children,
+        )
 
+    def test_text_to_textnodes_single_star_is_text(self):
+        self.assertListEqual([TextNode("x * y = z", TextType.TEXT)], text_to_textnodes("x * y = z"))
+        self.assertListEqual(
+            [
+                TextNode("2 * 3 is ", TextType.TEXT),
+                TextNode("six", TextType.BOLD),
+            ],
+            text_to_textnodes("2 * 3 is **six**"),
+        )
 
+    def test_text_to_textnodes_unclosed_delimiter(self):
+        with self.assertRaises(Exception):
+            text_to_textnodes("This is **not closed")
 
-
-
-
-
-
-
-
-
-
+    def test_text_to_textnodes_many_links(self):
+        text = " ".join(f"[l{i}](/p{i})" for i in range(2000))
+        nodes = text_to_textnodes(text)
+        self.assertEqual(len(nodes), 3999)
+        self.assertEqual(nodes[-1], TextNode("l1999", TextType.LINK, "/p1999"))
 
@@ -0,0 +1,66 @@
+import os
+import unittest
+
+from src.manifest import Manifest
+from src.static_sync import sync_directory
+from src.tests.helpers import TempDirTestCase
+
+
+class TestStaticSync(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.source = self.path("static")
+        self.dest = self.path("docs")
+        self.write(os.path.join(self.source, "index.css"), "body {}")
+        self.write(os.path.join(self.source, "images", "a.png"), "png")
+
+    def test_copies_then_skips(self):
+        counts = sync_directory(self.source, self.dest)
+        self.assertEqual(counts["copied"], 2)
+        self.assertEqual(self.read(os.path.join(self.dest, "images", "a.png")), "png")
+
+        counts = sync_directory(self.source, self.dest)
+        self.assertEqual(counts["copied"], 0)
+        self.assertEqual(counts["skipped"], 2)
+
+    def test_copies_changed_file(self):
+        sync_directory(self.source, self.dest)
+        self.write(os.path.join(self.source, "index.css"), "body { color: red }")
+        counts = sync_directory(self.source, self.dest)
+        self.assertEqual(counts["copied"], 1)
+        self.assertEqual(self.read(os.path.join(self.dest, "index.css")), "body { color: red }")
+
+    def test_checksum_mode(self):
+        sync_directory(self.source, self.dest)
+        os.utime(os.path.join(self.source, "index.css"), (0, 0))
+        counts = sync_directory(self.source, self.dest, checksum=True)
+        self.assertEqual(counts["skipped"], 2)
+
+    def test_link_mode(self):
+        counts = sync_directory(self.source, self.dest, link=True)
+        self.assertEqual(counts["reflinked"] + counts["linked"] + counts["copied"], 2)
+        self.assertEqual(self.read(os.path.join(self.dest, "index.css")), "body {}")
+
+    def test_only_deleted_sources_are_pruned(self):
+        manifest = Manifest(os.path.join(self.tmp.name, "manifest.json"))
+        sync_directory(self.source, self.dest, manifest)
+        self.write(os.path.join(self.dest, "page.html"), "<p>generated</p>")
+        os.remove(os.path.join(self.source, "images", "a.png"))
+
+        manifest.seen.clear()
+        sync_directory(self.source, self.dest, manifest)
+        self.assertEqual(manifest.prune(), [os.path.join(self.dest, "images", "a.png")])
+
+
+    def test_minifies_stylesheets(self):
+        self.write(os.path.join(self.source, "index.css"), "body {\n  color: red;\n}\n")
+        counts = sync_directory(self.source, self.dest, minify=True)
+        self.assertEqual(counts["minified"], 1)
+        self.assertEqual(self.read(os.path.join(self.dest, "index.css")), "body{color:red}")
+
+        counts = sync_directory(self.source, self.dest, minify=True)
+        self.assertEqual(counts["minified"], 0)
+        self.assertEqual(counts["skipped"], 2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+import os
+import tempfile
+import unittest
+
+from src import settings
+from src.template import Slot, load_template, parse_template, rewrite_basepath, template_digest, template_files
+
+
+class TestTemplate(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name, text):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "w") as f:
+            f.write(text)
+        return path
+
+    def test_parse_segments(self):
+        segments = parse_template("<title>{{ Title }}</title><main>{{Content}}</main>")
+        self.assertEqual(segments, [
+            "<title>", Slot("Title"), "</title><main>", Slot("Content"), "</main>",
+        ])
+
+    def test_render_values_and_callables(self):
+        template = load_template(self.write("t.html", "<h1>{{ Title }}</h1>{{ Content }}{{ Missing }}"))
+        html = template.render_to_string({
+            "Title": "Hi",
+            "Content": lambda write: write("<p>body</p>"),
+        })
+        self.assertEqual(html, "<h1>Hi</h1><p>body</p>")
+
+    def test_string_values_are_escaped(self):
+        template = load_template(self.write("e.html", '<title>{{ Title }}</title><meta content="{{ Description }}">'))
+        html = template.render_to_string({"Title": "Tom & Jerry <3", "Description": 'say "hi"'})
+        self.assertEqual(html, '<title>Tom &amp; Jerry &lt;3</title><meta content="say &quot;hi&quot;">')
+
+    def test_basepath_applied_to_static_and_values(self):
+        template = load_template(
+            self.write("t.html", '<link href="/index.css">{{ Content }}'),
+            "/ssg/",
+        )
+        html = template.render_to_string({
+            "Content": lambda write: (write("<a"), write(' href="/blog"'), write(">x</a>")),
+        })
+        self.assertEqual(html, '<link href="/ssg/index.css"><a href="/ssg/blog">x</a>')
+
+    def test_basepath_applied_to_srcset(self):
+        html = '<img src="/a.png" srcset="/a-480w.png 480w, https://x.dev/a.png 900w">'
+        self.assertEqual(
+            rewrite_basepath(html, "/ssg/"),
+            '<img src="/ssg/a.png" srcset="/ssg/a-480w.png 480w, https://x.dev/a.png 900w">',
+        )
+
+    def test_include_partial(self):
+        self.write("nav.html", '<nav><a href="/">{{ Title }}</a></nav>')
+        path = self.write("t.html", '{% include "nav.html" %}<main>{{ Content }}</main>')
+        template = load_template(path, "/base/")
+        html = template.render_to_string({"Title": "Home", "Content": "c"})
+        self.assertEqual(html, '<nav><a href="/base/">Home</a></nav><main>c</main>')
+
+    def test_include_cycle(self):
+        self.write("a.html", '{% include "b.html" %}')
+        self.write("b.html", '{% include "a.html" %}')
+        with self.assertRaises(ValueError):
+            load_template(os.path.join(self.tmp.name, "a.html"))
+
+    def test_edited_partial_is_reloaded(self):
+        nav = self.write("nav.html", '{% include "logo.html" %}<nav>old</nav>')
+        logo = self.write("logo.html", "<b>logo</b>")
+        path = self.write("t.html", '{% include "nav.html" %}{{ Content }}')
+        self.assertEqual(template_files(path), [path, nav, logo])
+        digest = template_digest(path)
+        self.assertEqual(load_template(path).render_to_string({}), "<b>logo</b><nav>old</nav>")
+
+        self.write("logo.html", "<b>new logo</b>")
+        # A distinct mtime, however coarse the filesystem's timestamps
+        os.utime(logo, ns=(0, 10**9))
+        self.assertEqual(load_template(path).render_to_string({}), "<b>new logo</b><nav>old</nav>")
+        self.assertNotEqual(template_digest(path), digest)
+
+    def test_template_is_cached(self):
+        path = self.write("t.html", "{{ Title }}")
+        self.assertIs(load_template(path), load_template(path))
+
+    def test_minify_leaves_values_alone(self):
+        path = self.write("m.html", "<html>\n  <body>\n    {{ Content }}\n  </body>\n</html>\n")
+        previous = settings.active
+        settings.configure(settings.RenderSettings(minify=True))
+        try:
+            html = load_template(path).render_to_string({"Content": lambda write: write("<pre>\n  x\n</pre>")})
+        finally:
+            settings.configure(previous)
+        self.assertEqual(html, "<html><body><pre>\n  x\n</pre></body></html>")
+        self.assertIn("\n", load_template(path).render_to_string({}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -36,6 +36,12 @@ class TestTextNodetoHTMLNode(unittest.TestCase):
         self.assertEqual(html_node.props["src"], "image.png")
         self.assertEqual(html_node.props["alt"], "An example image")
 
+    def test_image_alt_from_text(self):
+        node = TextNode("A cat", TextType.IMAGE, url="/cat.png")
+        html_node = text_node_to_html_node(node)
+        self.assertEqual(html_node.props["alt"], "A cat")
+        self.assertEqual(html_node.props["loading"], "lazy")
+
     def test_link(self):
         node = TextNode("Click me!", TextType.LINK, url="https://www.example.com")
         html_node = text_node_to_html_node(node)
@@ -43,4 +49,12 @@ class TestTextNodetoHTMLNode(unittest.TestCase):
         self.assertEqual(html_node.value, "Click me!")
         self.assertEqual(html_node.props["href"], "https://www.example.com")
 
+    def test_nested_bold(self):
+        node = TextNode("bold and italic", TextType.BOLD, children=[
+            TextNode("bold ", TextType.TEXT),
+            TextNode("and italic", TextType.ITALIC),
+        ])
+        html_node = text_node_to_html_node(node)
+        self.assertEqual(html_node.to_html(), "<b>bold <i>and italic</i></b>")
+
 
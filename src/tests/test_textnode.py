@@ -25,6 +25,13 @@ class TestTextNode(unittest.TestCase):
         node2 = TextNode("Some text", TextType.BOLD, "https://example.com")
         self.assertNotEqual(node, node2)
 
+    def test_repr(self):
+        node = TextNode("Some text", TextType.LINK, "https://example.com")
+        self.assertEqual(repr(node), "TextNode(Some text, link, https://example.com, None)")
+
+    def test_no_instance_dict(self):
+        self.assertFalse(hasattr(TextNode("x", TextType.TEXT), "__dict__"))
+
 
 
 
@@ -0,0 +1,44 @@
+import unittest
+
+from src.toc import Outline, slugify
+
+
+class TestToc(unittest.TestCase):
+    def test_slugify(self):
+        self.assertEqual(slugify("Hello, World!"), "hello-world")
+        self.assertEqual(slugify("  The -- Fellowship  "), "the-fellowship")
+        self.assertEqual(slugify("Váya márië"), "váya-márië")
+        self.assertEqual(slugify("???"), "section")
+
+    def test_slugify_is_memoized(self):
+        slugify.cache_clear()
+        slugify("Repeated heading")
+        slugify("Repeated heading")
+        self.assertEqual(slugify.cache_info().hits, 1)
+
+    def test_ids_are_unique_per_page(self):
+        outline = Outline()
+        ids = [outline.add(2, text) for text in ["Notes", "Notes", "Notes 1", "Notes"]]
+        self.assertEqual(ids, ["notes", "notes-1", "notes-1-1", "notes-2"])
+        # A new page starts over
+        self.assertEqual(Outline().add(2, "Notes"), "notes")
+
+    def test_nested_table_of_contents(self):
+        outline = Outline()
+        for level, text in [(1, "Title"), (2, "A"), (3, "A.1"), (2, "B <&>")]:
+            outline.add(level, text)
+        self.assertEqual(
+            outline.to_html_node().to_html(),
+            '<nav class="toc"><ul><li><a href="#title">Title</a><ul>'
+            '<li><a href="#a">A</a><ul><li><a href="#a1">A.1</a></li></ul></li>'
+            '<li><a href="#b">B &lt;&amp;></a></li></ul></li></ul></nav>',
+        )
+
+    def test_empty_outline(self):
+        parts = []
+        Outline().write_html(parts.append)
+        self.assertEqual(parts, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,20 +1,27 @@
 from src.textnode import TextNode, TextType
-from src.htmlnode import LeafNode
+from src.htmlnode import LeafNode, ParentNode
+from src.images import image_props
 
 def text_node_to_html_node(text_node):
     if text_node.text_type == TextType.TEXT:
         return LeafNode(None, text_node.text)
 
     if text_node.text_type == TextType.IMAGE:
-        return LeafNode("img", "", {"src": text_node.url, "alt": text_node.alt})
+        # Markdown images keep their alt text in text
+        alt = text_node.alt if text_node.alt is not None else text_node.text
+        return LeafNode("img", "", image_props(text_node.url, alt))
 
     if text_node.text_type == TextType.LINK:
         return LeafNode("a", text_node.text, {"href": text_node.url})
 
     if text_node.text_type == TextType.BOLD:
+        if text_node.children:
+            return ParentNode("b", [text_node_to_html_node(child) for child in text_node.children])
         return LeafNode("b", text_node.text)
 
     if text_node.text_type == TextType.ITALIC:
+        if text_node.children:
+            return ParentNode("i", [text_node_to_html_node(child) for child in text_node.children])
         return LeafNode("i", text_node.text)
 
     if text_node.text_type == TextType.CODE:
@@ -12,17 +12,23 @@ class TextType(Enum):
 
 
 class TextNode:
-    def __init__(self, text, text_type, url=None, alt=None):
+    # Builds create a very large number of these, so skip the per-instance dict
+    __slots__ = ("text", "text_type", "url", "alt", "children")
+
+    def __init__(self, text, text_type, url=None, alt=None, children=None):
         self.text = text
         self.text_type = text_type
         self.url = url
         self.alt = alt
+        # Nested inline nodes for emphasis that contains other markup
+        self.children = children
 
     def __eq__(self, other):
         return (self.text == other.text and 
                 self.text_type == other.text_type and 
                 self.url == other.url and
-                self.alt == other.alt
+                self.alt == other.alt and
+                self.children == other.children
                 )
             
         
@@ -0,0 +1,78 @@
+import functools
+import re
+
+from .htmlnode import LeafNode, ParentNode
+
+SLUG_STRIP = re.compile(r"[^\w\s-]")
+SLUG_SEPARATORS = re.compile(r"[\s-]+")
+
+
+@functools.lru_cache(maxsize=4096)
+def slugify(text):
+    """
+    A URL fragment for heading text: lowercased, punctuation dropped and
+    runs of spaces and hyphens joined by one hyphen. Memoized, since the
+    same headings recur across many pages.
+    """
+    slug = SLUG_SEPARATORS.sub("-", SLUG_STRIP.sub("", text.lower())).strip("-")
+    return slug or "section"
+
+
+class Outline:
+    """
+    The headings of one page in document order, filled in while its
+    blocks are rendered. Each heading gets the id of its slug, suffixed
+    with -1, -2, ... when the page already uses it.
+    """
+
+    __slots__ = ("entries", "used")
+
+    def __init__(self):
+        # (level, id, text) per heading
+        self.entries = []
+        self.used = set()
+
+    def add(self, level, text):
+        """Record a heading and return its id."""
+        slug = slugify(text)
+        heading_id = slug
+        number = 1
+        while heading_id in self.used:
+            heading_id = f"{slug}-{number}"
+            number += 1
+        self.used.add(heading_id)
+        self.entries.append((level, heading_id, text))
+        return heading_id
+
+    def to_html_node(self):
+        """
+        A <nav class="toc"> of nested lists linking to each heading, with
+        each heading listed under the closest preceding one of a higher
+        level. Returns None when there are no headings.
+        """
+        if not self.entries:
+            return None
+
+        root = []
+        # (level, items) from the outermost list inward; an item is its
+        # link and the items nested under it
+        stack = [(0, root)]
+        for level, heading_id, text in self.entries:
+            while stack[-1][0] >= level:
+                stack.pop()
+            nested = []
+            stack[-1][1].append((LeafNode("a", text, {"href": f"#{heading_id}"}), nested))
+            stack.append((level, nested))
+
+        def list_node(items):
+            return ParentNode("ul", [
+                ParentNode("li", [link, list_node(nested)] if nested else [link])
+                for link, nested in items
+            ])
+
+        return ParentNode("nav", [list_node(root)], {"class": "toc"})
+
+    def write_html(self, write):
+        node = self.to_html_node()
+        if node is not None:
+            node.write_html(write)